@@ -1,4 +1,81 @@
-from .bno055 import BNO055
-from .constants import SysTriggerFlag
+# names below are imported on first access, so `import rpi_bno055` (and every entry point) only pays
+# for the submodules actually used; NumPy and asyncio in particular are never loaded by the CLI scripts
 
-__all__ = ["BNO055", "SysTriggerFlag"]
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .aio import AsyncBNO055
+    from .bno055 import BNO055
+    from .change import DuplicatePolicy
+    from .constants import SysTriggerFlag
+    from .interrupts import InterruptFlag
+    from .multi import BNO055Array, Device, MultiSnapshot
+    from .policy import IOPolicy, IOStats
+    from .power import PowerManager
+    from .recording import Recorder, Recording
+    from .sampler import BNO055Sampler
+    from .shm import SharedBNO055, SharedPublisher
+    from .snapshot import Sensor, Snapshot
+    from .timing import SampleClock
+    from .trace import Tracer
+
+# exported name -> submodule defining it
+_EXPORTS: dict[str, str] = {
+    "AsyncBNO055": ".aio",
+    "BNO055": ".bno055",
+    "BNO055Array": ".multi",
+    "BNO055Sampler": ".sampler",
+    "Device": ".multi",
+    "DuplicatePolicy": ".change",
+    "IOPolicy": ".policy",
+    "IOStats": ".policy",
+    "InterruptFlag": ".interrupts",
+    "MultiSnapshot": ".multi",
+    "PowerManager": ".power",
+    "Recorder": ".recording",
+    "Recording": ".recording",
+    "SampleClock": ".timing",
+    "Sensor": ".snapshot",
+    "SharedBNO055": ".shm",
+    "SharedPublisher": ".shm",
+    "Snapshot": ".snapshot",
+    "SysTriggerFlag": ".constants",
+    "Tracer": ".trace",
+}
+
+__all__ = [
+    "AsyncBNO055",
+    "BNO055",
+    "BNO055Array",
+    "BNO055Sampler",
+    "Device",
+    "DuplicatePolicy",
+    "IOPolicy",
+    "IOStats",
+    "InterruptFlag",
+    "MultiSnapshot",
+    "PowerManager",
+    "Recorder",
+    "Recording",
+    "SampleClock",
+    "Sensor",
+    "SharedBNO055",
+    "SharedPublisher",
+    "Snapshot",
+    "SysTriggerFlag",
+    "Tracer",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,282 @@
+# asyncio front end of BNO055
+# every bus access runs on one dedicated I/O thread, so transactions stay serialized
+# and the event loop never blocks on smbus2
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from types import TracebackType
+from typing import TypeVar
+
+from typing_extensions import Self
+
+from .axis_remap import AxisRemap
+from .bno055 import BNO055
+from .boot import BootReport
+from .calibration import CalibrationProfile
+from .constants import SysTriggerFlag
+from .interrupts import EdgeSource, InterruptFlag
+from .modes import OperatingMode
+from .policy import IOStats
+from .power_modes import PowerMode
+from .regaddrs0 import RegisterAddress
+from .samples import CalibrationStatus, FusionSample, ImuSample
+from .sensor_config import AccConfig, GyrConfig, MagConfig
+from .snapshot import Sensor, Snapshot
+from .sys_err_codes import SysErrCode
+from .sys_status_codes import SysStatusCode
+from .unit_sel import UnitSelection
+
+_T = TypeVar("_T")
+
+
+class AsyncBNO055:
+    """
+    # Sample Code
+    ```python
+    async with AsyncBNO055(BNO055()) as bno055:
+        await bno055.begin()
+        await bno055.write_mode(BNO055.modes.NDOF)
+        async for sample in bno055.stream(rate_hz=100, sensors=Sensor.FUSION):
+            ...
+    ```
+    """
+
+    def __init__(self, bno055: BNO055) -> None:
+        self._bno055 = bno055
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="AsyncBNO055")
+
+    @property
+    def sync(self) -> BNO055:
+        return self._bno055
+
+    # counters only; reading them does not touch the bus
+    def stats(self) -> IOStats:
+        return self._bno055.stats()
+
+    # run `func(bno055)` on the I/O thread
+    async def run(self, func: Callable[[BNO055], _T]) -> _T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, self._bno055)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    # snapshots at `rate_hz`, scheduled on absolute loop.time() deadlines so the rate does not drift
+    # ticks missed because a read took too long are skipped, not burst
+    async def stream(self, rate_hz: float = 100.0, sensors: Sensor = Sensor.ALL) -> AsyncIterator[Snapshot]:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive: {rate_hz}")
+        loop = asyncio.get_running_loop()
+        period = 1 / rate_hz
+        deadline = loop.time()
+        while True:
+            yield await self.read_snapshot(sensors)
+            deadline += period
+            delay = deadline - loop.time()
+            if delay < 0:
+                deadline += (-delay // period + 1) * period
+                delay = deadline - loop.time()
+            await asyncio.sleep(delay)
+
+    async def write_byte(self, register: RegisterAddress, value: int, page: int = 0) -> None:
+        await self.run(lambda b: b.write_byte(register, value, page))
+
+    async def read_byte(self, register: RegisterAddress, page: int = 0) -> int:
+        return await self.run(lambda b: b.read_byte(register, page))
+
+    async def read_block(self, register: RegisterAddress, length: int, page: int = 0) -> list[int]:
+        return await self.run(lambda b: b.read_block(register, length, page))
+
+    async def write_block(self, register: RegisterAddress, data: Sequence[int], page: int = 0) -> None:
+        await self.run(lambda b: b.write_block(register, data, page))
+
+    async def read_span(self, register: RegisterAddress, length: int, page: int = 0) -> Sequence[int]:
+        return await self.run(lambda b: b.read_span(register, length, page))
+
+    async def write_mode(self, mode: OperatingMode) -> None:
+        await self.run(lambda b: b.write_mode(mode))
+
+    async def read_mode(self) -> OperatingMode:
+        return await self.run(BNO055.read_mode)
+
+    async def write_power_mode(self, mode: PowerMode) -> None:
+        await self.run(lambda b: b.write_power_mode(mode))
+
+    async def read_power_mode(self) -> PowerMode:
+        return await self.run(BNO055.read_power_mode)
+
+    async def configure_sensors(
+        self, acc: AccConfig | None = None, gyr: GyrConfig | None = None, mag: MagConfig | None = None
+    ) -> None:
+        await self.run(lambda b: b.configure_sensors(acc, gyr, mag))
+
+    async def read_sensor_config(self) -> tuple[AccConfig, GyrConfig, MagConfig]:
+        return await self.run(BNO055.read_sensor_config)
+
+    async def write_axis_remap(self, remap: AxisRemap) -> None:
+        await self.run(lambda b: b.write_axis_remap(remap))
+
+    async def read_axis_remap(self) -> AxisRemap:
+        return await self.run(BNO055.read_axis_remap)
+
+    async def refresh_axis_remap(self) -> AxisRemap:
+        return await self.run(BNO055.refresh_axis_remap)
+
+    async def read_unique_id(self) -> bytes:
+        return await self.run(BNO055.read_unique_id)
+
+    async def selftest_result(self) -> tuple[bool, bool, bool, bool]:
+        return await self.run(BNO055.selftest_result)
+
+    async def read_unit_selection(self) -> UnitSelection:
+        return await self.run(BNO055.read_unit_selection)
+
+    async def write_unit_selection(self, unit_sel: UnitSelection) -> None:
+        await self.run(lambda b: b.write_unit_selection(unit_sel))
+
+    async def update_unit_selection(self, val: UnitSelection.UnitsType) -> None:
+        await self.run(lambda b: b.update_unit_selection(val))
+
+    async def refresh_units(self) -> UnitSelection:
+        return await self.run(BNO055.refresh_units)
+
+    async def begin(self) -> None:
+        await self.run(BNO055.begin)
+
+    async def system_trigger(self, trigger: SysTriggerFlag, timeout: float = 2.0) -> None:
+        await self.run(lambda b: b.system_trigger(trigger, timeout))
+
+    async def wait_ready(self, timeout: float = 2.0, holdoff: float = 0.0) -> None:
+        await self.run(lambda b: b.wait_ready(timeout, holdoff))
+
+    async def fast_boot(
+        self,
+        mode: OperatingMode,
+        units: UnitSelection | None = None,
+        profile: CalibrationProfile | None = None,
+        reset: bool = False,
+        sensors: Sensor = Sensor.ALL,
+        timeout: float = 2.0,
+        axis_remap: AxisRemap | None = None,
+    ) -> BootReport:
+        return await self.run(lambda b: b.fast_boot(mode, units, profile, reset, sensors, timeout, axis_remap))
+
+    async def read_sw_revision_id(self) -> tuple[int, int]:
+        return await self.run(BNO055.read_sw_revision_id)
+
+    async def read_raw_acc_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_acc_data)
+
+    async def read_raw_mag_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_mag_data)
+
+    async def read_raw_gyro_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_gyro_data)
+
+    async def read_raw_euler_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_euler_data)
+
+    async def read_raw_quaternion_data(self) -> tuple[int, int, int, int]:
+        return await self.run(BNO055.read_raw_quaternion_data)
+
+    async def read_raw_lia_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_lia_data)
+
+    async def read_raw_gravity_data(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_gravity_data)
+
+    async def read_raw_temperature_data(self) -> int:
+        return await self.run(BNO055.read_raw_temperature_data)
+
+    async def read_calibration_status(self) -> CalibrationStatus:
+        return await self.run(BNO055.read_calibration_status)
+
+    async def read_system_status_code(self) -> SysStatusCode:
+        return await self.run(BNO055.read_system_status_code)
+
+    async def read_system_error_code(self) -> SysErrCode:
+        return await self.run(BNO055.read_system_error_code)
+
+    async def read_raw_acc_offset(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_acc_offset)
+
+    async def read_raw_mag_offset(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_mag_offset)
+
+    async def read_raw_gyr_offset(self) -> tuple[int, int, int]:
+        return await self.run(BNO055.read_raw_gyr_offset)
+
+    async def read_raw_acc_radius(self) -> int:
+        return await self.run(BNO055.read_raw_acc_radius)
+
+    async def read_raw_mag_radius(self) -> int:
+        return await self.run(BNO055.read_raw_mag_radius)
+
+    async def read_calibration_profile(self) -> CalibrationProfile:
+        return await self.run(BNO055.read_calibration_profile)
+
+    async def write_calibration_profile(self, profile: CalibrationProfile) -> None:
+        await self.run(lambda b: b.write_calibration_profile(profile))
+
+    async def read_interrupt_status(self) -> InterruptFlag:
+        return await self.run(BNO055.read_interrupt_status)
+
+    async def reset_interrupts(self) -> None:
+        await self.run(BNO055.reset_interrupts)
+
+    # holds the I/O thread while waiting; other calls queue up behind it
+    async def wait_for_interrupt(
+        self,
+        interrupts: InterruptFlag,
+        timeout: float | None = None,
+        edge: EdgeSource | None = None,
+        poll_interval: float = 0.01,
+        reset: bool = True,
+    ) -> InterruptFlag:
+        return await self.run(lambda b: b.wait_for_interrupt(interrupts, timeout, edge, poll_interval, reset))
+
+    async def read_accelerometer(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_accelerometer)
+
+    async def read_magnetometer(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_magnetometer)
+
+    async def read_gyroscope(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_gyroscope)
+
+    async def read_euler(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_euler)
+
+    async def read_quaternion(self) -> tuple[float, float, float, float]:
+        return await self.run(BNO055.read_quaternion)
+
+    async def read_linear_accel(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_linear_accel)
+
+    async def read_gravity(self) -> tuple[float, float, float]:
+        return await self.run(BNO055.read_gravity)
+
+    async def read_temperature(self) -> float:
+        return await self.run(BNO055.read_temperature)
+
+    async def read_snapshot(self, sensors: Sensor = Sensor.ALL) -> Snapshot:
+        return await self.run(lambda b: b.read_snapshot(sensors))
+
+    async def read_imu(self) -> ImuSample:
+        return await self.run(BNO055.read_imu)
+
+    async def read_fusion(self) -> FusionSample:
+        return await self.run(BNO055.read_fusion)
@@ -0,0 +1,104 @@
+# AXIS_MAP_CONFIG and AXIS_MAP_SIGN: which chip axis is reported as X, Y and Z, and which are negated
+# the chip applies the remap before the fusion, so every output, including the Euler angles, is in the
+# remapped frame and the host does no per-sample work; both registers are only writable in CONFIG mode
+# section 3.4, 4.3.61, 4.3.62, table 3-7, 3-8
+
+import enum as _enum
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from typing_extensions import Self
+
+
+# 2-bit field values of AXIS_MAP_CONFIG; 0b11 is invalid
+# section 3.4, table 3-7
+class RemapAxis(_enum.Enum):
+    X = 0b00
+    Y = 0b01
+    Z = 0b10
+
+
+# AXIS_MAP_CONFIG, reset value 0x24, and AXIS_MAP_SIGN, reset value 0x00
+# x, y, z: the chip axis reported as X, Y and Z; the three must differ
+# *_negative: the reported axis is negated
+@dataclass(frozen=True)
+class AxisRemap:
+    x: RemapAxis = RemapAxis.X
+    y: RemapAxis = RemapAxis.Y
+    z: RemapAxis = RemapAxis.Z
+    x_negative: bool = False
+    y_negative: bool = False
+    z_negative: bool = False
+
+    def __post_init__(self) -> None:
+        if len({self.x, self.y, self.z}) != 3:
+            raise ValueError(f"axis remap must be a permutation of X, Y and Z: {self.x}, {self.y}, {self.z}")
+
+    # AXIS_MAP_CONFIG
+    @property
+    def config_value(self) -> int:
+        return (self.z.value << 4) | (self.y.value << 2) | self.x.value
+
+    # AXIS_MAP_SIGN
+    @property
+    def sign_value(self) -> int:
+        return (self.x_negative << 2) | (self.y_negative << 1) | int(self.z_negative)
+
+    @property
+    def is_identity(self) -> bool:
+        return self.config_value == 0x24 and self.sign_value == 0x00
+
+    # the placement preset (0 to 7) this remap equals, None for any other remap
+    @property
+    def placement(self) -> int | None:
+        for p, remap in enumerate(PLACEMENTS):
+            if remap == self:
+                return p
+        return None
+
+    # the remapped (x, y, z) of a vector in the chip frame, e.g. to convert data recorded before the remap
+    def apply(self, vec: Sequence[float]) -> tuple[float, float, float]:
+        x = vec[self.x.value]
+        y = vec[self.y.value]
+        z = vec[self.z.value]
+        return (-x if self.x_negative else x, -y if self.y_negative else y, -z if self.z_negative else z)
+
+    # raises ValueError for a field of 0b11 or an axis used twice
+    @classmethod
+    def from_values(cls, config: int, sign: int) -> Self:
+        fields = ((config >> 0) & 0b11, (config >> 2) & 0b11, (config >> 4) & 0b11)
+        if 0b11 in fields:
+            raise ValueError(f"invalid AXIS_MAP_CONFIG: {config:#04x}")
+        return cls(
+            RemapAxis(fields[0]),
+            RemapAxis(fields[1]),
+            RemapAxis(fields[2]),
+            bool(sign & 0b100),
+            bool(sign & 0b010),
+            bool(sign & 0b001),
+        )
+
+    # the datasheet placement P0 to P7 of the chip on the board, P1 being the reset value
+    # section 3.4, figure 3-3
+    @classmethod
+    def from_placement(cls, placement: int) -> Self:
+        if not 0 <= placement < len(PLACEMENTS):
+            raise ValueError(f"placement must be in 0..{len(PLACEMENTS) - 1}: {placement}")
+        remap = PLACEMENTS[placement]
+        return cls(remap.x, remap.y, remap.z, remap.x_negative, remap.y_negative, remap.z_negative)
+
+
+# (AXIS_MAP_CONFIG, AXIS_MAP_SIGN) of P0 to P7
+# section 3.4, table 3-8
+_PLACEMENT_VALUES = (
+    (0x21, 0x04),
+    (0x24, 0x00),
+    (0x24, 0x06),
+    (0x21, 0x02),
+    (0x24, 0x03),
+    (0x21, 0x01),
+    (0x21, 0x07),
+    (0x24, 0x05),
+)
+
+PLACEMENTS: tuple[AxisRemap, ...] = tuple(AxisRemap.from_values(config, sign) for config, sign in _PLACEMENT_VALUES)
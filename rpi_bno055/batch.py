@@ -0,0 +1,115 @@
+# vectorized decoding of many concatenated raw register blocks
+# NumPy is optional: without it every function falls back to struct-based pure Python
+# and returns lists of tuples instead of arrays
+
+import struct
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from .snapshot import SENSOR_REGISTERS, Sensor, span_of
+from .unit_sel import UnitScale
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# a NumPy array, or a list of tuples when NumPy is not installed
+Decoded = Any
+
+Buffer = bytes | bytearray | memoryview
+
+# number of int16 values of each vector sensor
+_VECTOR_SIZES: dict[Sensor, int] = {
+    Sensor.ACCELEROMETER: 3,
+    Sensor.MAGNETOMETER: 3,
+    Sensor.GYROSCOPE: 3,
+    Sensor.EULER: 3,
+    Sensor.QUATERNION: 4,
+    Sensor.LINEAR_ACCEL: 3,
+    Sensor.GRAVITY: 3,
+}
+
+
+# scale factor of every sensor in `sensors` under the given units
+def scales_of(sensors: Sensor, scale: UnitScale) -> dict[Sensor, float]:
+    table = {
+        Sensor.ACCELEROMETER: scale.acceleration,
+        Sensor.MAGNETOMETER: scale.magnetometer,
+        Sensor.GYROSCOPE: scale.gyroscope,
+        Sensor.EULER: scale.euler,
+        Sensor.QUATERNION: scale.quaternion,
+        Sensor.LINEAR_ACCEL: scale.acceleration,
+        Sensor.GRAVITY: scale.acceleration,
+        Sensor.TEMPERATURE: scale.temperature,
+        Sensor.CALIBRATION: 1.0,
+    }
+    return {s: v for s, v in table.items() if s in sensors}
+
+
+# (N, k) values out of N back-to-back blocks of k little-endian int16, times `scale`
+def decode_i16(data: Buffer, k: int, scale: float = 1.0, dtype: str = "float64") -> Decoded:
+    if len(data) % (2 * k) != 0:
+        raise ValueError(f"buffer length {len(data)} is not a multiple of {2 * k}")
+    if HAS_NUMPY:
+        values = np.frombuffer(data, dtype="<i2").reshape(-1, k)
+        return values.astype(dtype) * np.asarray(scale, dtype=dtype)
+    return [tuple(v * scale for v in block) for block in struct.iter_unpack(f"<{k}h", data)]
+
+
+# decode N back-to-back spans as read by BNO055.read_snapshot(sensors) into one array per sensor
+# vectors are (N, k), temperature is (N,) and calibration status is (N, 4) as (mag, acc, gyr, sys)
+# (the pure Python fallback gives temperature as 1-tuples)
+# `data` may be a live buffer or a memory-mapped recording; it is not copied before decoding
+def decode_blocks(data: Buffer, sensors: Sensor, scale: UnitScale, dtype: str = "float64") -> dict[Sensor, Decoded]:
+    start, length = span_of(sensors)
+    if len(data) % length != 0:
+        raise ValueError(f"buffer length {len(data)} is not a multiple of span length {length}")
+    scales = scales_of(sensors, scale)
+    if HAS_NUMPY:
+        return _decode_blocks_numpy(data, start, length, scales, dtype)
+    return _decode_blocks_python(data, start, length, scales)
+
+
+def _decode_blocks_numpy(
+    data: Buffer, start: int, length: int, scales: dict[Sensor, float], dtype: str
+) -> dict[Sensor, "npt.NDArray[Any]"]:
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, length)
+    out: dict[Sensor, npt.NDArray[Any]] = {}
+    for sensor, s in scales.items():
+        offset = SENSOR_REGISTERS[sensor][0] - start
+        if sensor in _VECTOR_SIZES:
+            k = _VECTOR_SIZES[sensor]
+            values = np.ascontiguousarray(raw[:, offset : offset + 2 * k]).view("<i2")
+            out[sensor] = values.astype(dtype) * np.asarray(s, dtype=dtype)
+        elif sensor == Sensor.TEMPERATURE:
+            out[sensor] = raw[:, offset].view(np.int8).astype(dtype) * np.asarray(s, dtype=dtype)
+        else:
+            b = raw[:, offset]
+            out[sensor] = np.stack([(b >> 0) & 0b11, (b >> 2) & 0b11, (b >> 4) & 0b11, (b >> 6) & 0b11], axis=1)
+    return out
+
+
+def _decode_blocks_python(
+    data: Buffer, start: int, length: int, scales: dict[Sensor, float]
+) -> dict[Sensor, list[tuple[float, ...]]]:
+    out: dict[Sensor, list[tuple[float, ...]]] = {s: [] for s in scales}
+    view = memoryview(data).cast("B")
+    for base in range(0, len(view), length):
+        for sensor, s in scales.items():
+            offset = base + SENSOR_REGISTERS[sensor][0] - start
+            if sensor in _VECTOR_SIZES:
+                values: Sequence[int] = struct.unpack_from(f"<{_VECTOR_SIZES[sensor]}h", view, offset)
+                out[sensor].append(tuple(v * s for v in values))
+            elif sensor == Sensor.TEMPERATURE:
+                (t,) = struct.unpack_from("<b", view, offset)
+                out[sensor].append((t * s,))
+            else:
+                b = view[offset]
+                out[sensor].append(((b >> 0) & 0b11, (b >> 2) & 0b11, (b >> 4) & 0b11, (b >> 6) & 0b11))
+    return out
@@ -0,0 +1,224 @@
+# transaction count, latency and throughput of every read path, on hardware or on FakeSMBus
+
+import argparse
+import contextlib
+import json
+import platform
+import statistics
+import sys
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from time import perf_counter_ns
+from typing import Any
+
+from . import constants, modes
+from .bno055 import BNO055
+from .bus import FAKE_PORT, I2C_M_RD, SMBusLike, open_bus, parse_port
+from .snapshot import Sensor
+
+
+# forwards to `bus` and counts what goes over the wire
+class CountingBus:
+    def __init__(self, bus: SMBusLike) -> None:
+        self._bus = bus
+        self.transactions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def read_byte_data(self, i2c_addr: int, register: int, force: bool | None = None) -> int:
+        self.transactions += 1
+        self.bytes_read += 1
+        return self._bus.read_byte_data(i2c_addr, register, force)
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force: bool | None = None) -> None:
+        self.transactions += 1
+        self.bytes_written += 1
+        self._bus.write_byte_data(i2c_addr, register, value, force)
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force: bool | None = None) -> list[int]:
+        self.transactions += 1
+        self.bytes_read += length
+        return self._bus.read_i2c_block_data(i2c_addr, register, length, force)
+
+    def write_i2c_block_data(
+        self, i2c_addr: int, register: int, data: Sequence[int], force: bool | None = None
+    ) -> None:
+        self.transactions += 1
+        self.bytes_written += len(data)
+        self._bus.write_i2c_block_data(i2c_addr, register, data, force)
+
+    def i2c_rdwr(self, *i2c_msgs: Any) -> None:
+        self.transactions += 1
+        for msg in i2c_msgs:
+            if msg.flags & I2C_M_RD:
+                self.bytes_read += msg.len
+            else:
+                self.bytes_written += msg.len
+        self._bus.i2c_rdwr(*i2c_msgs)  # type: ignore[attr-defined]
+
+    def close(self) -> None:
+        self._bus.close()
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    iterations: int
+    errors: int
+    transactions_per_call: float
+    bytes_per_call: float
+    p50_us: float
+    p99_us: float
+    mean_us: float
+    samples_per_sec: float
+
+
+def _imu_cycle(bno055: BNO055) -> None:
+    # what scripts.imu did before read_snapshot
+    bno055.read_accelerometer()
+    bno055.read_linear_accel()
+    bno055.read_gravity()
+    bno055.read_euler()
+
+
+_IMU_SENSORS = Sensor.ACCELEROMETER | Sensor.LINEAR_ACCEL | Sensor.GRAVITY | Sensor.EULER
+
+CASES: dict[str, Callable[[BNO055], object]] = {
+    "read_raw_euler_data": BNO055.read_raw_euler_data,
+    "read_euler": BNO055.read_euler,
+    "read_accelerometer": BNO055.read_accelerometer,
+    "read_gyroscope": BNO055.read_gyroscope,
+    "read_magnetometer": BNO055.read_magnetometer,
+    "read_quaternion": BNO055.read_quaternion,
+    "read_linear_accel": BNO055.read_linear_accel,
+    "read_gravity": BNO055.read_gravity,
+    "read_temperature": BNO055.read_temperature,
+    "read_calibration_status": BNO055.read_calibration_status,
+    "read_imu": BNO055.read_imu,
+    "read_fusion": BNO055.read_fusion,
+    "imu_cycle": _imu_cycle,
+    "read_snapshot(imu)": lambda b: b.read_snapshot(_IMU_SENSORS),
+    "read_snapshot(fusion)": lambda b: b.read_snapshot(Sensor.FUSION),
+    "read_snapshot(all)": lambda b: b.read_snapshot(Sensor.ALL),
+}
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_case(
+    bno055: BNO055, bus: CountingBus, name: str, func: Callable[[BNO055], object], iterations: int, warmup: int = 10
+) -> BenchResult:
+    for _ in range(warmup):
+        with contextlib.suppress(OSError):
+            func(bno055)
+    transactions, bytes_read, bytes_written = bus.transactions, bus.bytes_read, bus.bytes_written
+    latencies: list[float] = []
+    errors = 0
+    for _ in range(iterations):
+        start = perf_counter_ns()
+        try:
+            func(bno055)
+        except OSError:
+            errors += 1
+            continue
+        latencies.append((perf_counter_ns() - start) / 1000)
+    latencies.sort()
+    mean = statistics.fmean(latencies) if latencies else 0.0
+    return BenchResult(
+        name=name,
+        iterations=iterations,
+        errors=errors,
+        transactions_per_call=(bus.transactions - transactions) / iterations,
+        bytes_per_call=(bus.bytes_read + bus.bytes_written - bytes_read - bytes_written) / iterations,
+        p50_us=_percentile(latencies, 0.50),
+        p99_us=_percentile(latencies, 0.99),
+        mean_us=mean,
+        samples_per_sec=1e6 / mean if mean > 0 else 0.0,
+    )
+
+
+def run(
+    bno055: BNO055, bus: CountingBus, iterations: int = 1000, cases: Sequence[str] | None = None
+) -> list[BenchResult]:
+    names = list(CASES) if cases is None else list(cases)
+    return [run_case(bno055, bus, name, CASES[name], iterations) for name in names]
+
+
+_MODE_NAMES = [name for name, value in vars(modes).items() if name.isupper() and isinstance(value, int)]
+
+
+def _driver_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("rpi_bno055")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+# bno055-bench
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bno055-bench")
+    parser.add_argument("--address", type=lambda v: int(v, 0), default=constants.DEFAULT_ADDRESS)
+    parser.add_argument(
+        "--port", type=parse_port, default=constants.DEFAULT_I2C_PORT, help=f"I2C bus, or '{FAKE_PORT}' to simulate"
+    )
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--case", action="append", choices=list(CASES), help="run only these cases")
+    parser.add_argument("--mode", type=str.upper, default="NDOF", choices=_MODE_NAMES)
+    parser.add_argument("--label", default="", help="free text stored in the result, e.g. the bus clock")
+    parser.add_argument("--output", help="write results as JSON to this file instead of stdout")
+    parser.add_argument("--fake-latency", type=float, default=0.0, help="seconds per simulated transaction")
+    parser.add_argument("--fake-byte-latency", type=float, default=0.0, help="seconds per simulated byte")
+    parser.add_argument("--rdwr", action="store_true", help="read spans with combined i2c_rdwr transfers")
+    parser.add_argument("--trace", metavar="PATH", help="write a Chrome trace of every transaction to PATH")
+    args = parser.parse_args(argv)
+
+    if args.port == FAKE_PORT:
+        from .fake import FakeSMBus
+
+        raw_bus: SMBusLike = FakeSMBus(
+            args.address, reset_delay=0.0, latency=args.fake_latency, byte_latency=args.fake_byte_latency
+        )
+    else:
+        raw_bus = open_bus(args.port)
+    bus = CountingBus(raw_bus)
+    tracer = None
+    if args.trace:
+        from .trace import Tracer
+
+        tracer = Tracer()
+    bno055 = BNO055(args.address, bus, rdwr=args.rdwr, tracer=tracer)
+    bno055.begin()
+    bno055.write_mode(getattr(modes, args.mode))
+    results = run(bno055, bus, args.iterations, args.case)
+
+    report = {
+        "driver_version": _driver_version(),
+        "python": platform.python_version(),
+        "port": str(args.port),
+        "mode": args.mode,
+        "label": args.label,
+        "rdwr": args.rdwr,
+        "iterations": args.iterations,
+        "results": [asdict(r) for r in results],
+    }
+    if tracer is not None:
+        tracer.write_chrome_trace(args.trace)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for r in results:
+        print(
+            f"{r.name:24} {r.transactions_per_call:5.1f} tx {r.bytes_per_call:6.1f} B "
+            f"p50 {r.p50_us:8.1f} us p99 {r.p99_us:8.1f} us {r.samples_per_sec:9.1f} /s",
+            file=sys.stderr,
+        )
@@ -1,38 +1,296 @@
-from collections.abc import Sequence
+import struct
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import replace
+from time import monotonic, monotonic_ns, perf_counter, sleep
+from typing import TypeVar, cast
 
 import smbus2
 
+from .axis_remap import AxisRemap
+from .boot import BootPath, BootReport
+from .bus import RdwrBus, RdwrReader, SMBusLike
+from .calibration import PROFILE_LENGTH, PROFILE_START, CalibrationProfile
+from .interrupts import EdgeSource
 from .modes import OperatingMode
+from .policy import IOPolicy, IOStats
 from .power_modes import PowerMode
 from .regaddrs0 import RegisterAddress
+from .samples import CalibrationStatus, FloatBuffer, FusionSample, ImuSample, scale_i16_into
+from .sensor_config import AccConfig, GyrConfig, MagConfig
+from .snapshot import Snapshot, decode_snapshot, span_of
 from .sys_err_codes import SysErrCode
 from .sys_status_codes import SysStatusCode
+from .trace import Outcome, TraceOp, Tracer
+from .unit_sel import MAGNETOMETER_SCALE, QUATERNION_SCALE
 
+_T = TypeVar("_T")
 
-def _bytes_to_i16s(seq: Sequence[int], length: int) -> list[int]:
-    return [int.from_bytes(seq[i : i + 2], byteorder="little", signed=True) for i in range(0, length * 2, 2)]
+# EUL_HEADING_LSB to GRV_DATA_Z_MSB
+_FUSION_LENGTH = 26
+
+
+def _bytes_to_i16s(seq: Sequence[int], length: int) -> tuple[int, ...]:
+    return struct.unpack_from(f"<{length}h", bytes(seq))
+
+
+def _check_range(name: str, value: int, maximum: int) -> None:
+    if not 0 <= value <= maximum:
+        raise ValueError(f"{name} must be in 0..{maximum}: {value}")
 
 
 class BNO055:
-    from . import constants, modes, power_modes, regaddrs0, sys_err_codes, sys_status_codes
+    from . import (
+        axis_remap,
+        constants,
+        modes,
+        power_modes,
+        regaddrs0,
+        regaddrs1,
+        sensor_config,
+        sys_err_codes,
+        sys_status_codes,
+    )
+    from .axis_remap import AxisRemap, RemapAxis
     from .constants import SysTriggerFlag
-    from .unit_sel import UnitSelection
-
-    def __init__(self, bno055_address: int = constants.DEFAULT_ADDRESS, bus: smbus2.SMBus | None = None):
+    from .interrupts import Axis, InterruptFlag
+    from .snapshot import Sensor
+    from .unit_sel import UnitScale, UnitSelection
+
+    # units_strict_every: re-read UNIT_SEL every N scaled reads instead of trusting the cache forever
+    # policy: retries and backoff of failed bus transactions, see IOPolicy
+    # rdwr: read spans with combined i2c_rdwr transfers instead of 32-byte SMBus block reads, see RdwrReader
+    # tracer: record every transaction and wait on a timeline, see Tracer
+    def __init__(
+        self,
+        bno055_address: int = constants.DEFAULT_ADDRESS,
+        bus: SMBusLike | None = None,
+        units_strict_every: int | None = None,
+        policy: IOPolicy | None = None,
+        rdwr: bool = False,
+        tracer: Tracer | None = None,
+    ):
         self._i2c = bus or smbus2.SMBus(self.__class__.constants.DEFAULT_I2C_PORT)
         self._address = bno055_address
-
+        self._reader: RdwrReader | None = None
+        if rdwr:
+            self._reader = RdwrReader(cast(RdwrBus, self._i2c), bno055_address)
+        self.policy = policy or IOPolicy()
+        # None disables tracing; set or replace it at any time
+        self.tracer = tracer
+        self._stats = IOStats()
+        # cached UNIT_SEL value and its scale table, None until first read
+        self._unit_sel_value: int | None = None
+        self._unit_scale: BNO055.UnitScale | None = None
+        self._units_strict_every = units_strict_every
+        self._unit_reads = 0
+        # cached AXIS_MAP_CONFIG + AXIS_MAP_SIGN, None until first read
+        self._axis_remap: AxisRemap | None = None
+        # last PAGE_ID written, None when unknown
+        self._page: int | None = None
+        # duration of the last RST_SYS, used to time the polls of the next one
+        self._reset_time = BNO055.constants.RESET_TIME
+        # time.monotonic_ns() around the last successful transaction, see read_time
+        self._transfer_begin = 0
+        self._transfer_end = 0
+
+    # the underlying bus; replacing it (e.g. from IOPolicy.recover) forgets the selected page
+    @property
+    def bus(self) -> SMBusLike:
+        return self._i2c
+
+    @bus.setter
+    def bus(self, bus: SMBusLike) -> None:
+        self._i2c = bus
+        self._page = None
+        if self._reader is not None:
+            self._reader = RdwrReader(cast(RdwrBus, bus), self._address)
+
+    # whether spans are read with i2c_rdwr
+    @property
+    def rdwr(self) -> bool:
+        return self._reader is not None
+
+    # copy of the transaction counters since construction or the last reset_stats()
+    def stats(self) -> IOStats:
+        return replace(self._stats)
+
+    def reset_stats(self) -> None:
+        self._stats = IOStats()
+
+    # run one bus transaction under self.policy; every attempt is traced as `op`
+    def _transfer(self, func: Callable[[], _T], op: TraceOp, register: int, length: int) -> _T:
+        policy = self.policy
+        stats = self._stats
+        start = perf_counter()
+        attempt = 0
+        try:
+            while True:
+                stats.transactions += 1
+                tracer = self.tracer
+                begin = monotonic_ns()
+                try:
+                    result = func()
+                except OSError as e:
+                    if tracer is not None:
+                        tracer.record(op, begin, monotonic_ns(), register, self._page, length, Outcome.ERROR)
+                    stats.errors += 1
+                    stats.last_error = e
+                    if attempt >= policy.retries:
+                        stats.failures += 1
+                        raise
+                    delay = policy.delay(attempt)
+                    if policy.deadline is not None and perf_counter() - start + delay > policy.deadline:
+                        stats.failures += 1
+                        raise
+                    if policy.recover is not None:
+                        stats.recoveries += 1
+                        policy.recover(self, e)
+                    self._sleep(TraceOp.BACKOFF, delay)
+                    stats.backoff_time += delay
+                    stats.retries += 1
+                    attempt += 1
+                else:
+                    end = monotonic_ns()
+                    self._transfer_begin = begin
+                    self._transfer_end = end
+                    if tracer is not None:
+                        tracer.record(op, begin, end, register, self._page, length)
+                    return result
+        finally:
+            stats.io_time += perf_counter() - start
+
+    # sleep, traced as `op`
+    def _sleep(self, op: TraceOp, seconds: float) -> None:
+        tracer = self.tracer
+        if tracer is None:
+            sleep(seconds)
+            return
+        begin = monotonic_ns()
+        sleep(seconds)
+        tracer.record(op, begin, monotonic_ns())
+
+    # trace the block as `op`, with Outcome.ERROR when it raises
+    @contextmanager
+    def _traced(self, op: TraceOp) -> Iterator[None]:
+        tracer = self.tracer
+        if tracer is None:
+            yield
+            return
+        begin = monotonic_ns()
+        outcome = Outcome.ERROR
+        try:
+            yield
+            outcome = Outcome.OK
+        finally:
+            tracer.record(op, begin, monotonic_ns(), outcome=outcome)
+
+    # register accesses below select `page` first; PAGE_ID itself is mapped on both pages
     # section 4.6, figure 6
-    def write_byte(self, register: RegisterAddress, value: int) -> None:
-        self._i2c.write_byte_data(self._address, register, value)
+    def write_byte(self, register: RegisterAddress, value: int, page: int = 0) -> None:
+        if register == BNO055.regaddrs0.PAGE_ID:
+            self._page = None
+            self._transfer(
+                lambda: self._i2c.write_byte_data(self._address, register, value), TraceOp.WRITE_BYTE, register, 1
+            )
+            self._page = value
+            return
+        self.select_page(page)
+        self._transfer(
+            lambda: self._i2c.write_byte_data(self._address, register, value), TraceOp.WRITE_BYTE, register, 1
+        )
 
     # section 4.6, figure 7
-    def read_byte(self, register: RegisterAddress) -> int:
-        return self._i2c.read_byte_data(self._address, register)
+    def read_byte(self, register: RegisterAddress, page: int = 0) -> int:
+        if register != BNO055.regaddrs0.PAGE_ID:
+            self.select_page(page)
+        return self._transfer(lambda: self._i2c.read_byte_data(self._address, register), TraceOp.READ_BYTE, register, 1)
 
     # section 4.6, figure 7
-    def read_block(self, register: RegisterAddress, length: int) -> list[int]:
-        return self._i2c.read_i2c_block_data(self._address, register, length)
+    def read_block(self, register: RegisterAddress, length: int, page: int = 0) -> list[int]:
+        self.select_page(page)
+        return self._transfer(
+            lambda: self._i2c.read_i2c_block_data(self._address, register, length), TraceOp.READ_BLOCK, register, length
+        )
+
+    # section 4.6, figure 6
+    def write_block(self, register: RegisterAddress, data: Sequence[int], page: int = 0) -> None:
+        self.select_page(page)
+        values = list(data)
+        self._transfer(
+            lambda: self._i2c.write_i2c_block_data(self._address, register, values),
+            TraceOp.WRITE_BLOCK,
+            register,
+            len(values),
+        )
+
+    # read `length` bytes from `register` onwards in as few block reads as possible
+    # one transaction of any length with rdwr
+    def read_span(self, register: RegisterAddress, length: int, page: int = 0) -> Sequence[int]:
+        if self._reader is not None:
+            return bytes(self.read_span_view(register, length, page))
+        block_max = BNO055.constants.I2C_BLOCK_MAX
+        if length <= block_max:
+            return self.read_block(register, length, page)
+        buf: list[int] = []
+        begin = None
+        for offset in range(0, length, block_max):
+            chunk = min(block_max, length - offset)
+            buf += self.read_block(RegisterAddress(register + offset), chunk, page)
+            if begin is None:
+                begin = self._transfer_begin
+        # read_time spans all the block reads
+        assert begin is not None
+        self._transfer_begin = begin
+        return buf
+
+    # time.monotonic() halfway through the last successful transaction (all block reads of a read_span),
+    # i.e. of the read whose result was returned last; the bytes leave the chip somewhere within the
+    # transaction, so the midpoint is off by at most half its duration, whereas a timestamp taken after
+    # the read also carries the return from the kernel, retries and any scheduling delay
+    @property
+    def read_time(self) -> float:
+        return (self._transfer_begin + self._transfer_end) / 2e9
+
+    # read_span without copying: with rdwr, a view of the receive buffer which the next read overwrites,
+    # so decode or copy it before reading again
+    def read_span_view(self, register: RegisterAddress, length: int, page: int = 0) -> memoryview:
+        if self._reader is None:
+            return memoryview(bytes(self.read_span(register, length, page)))
+        self.select_page(page)
+        return self._transfer(lambda: self._read_rdwr(register, length), TraceOp.RDWR, register, length)
+
+    # out[offset:offset + length] = read_span(register, length, page), without building a bytes object
+    # in between: with rdwr, the receive buffer is copied straight into `out`
+    def read_span_into(
+        self, register: RegisterAddress, length: int, out: bytearray, offset: int = 0, page: int = 0
+    ) -> None:
+        if offset < 0 or offset + length > len(out):
+            raise IndexError(f"{length} bytes do not fit at offset {offset} of a buffer of {len(out)}")
+        if self._reader is None:
+            out[offset : offset + length] = self.read_span(register, length, page)
+            return
+        self.select_page(page)
+        out[offset : offset + length] = self._transfer(
+            lambda: self._read_rdwr(register, length), TraceOp.RDWR, register, length
+        )
+
+    # looked up on every attempt, since IOPolicy.recover may replace the bus and with it the reader
+    def _read_rdwr(self, register: RegisterAddress, length: int) -> memoryview:
+        reader = self._reader
+        assert reader is not None
+        return reader.read(register, length)
+
+    # write PAGE_ID unless `page` is already selected
+    # section 4.2, 4.3.7
+    def select_page(self, page: int) -> None:
+        if self._page != page:
+            self.write_byte(BNO055.regaddrs0.PAGE_ID, page)
+
+    # the page currently selected, as far as this instance knows
+    @property
+    def page(self) -> int | None:
+        return self._page
 
     # section 3.3, table 3-5
     def write_mode(self, mode: OperatingMode) -> None:
@@ -50,6 +308,83 @@ class BNO055:
     def read_power_mode(self) -> PowerMode:
         return PowerMode(self.read_byte(BNO055.regaddrs0.PWR_MODE))
 
+    # switch to CONFIG mode for the duration of the block and restore the previous mode afterwards
+    # section 3.3, table 3-6
+    @contextmanager
+    def config_mode(self) -> Iterator[None]:
+        mode = OperatingMode(self.read_mode() & 0b1111)
+        if mode == BNO055.modes.CONFIG:
+            yield
+            return
+        self.write_mode(BNO055.modes.CONFIG)
+        self._sleep(TraceOp.MODE_SWITCH, BNO055.modes.CONFIG_SWITCH_TIME)
+        try:
+            yield
+        finally:
+            self.write_mode(mode)
+            self._sleep(TraceOp.MODE_SWITCH, BNO055.modes.OPERATION_SWITCH_TIME)
+
+    # page 1 registers are only writable in CONFIG mode
+    # accesses inside the block pass page=1; page 0 is selected again afterwards
+    # section 4.2.2
+    @contextmanager
+    def _page1(self) -> Iterator[None]:
+        with self.config_mode():
+            try:
+                yield
+            finally:
+                self.select_page(0)
+
+    # write any of the sensor configurations with a single CONFIG mode and page switch
+    # only effective in non-fusion modes
+    # section 3.5, 4.4.2 - 4.4.5
+    def configure_sensors(
+        self, acc: AccConfig | None = None, gyr: GyrConfig | None = None, mag: MagConfig | None = None
+    ) -> None:
+        with self._page1():
+            if acc is not None:
+                self.write_byte(BNO055.regaddrs1.ACC_CONFIG, acc.value, page=1)
+            if mag is not None:
+                self.write_byte(BNO055.regaddrs1.MAG_CONFIG, mag.value, page=1)
+            if gyr is not None:
+                self.write_byte(BNO055.regaddrs1.GYR_CONFIG_0, gyr.value0, page=1)
+                self.write_byte(BNO055.regaddrs1.GYR_CONFIG_1, gyr.value1, page=1)
+
+    # (ACC_Config, GYR_Config_0 + GYR_Config_1, MAG_Config) in one block read
+    # section 4.4.2 - 4.4.5
+    def read_sensor_config(self) -> tuple[AccConfig, GyrConfig, MagConfig]:
+        acc, mag, gyr0, gyr1 = self.read_block(BNO055.regaddrs1.ACC_CONFIG, 4, page=1)
+        return (
+            BNO055.sensor_config.AccConfig.from_value(acc),
+            BNO055.sensor_config.GyrConfig.from_values(gyr0, gyr1),
+            BNO055.sensor_config.MagConfig.from_value(mag),
+        )
+
+    # AXIS_MAP_CONFIG and AXIS_MAP_SIGN in one block write, switching to CONFIG mode for it
+    # section 3.4, 4.3.61, 4.3.62
+    def write_axis_remap(self, remap: AxisRemap) -> None:
+        with self.config_mode():
+            self.write_block(BNO055.regaddrs0.AXIS_MAP_CONFIG, [remap.config_value, remap.sign_value])
+        self._axis_remap = remap
+
+    # served from the cache; use refresh_axis_remap() to force a register read
+    # section 3.4, 4.3.61, 4.3.62
+    def read_axis_remap(self) -> AxisRemap:
+        if self._axis_remap is None:
+            return self.refresh_axis_remap()
+        return self._axis_remap
+
+    # section 3.4, 4.3.61, 4.3.62
+    def refresh_axis_remap(self) -> AxisRemap:
+        config, sign = self.read_block(BNO055.regaddrs0.AXIS_MAP_CONFIG, 2)
+        self._axis_remap = BNO055.AxisRemap.from_values(config, sign)
+        return self._axis_remap
+
+    # 16 bytes, UNIQUE_ID_FIRST first
+    # section 4.4.1, table 4-3
+    def read_unique_id(self) -> bytes:
+        return bytes(self.read_block(BNO055.regaddrs1.UNIQUE_ID_FIRST, 16, page=1))
+
     # section 3.8, 4.3.55
     # (Accelerometer, Magnetometer, Gyroscope, Microcontroller)
     # True: pass
@@ -63,13 +398,47 @@ class BNO055:
         return (acc, mag, gyr, mcu)
 
     # section 3.6.1
+    # served from the cache; use refresh_units() to force a register read
     def read_unit_selection(self) -> UnitSelection:
-        buf = self.read_byte(BNO055.regaddrs0.UNIT_SEL)
-        return BNO055.UnitSelection.from_value(buf)
+        if self._unit_sel_value is None:
+            return self.refresh_units()
+        return BNO055.UnitSelection.from_value(self._unit_sel_value)
 
     # section 3.6.1
     def write_unit_selection(self, unit_sel: UnitSelection) -> None:
         self.write_byte(BNO055.regaddrs0.UNIT_SEL, unit_sel.value)
+        self._cache_units(unit_sel.value)
+
+    # re-read UNIT_SEL, e.g. when another process may have changed it
+    # section 3.6.1
+    def refresh_units(self) -> UnitSelection:
+        buf = self.read_byte(BNO055.regaddrs0.UNIT_SEL)
+        self._cache_units(buf)
+        return BNO055.UnitSelection.from_value(buf)
+
+    # drop the cached UNIT_SEL; the next scaled read fetches it again
+    def invalidate_units(self) -> None:
+        self._unit_sel_value = None
+        self._unit_scale = None
+
+    # scale table for the current unit selection
+    def unit_scale(self) -> UnitScale:
+        scale = self._unit_scale
+        strict = self._units_strict_every
+        if strict is not None:
+            self._unit_reads += 1
+            if self._unit_reads >= strict:
+                scale = None
+        if scale is None:
+            self.refresh_units()
+            assert self._unit_scale is not None
+            scale = self._unit_scale
+        return scale
+
+    def _cache_units(self, value: int) -> None:
+        self._unit_sel_value = value
+        self._unit_scale = BNO055.UnitScale.from_value(value)
+        self._unit_reads = 0
 
     # section 3.6.1
     def update_unit_selection(self, val: UnitSelection.UnitsType) -> None:
@@ -77,6 +446,8 @@ class BNO055:
         self.write_unit_selection(unit_sel.set(val))
 
     def begin(self) -> None:
+        self.invalidate_units()
+        self._axis_remap = None
         assert self.read_byte(BNO055.regaddrs0.CHIP_ID) == 0xA0
         self.write_mode(BNO055.modes.CONFIG)
         assert self.read_byte(BNO055.regaddrs0.CHIP_ID) == 0xA0
@@ -119,7 +490,7 @@ class BNO055:
     # (QUA_DATA_W, QUA_DATA_X, QUA_DATA_Y, QUA_DATA_Z)
     # section 3.6.5.5, table 3-30
     def read_raw_quaternion_data(self) -> tuple[int, int, int, int]:
-        buf = self.read_block(BNO055.regaddrs0.QUA_DATA_W_LSB, 6)
+        buf = self.read_block(BNO055.regaddrs0.QUA_DATA_W_LSB, 8)
         w, x, y, z = _bytes_to_i16s(buf, 4)
         return (w, x, y, z)
 
@@ -146,13 +517,8 @@ class BNO055:
     # (mag, acc, gyr, sys)
     # 0 to 3; 3 indicates fully calibrated
     # section 3.10, 4.3.54
-    def read_calibration_status(self) -> tuple[int, int, int, int]:
-        buf = self.read_byte(BNO055.regaddrs0.CALIB_STAT)
-        mag = (buf >> 0) & 0b11
-        acc = (buf >> 2) & 0b11
-        gyr = (buf >> 4) & 0b11
-        sys = (buf >> 6) & 0b11
-        return (mag, acc, gyr, sys)
+    def read_calibration_status(self) -> CalibrationStatus:
+        return CalibrationStatus.from_value(self.read_byte(BNO055.regaddrs0.CALIB_STAT))
 
     # section 4.3.58
     def read_system_status_code(self) -> SysStatusCode:
@@ -196,89 +562,420 @@ class BNO055:
         radius, *_ = _bytes_to_i16s(buf, 1)
         return radius
 
-    def system_trigger(self, trigger: SysTriggerFlag) -> None:
-        from time import sleep
-
-        self.write_byte(BNO055.regaddrs0.SYS_TRIGGER, trigger)
-        # ensure triggering
+    # all offsets and radii in one block read; the chip is put in CONFIG mode meanwhile
+    # section 3.11.4
+    def read_calibration_profile(self) -> CalibrationProfile:
+        with self.config_mode():
+            buf = self.read_block(RegisterAddress(PROFILE_START), PROFILE_LENGTH)
+        return CalibrationProfile.from_bytes(bytes(buf))
+
+    # restore a profile taken by read_calibration_profile in one block write
+    # section 3.11.4
+    def write_calibration_profile(self, profile: CalibrationProfile) -> None:
+        with self.config_mode():
+            self.write_block(RegisterAddress(PROFILE_START), profile.to_bytes())
+
+    # wait until the chip answers with its CHIP_ID again; raises TimeoutError after `timeout` seconds
+    # section 3.2, 4.3.63
+    def system_trigger(self, trigger: SysTriggerFlag, timeout: float = 2.0) -> None:
+        start = monotonic()
+        reset = bool(trigger & BNO055.SysTriggerFlag.RST_SYS)
+        with self._traced(TraceOp.SYSTEM_TRIGGER):
+            self.write_byte(BNO055.regaddrs0.SYS_TRIGGER, trigger)
+            # the chip does not answer for most of the reset, so do not start polling before then
+            self.wait_ready(timeout, holdoff=0.8 * self._reset_time if reset else 0.0)
+            if reset:
+                self._reset_time = monotonic() - start
+            self.write_byte(BNO055.regaddrs0.SYS_TRIGGER, BNO055.SysTriggerFlag.NO_TRIGGER)
+        if reset:
+            # UNIT_SEL, AXIS_MAP_* and PAGE_ID are back to their reset values
+            self.invalidate_units()
+            self._axis_remap = None
+            self._page = 0
+
+    # poll until the chip answers with its CHIP_ID and SYS_STATUS has left the init and selftest states
+    # polls start `holdoff` seconds from now, 1 ms apart, and back off to 16 ms; raises TimeoutError
+    # after `timeout` seconds. the bus is polled directly rather than through self.policy, which
+    # would count the expected errors and back off on top of the poll interval
+    # section 4.3.58
+    def wait_ready(self, timeout: float = 2.0, holdoff: float = 0.0) -> None:
+        with self._traced(TraceOp.WAIT_READY):
+            self._poll_ready(timeout, holdoff)
+
+    def _poll_ready(self, timeout: float, holdoff: float) -> None:
+        regaddrs0 = BNO055.regaddrs0
+        busy = (
+            BNO055.sys_status_codes.PERIPHERALS_INIT,
+            BNO055.sys_status_codes.SYSTEM_INIT,
+            BNO055.sys_status_codes.EXEC_SELFTEST,
+        )
+        end = monotonic() + timeout
+        if holdoff > 0:
+            sleep(min(holdoff, timeout))
+        interval = 0.001
         while True:
             try:
-                id = self.read_byte(BNO055.regaddrs0.CHIP_ID)
-                if id == BNO055.constants.BNO055_CHIP_ID:
-                    break
+                if self._page != 0:
+                    self._i2c.write_byte_data(self._address, regaddrs0.PAGE_ID, 0)
+                    self._page = 0
+                chip_id = self._i2c.read_byte_data(self._address, regaddrs0.CHIP_ID)
+                if (
+                    chip_id == BNO055.constants.BNO055_CHIP_ID
+                    and self._i2c.read_byte_data(self._address, regaddrs0.SYS_STATUS) not in busy
+                ):
+                    return
             except OSError:
-                pass
-            # for debug
-            # print("BNO055.system_trigger: waiting...")
-            sleep(0.05)
-        self.write_byte(BNO055.regaddrs0.SYS_TRIGGER, BNO055.SysTriggerFlag.NO_TRIGGER)
+                self._page = None
+            if monotonic() >= end:
+                raise TimeoutError(f"BNO055 not ready within {timeout} s")
+            sleep(min(interval, max(0.0, end - monotonic())))
+            interval = min(interval * 2, 0.016)
+
+    # bring the chip into `mode` with `units` and the calibration `profile` with as few transactions
+    # as possible, and read the first sample:
+    #  - nothing is written when it already runs `mode` in `units` and is calibrated
+    #   (fusion modes: system calibration status 3; other modes do not need calibration)
+    #  - otherwise only what differs is written, the profile only when the chip is not calibrated
+    #  - RST_SYS is triggered first only when `reset` is set or SYS_STATUS reports an error
+    # section 3.3, 3.6.1, 3.11.4, 4.3.58
+    def fast_boot(
+        self,
+        mode: OperatingMode,
+        units: UnitSelection | None = None,
+        profile: CalibrationProfile | None = None,
+        reset: bool = False,
+        sensors: Sensor = Sensor.ALL,
+        timeout: float = 2.0,
+        axis_remap: AxisRemap | None = None,
+    ) -> BootReport:
+        modes = BNO055.modes
+        regaddrs0 = BNO055.regaddrs0
+        start = monotonic()
+        transactions = self._stats.transactions
+        self.invalidate_units()
+        self._axis_remap = None
+        self.wait_ready(timeout)
+        # SYS_STATUS, SYS_ERR, UNIT_SEL, reserved, OPR_MODE, PWR_MODE, SYS_TRIGGER, TEMP_SOURCE,
+        # AXIS_MAP_CONFIG, AXIS_MAP_SIGN: still a single transaction
+        status, _, unit_sel, _, opr_mode, _, _, _, *remap = self.read_block(regaddrs0.SYS_STATUS, 10)
+        opr_mode &= 0b1111
+        want_remap = remap if axis_remap is None else [axis_remap.config_value, axis_remap.sign_value]
+        calibration_status = CalibrationStatus.from_value(self.read_byte(regaddrs0.CALIB_STAT))
+        calibrated = mode < modes.IMU or calibration_status[3] == 3
+        want_units = unit_sel if units is None else units.value
+        if (
+            not reset
+            and status != BNO055.sys_status_codes.SYSTEM_ERROR
+            and opr_mode == mode
+            and unit_sel == want_units
+            and remap == want_remap
+            and calibrated
+        ):
+            path = BootPath.SKIPPED
+        else:
+            path = BootPath.RESTORED
+            if reset or status == BNO055.sys_status_codes.SYSTEM_ERROR:
+                path = BootPath.RESET
+                self.system_trigger(BNO055.SysTriggerFlag.RST_SYS, timeout)
+                unit_sel = self.read_byte(regaddrs0.UNIT_SEL)
+                want_units = unit_sel if units is None else units.value
+                # AXIS_MAP_* reset values, P1
+                remap = [0x24, 0x00]
+                want_remap = remap if axis_remap is None else want_remap
+                opr_mode = modes.CONFIG
+                calibrated = mode < modes.IMU
+            if opr_mode != modes.CONFIG:
+                self.write_mode(modes.CONFIG)
+                self._sleep(TraceOp.MODE_SWITCH, modes.CONFIG_SWITCH_TIME)
+            if unit_sel != want_units:
+                self.write_byte(regaddrs0.UNIT_SEL, want_units)
+            if remap != want_remap:
+                self.write_block(regaddrs0.AXIS_MAP_CONFIG, want_remap)
+            if profile is not None and not calibrated:
+                self.write_block(RegisterAddress(PROFILE_START), profile.to_bytes())
+            if mode != modes.CONFIG:
+                self.write_mode(mode)
+                self._sleep(TraceOp.MODE_SWITCH, modes.OPERATION_SWITCH_TIME)
+        self._cache_units(want_units)
+        self._axis_remap = BNO055.AxisRemap.from_values(*want_remap)
+        end = start + timeout
+        while True:
+            try:
+                first_sample = self.read_snapshot(sensors)
+                break
+            except OSError:
+                if monotonic() >= end:
+                    raise
+                sleep(0.001)
+        time_to_first_sample = monotonic() - start
+        if path != BootPath.SKIPPED:
+            # the status read above describes the chip before the reset or the profile
+            calibration_status = CalibrationStatus.from_value(self.read_byte(regaddrs0.CALIB_STAT))
+        return BootReport(
+            path=path,
+            transactions=self._stats.transactions - transactions,
+            time_to_first_sample=time_to_first_sample,
+            calibration_status=calibration_status,
+            first_sample=first_sample,
+        )
+
+    # INT_STA
+    # section 3.7, 4.3.56
+    def read_interrupt_status(self) -> InterruptFlag:
+        return BNO055.InterruptFlag(self.read_byte(BNO055.regaddrs0.INT_STA))
+
+    # clear INT_STA and release the INT pin
+    # section 3.7, 4.3.63
+    def reset_interrupts(self) -> None:
+        self.system_trigger(BNO055.SysTriggerFlag.RST_INT)
+
+    # interrupts: set INT_STA bits when triggered
+    # pin: interrupts which also drive the INT pin
+    # section 3.7, 4.4.10, 4.4.11
+    def enable_interrupts(self, interrupts: InterruptFlag, pin: InterruptFlag | None = None) -> None:
+        if pin is None:
+            pin = interrupts
+        with self._page1():
+            self.write_byte(BNO055.regaddrs1.INT_MSK, pin, page=1)
+            self.write_byte(BNO055.regaddrs1.INT_EN, interrupts, page=1)
+
+    # threshold: 1 LSB = 3.91 mg at 2g range (scales with ACC range)
+    # duration: interrupt fires after duration + 1 consecutive samples over threshold (0 to 3)
+    # section 3.7.2.2, 4.4.12, 4.4.13
+    def configure_acc_any_motion(self, threshold: int, duration: int = 0, axes: Axis = Axis.ALL) -> None:
+        _check_range("threshold", threshold, 0xFF)
+        _check_range("duration", duration, 0b11)
+        with self._page1():
+            settings = self.read_byte(BNO055.regaddrs1.ACC_INT_SETTINGS, page=1)
+            settings = (settings & 0b1110_0000) | (axes << 2) | duration
+            self.write_byte(BNO055.regaddrs1.ACC_AM_THRES, threshold, page=1)
+            self.write_byte(BNO055.regaddrs1.ACC_INT_SETTINGS, settings, page=1)
+
+    # threshold: 1 LSB = 3.91 mg at 2g range (scales with ACC range)
+    # duration: see section 4.4.17 for the duration encoding (0 to 63)
+    # slow_motion: fire on slow motion instead of no motion
+    # section 3.7.2.1, 4.4.16, 4.4.17
+    def configure_acc_no_motion(
+        self, threshold: int, duration: int = 0, slow_motion: bool = False, axes: Axis = Axis.ALL
+    ) -> None:
+        _check_range("threshold", threshold, 0xFF)
+        _check_range("duration", duration, 0b11_1111)
+        with self._page1():
+            settings = self.read_byte(BNO055.regaddrs1.ACC_INT_SETTINGS, page=1)
+            settings = (settings & 0b1110_0011) | (axes << 2)
+            self.write_byte(BNO055.regaddrs1.ACC_NM_THRES, threshold, page=1)
+            self.write_byte(BNO055.regaddrs1.ACC_NM_SET, (duration << 1) | (0 if slow_motion else 1), page=1)
+            self.write_byte(BNO055.regaddrs1.ACC_INT_SETTINGS, settings, page=1)
+
+    # threshold: 1 LSB = 1 dps at 2000 dps range (scales with GYR range)
+    # slope_samples: (slope_samples + 1) * 4 samples are evaluated (0 to 3)
+    # awake_duration: 8, 16, 32 or 64 samples (0 to 3)
+    # section 3.7.3.1, 4.4.18, 4.4.26, 4.4.27
+    def configure_gyr_any_motion(
+        self,
+        threshold: int,
+        slope_samples: int = 0,
+        awake_duration: int = 0,
+        axes: Axis = Axis.ALL,
+        filtered: bool = True,
+    ) -> None:
+        _check_range("threshold", threshold, 0b0111_1111)
+        _check_range("slope_samples", slope_samples, 0b11)
+        _check_range("awake_duration", awake_duration, 0b11)
+        with self._page1():
+            settings = self.read_byte(BNO055.regaddrs1.GYR_INT_SETTING, page=1)
+            # AM_FILT is set to 1 for unfiltered data
+            settings = (settings & 0b1011_1000) | (0 if filtered else 0b0100_0000) | axes
+            self.write_byte(BNO055.regaddrs1.GYR_AM_THRES, threshold, page=1)
+            self.write_byte(BNO055.regaddrs1.GYR_AM_SET, (awake_duration << 2) | slope_samples, page=1)
+            self.write_byte(BNO055.regaddrs1.GYR_INT_SETTING, settings, page=1)
+
+    # block until any of `interrupts` is raised, then return INT_STA
+    # with `edge`, sleep on the INT pin; otherwise poll INT_STA every `poll_interval` seconds
+    # returns InterruptFlag.NONE on timeout; INT_STA is cleared afterwards when `reset` is set
+    # INT_STA is read before the first wait, since INT may already be asserted and then no edge comes;
+    # with `edge`, INT is released after any read without one of `interrupts`, since it stays asserted
+    # on other interrupts (or ones left by reset=False) and would never fire again
+    # section 3.7
+    def wait_for_interrupt(
+        self,
+        interrupts: InterruptFlag,
+        timeout: float | None = None,
+        edge: EdgeSource | None = None,
+        poll_interval: float = 0.01,
+        reset: bool = True,
+    ) -> InterruptFlag:
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            status = self.read_interrupt_status()
+            if status & interrupts:
+                if reset:
+                    self.reset_interrupts()
+                return status
+            if edge is not None:
+                self.reset_interrupts()
+            remaining = None if deadline is None else deadline - monotonic()
+            if remaining is not None and remaining < 0:
+                return BNO055.InterruptFlag.NONE
+            if edge is None:
+                sleep(poll_interval if remaining is None else min(poll_interval, remaining))
+            elif not edge.wait(remaining):
+                return BNO055.InterruptFlag.NONE
 
     # (acc_x, acc_y, acc_z)
     # section 3.6.4.1, table 3-17
     def read_accelerometer(self) -> tuple[float, float, float]:
         x, y, z = self.read_raw_acc_data()
-        unit_sel = self.read_unit_selection()
-        # 1 m/s^2 = 100 LSB, 1 mg = 1 LSB
-        scale = 1 / 100.0 if unit_sel.acceleration == BNO055.UnitSelection.ACC_MPS2 else 1 / 1.0
+        scale = self.unit_scale().acceleration
         return (x * scale, y * scale, z * scale)
 
     # (mag_x, mag_y, mag_z)
     # section 3.6.4.2, table 3-19
     def read_magnetometer(self) -> tuple[float, float, float]:
         x, y, z = self.read_raw_mag_data()
-        # 1 μT = 16 LSB
-        scale = 1 / 16.0
+        scale = MAGNETOMETER_SCALE
         return (x * scale, y * scale, z * scale)
 
     # (gyro_x, gyro_y, gyro_z)
     # section 3.6.4.3, table 3-22
     def read_gyroscope(self) -> tuple[float, float, float]:
         x, y, z = self.read_raw_gyro_data()
-        unit_sel = self.read_unit_selection()
-        # 1 dps = 16 LSB, 1 rps = 900 LSB
-        scale = 1 / 16.0 if unit_sel.gyroscope == BNO055.UnitSelection.GYR_DPS else 1 / 900.0
+        scale = self.unit_scale().gyroscope
         return (x * scale, y * scale, z * scale)
 
     # (euler_heading, euler_roll, euler_pitch)
     # section 3.6.5.4, table 3-29
     def read_euler(self) -> tuple[float, float, float]:
         heading, roll, pitch = self.read_raw_euler_data()
-        unit_sel = self.read_unit_selection()
-        # 1 degrees = 16 LSB, 1 radian = 900 LSB
-        scale = 1 / 16.0 if unit_sel.euler == BNO055.UnitSelection.EUL_DEGREES else 1 / 900.0
+        scale = self.unit_scale().euler
         return (heading * scale, roll * scale, pitch * scale)
 
     # (quat_w, quat_x, quat_y, quat_z)
     # section 3.6.5.5, table 3-31
     def read_quaternion(self) -> tuple[float, float, float, float]:
         w, x, y, z = self.read_raw_quaternion_data()
-        # 1 [unit less] = 2^14 LSB
-        scale = 1 / 0b0100_0000_0000_0000
+        scale = QUATERNION_SCALE
         return (w * scale, x * scale, y * scale, z * scale)
 
     # (lia_x, lia_y, lia_z)
     # section 3.6.5.6, table 3-33
     def read_linear_accel(self) -> tuple[float, float, float]:
         x, y, z = self.read_raw_lia_data()
-        unit_sel = self.read_unit_selection()
-        # 1 m/s^2 = 100 LSB, 1 mg = 1 LSB
-        scale = 1 / 100.0 if unit_sel.acceleration == BNO055.UnitSelection.ACC_MPS2 else 1 / 1.0
+        scale = self.unit_scale().acceleration
         return (x * scale, y * scale, z * scale)
 
     # (grav_x, grav_y, grav_z)
     # section 3.6.5.7, table 3-35
     def read_gravity(self) -> tuple[float, float, float]:
         x, y, z = self.read_raw_gravity_data()
-        unit_sel = self.read_unit_selection()
-        # 1 m/s^2 = 100 LSB, 1 mg = 1 LSB
-        scale = 1 / 100.0 if unit_sel.acceleration == BNO055.UnitSelection.ACC_MPS2 else 1 / 1.0
+        scale = self.unit_scale().acceleration
         return (x * scale, y * scale, z * scale)
 
     # temperature
     # section 3.6.5.8, table 3-37
     def read_temperature(self) -> float:
         temp = self.read_raw_temperature_data()
-        unit_sel = self.read_unit_selection()
-        # 1 ℃ = 1 LSB, 2 F = 1 LSB
-        scale = 1 / 1.0 if unit_sel.temperature == BNO055.UnitSelection.TEMP_CELSIUS else 2 / 1.0
+        scale = self.unit_scale().temperature
         return temp * scale
+
+    # all of `sensors` from a single span read of the data block (ACC_DATA_X_LSB to CALIB_STAT),
+    # so every vector comes from the same fusion cycle
+    # section 3.6.5, table 4-2
+    def read_snapshot(self, sensors: Sensor = Sensor.ALL) -> Snapshot:
+        start, length = span_of(sensors)
+        buf = self.read_span_view(RegisterAddress(start), length)
+        timestamp = self.read_time
+        scale = self.unit_scale()
+        return decode_snapshot(buf, sensors, scale, timestamp, start)
+
+    # accelerometer, magnetometer and gyroscope in one block read
+    # section 3.6.5.1 - 3.6.5.3
+    def read_imu(self) -> ImuSample:
+        buf = self.read_block(BNO055.regaddrs0.ACC_DATA_X_LSB, 18)
+        timestamp = self.read_time
+        ax, ay, az, mx, my, mz, gx, gy, gz = _bytes_to_i16s(buf, 9)
+        scale = self.unit_scale()
+        acc, mag, gyr = scale.acceleration, scale.magnetometer, scale.gyroscope
+        return ImuSample(
+            timestamp, ax * acc, ay * acc, az * acc, mx * mag, my * mag, mz * mag, gx * gyr, gy * gyr, gz * gyr
+        )
+
+    # euler angles, quaternion, linear acceleration and gravity in one block read
+    # section 3.6.5.4 - 3.6.5.7
+    def read_fusion(self) -> FusionSample:
+        buf = self.read_block(BNO055.regaddrs0.EUL_HEADING_LSB, _FUSION_LENGTH)
+        timestamp = self.read_time
+        h, r, p, qw, qx, qy, qz, lx, ly, lz, gx, gy, gz = _bytes_to_i16s(buf, 13)
+        scale = self.unit_scale()
+        eul, qua, acc = scale.euler, scale.quaternion, scale.acceleration
+        return FusionSample(
+            timestamp,
+            h * eul,
+            r * eul,
+            p * eul,
+            qw * qua,
+            qx * qua,
+            qy * qua,
+            qz * qua,
+            lx * acc,
+            ly * acc,
+            lz * acc,
+            gx * acc,
+            gy * acc,
+            gz * acc,
+        )
+
+    # the read_*_into variants store the values into out[offset:] instead of returning a tuple,
+    # so a loop reusing one array("d") or NumPy array creates no container objects per sample
+
+    # out[offset:offset + 3] = read_accelerometer()
+    def read_accelerometer_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.ACC_DATA_X_LSB, 6)
+        scale_i16_into(buf, 3, self.unit_scale().acceleration, out, offset)
+
+    # out[offset:offset + 3] = read_magnetometer()
+    def read_magnetometer_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.MAG_DATA_X_LSB, 6)
+        scale_i16_into(buf, 3, MAGNETOMETER_SCALE, out, offset)
+
+    # out[offset:offset + 3] = read_gyroscope()
+    def read_gyroscope_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.GYR_DATA_X_LSB, 6)
+        scale_i16_into(buf, 3, self.unit_scale().gyroscope, out, offset)
+
+    # out[offset:offset + 3] = read_euler()
+    def read_euler_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.EUL_HEADING_LSB, 6)
+        scale_i16_into(buf, 3, self.unit_scale().euler, out, offset)
+
+    # out[offset:offset + 4] = read_quaternion()
+    def read_quaternion_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.QUA_DATA_W_LSB, 8)
+        scale_i16_into(buf, 4, QUATERNION_SCALE, out, offset)
+
+    # out[offset:offset + 3] = read_linear_accel()
+    def read_linear_accel_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.LIA_DATA_X_LSB, 6)
+        scale_i16_into(buf, 3, self.unit_scale().acceleration, out, offset)
+
+    # out[offset:offset + 3] = read_gravity()
+    def read_gravity_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.GRV_DATA_X_LSB, 6)
+        scale_i16_into(buf, 3, self.unit_scale().acceleration, out, offset)
+
+    # out[offset:offset + 9] = accelerometer, magnetometer, gyroscope of read_imu()
+    def read_imu_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.ACC_DATA_X_LSB, 18)
+        scale = self.unit_scale()
+        scale_i16_into(buf, 3, scale.acceleration, out, offset)
+        scale_i16_into(buf, 3, scale.magnetometer, out, offset + 3, start=6)
+        scale_i16_into(buf, 3, scale.gyroscope, out, offset + 6, start=12)
+
+    # out[offset:offset + 13] = euler, quaternion, linear acceleration, gravity of read_fusion()
+    def read_fusion_into(self, out: FloatBuffer, offset: int = 0) -> None:
+        buf = self.read_block(BNO055.regaddrs0.EUL_HEADING_LSB, _FUSION_LENGTH)
+        scale = self.unit_scale()
+        scale_i16_into(buf, 3, scale.euler, out, offset)
+        scale_i16_into(buf, 4, scale.quaternion, out, offset + 3, start=6)
+        scale_i16_into(buf, 3, scale.acceleration, out, offset + 7, start=14)
+        scale_i16_into(buf, 3, scale.acceleration, out, offset + 10, start=20)
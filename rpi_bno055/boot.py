@@ -0,0 +1,28 @@
+# outcome of BNO055.fast_boot
+
+import enum as _enum
+from dataclasses import dataclass
+
+from .samples import CalibrationStatus
+from .snapshot import Snapshot
+
+
+class BootPath(_enum.Enum):
+    # already in the requested mode and units, and calibrated: nothing written
+    SKIPPED = "skipped"
+    # mode, units and calibration profile restored without a reset
+    RESTORED = "restored"
+    # SYS_TRIGGER RST_SYS, then restored
+    RESET = "reset"
+
+
+@dataclass(frozen=True)
+class BootReport:
+    path: BootPath
+    # transactions counted by BNO055.stats(), including the first sample; wait_ready polls are not
+    transactions: int
+    # seconds from the fast_boot call until the first sample was read
+    time_to_first_sample: float
+    # once booted, read after the final mode switch
+    calibration_status: CalibrationStatus
+    first_sample: Snapshot
@@ -0,0 +1,82 @@
+# the subset of smbus2.SMBus used by BNO055, so other buses (e.g. FakeSMBus) can stand in for it
+
+import ctypes
+from collections.abc import Sequence
+from typing import Any, Protocol
+
+# bus_port which opens a FakeSMBus instead of a real I2C device
+FAKE_PORT = "fake"
+# flag of a read message in an i2c_rdwr transfer (linux/i2c.h)
+I2C_M_RD = 0x0001
+
+
+class SMBusLike(Protocol):
+    def read_byte_data(self, i2c_addr: int, register: int, force: bool | None = ...) -> int: ...
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force: bool | None = ...) -> None: ...
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force: bool | None = ...) -> list[int]: ...
+
+    def write_i2c_block_data(
+        self, i2c_addr: int, register: int, data: Sequence[int], force: bool | None = ...
+    ) -> None: ...
+
+    def close(self) -> None: ...
+
+
+# buses which can also run combined transfers, like smbus2.SMBus.i2c_rdwr
+class RdwrBus(SMBusLike, Protocol):
+    def i2c_rdwr(self, *i2c_msgs: Any) -> None: ...
+
+
+class RdwrReader:
+    """
+    Register reads of any length as one write of the register address and one read, joined by a repeated
+    start in a single i2c_rdwr transfer. SMBus block reads stop at 32 bytes, so the 46-byte data block
+    takes two of them; here it takes one.
+
+    The messages and the receive buffer are allocated once. read() returns a view of that buffer,
+    which the next read() overwrites.
+    """
+
+    def __init__(self, bus: RdwrBus, address: int, max_length: int = 0x80) -> None:
+        from smbus2 import i2c_msg
+
+        self._bus = bus
+        self._max_length = max_length
+        self._register = bytearray(1)
+        self._data = bytearray(max_length)
+        # ctypes arrays sharing their memory with the bytearrays above
+        self._cregister = (ctypes.c_char * 1).from_buffer(self._register)
+        self._cdata = (ctypes.c_char * max_length).from_buffer(self._data)
+        self._write = i2c_msg(addr=address, flags=0, len=1, buf=self._cregister)
+        self._read = i2c_msg(addr=address, flags=I2C_M_RD, len=0, buf=self._cdata)
+        self._view = memoryview(self._data)
+
+    @property
+    def max_length(self) -> int:
+        return self._max_length
+
+    def read(self, register: int, length: int) -> memoryview:
+        if not 0 < length <= self._max_length:
+            raise ValueError(f"length must be in 1..{self._max_length}: {length}")
+        self._register[0] = register
+        self._read.len = length
+        self._bus.i2c_rdwr(self._write, self._read)
+        return self._view[:length]
+
+
+# bus number ("1") or device path ("/dev/i2c-1") given on a command line
+def parse_port(value: str) -> str | int:
+    return int(value) if value.isdigit() else value
+
+
+# smbus2.SMBus for a bus number or device path, FakeSMBus for FAKE_PORT
+def open_bus(port: str | int) -> SMBusLike:
+    if port == FAKE_PORT:
+        from .fake import FakeSMBus
+
+        return FakeSMBus()
+    import smbus2
+
+    return smbus2.SMBus(port)
@@ -0,0 +1,67 @@
+# calibration profile: ACC_OFFSET_X_LSB (0x55) to MAG_RADIUS_MSB (0x6A), 22 bytes
+# section 3.11.4, 4.3.77 - 4.3.98
+
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from typing_extensions import Self
+
+from . import regaddrs0
+
+PROFILE_START = regaddrs0.ACC_OFFSET_X_LSB
+PROFILE_LENGTH = regaddrs0.MAG_RADIUS_MSB - regaddrs0.ACC_OFFSET_X_LSB + 1
+# version of the on-disk profile store
+STORE_VERSION = 1
+
+_PROFILE = struct.Struct("<11h")
+
+
+@dataclass(frozen=True)
+class CalibrationProfile:
+    acc_offset: tuple[int, int, int]
+    mag_offset: tuple[int, int, int]
+    gyr_offset: tuple[int, int, int]
+    acc_radius: int
+    mag_radius: int
+
+    def to_bytes(self) -> bytes:
+        return _PROFILE.pack(*self.acc_offset, *self.mag_offset, *self.gyr_offset, self.acc_radius, self.mag_radius)
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> Self:
+        if len(buf) != PROFILE_LENGTH:
+            raise ValueError(f"calibration profile must be {PROFILE_LENGTH} bytes: got {len(buf)}")
+        v = _PROFILE.unpack(buf)
+        return cls((v[0], v[1], v[2]), (v[3], v[4], v[5]), (v[6], v[7], v[8]), v[9], v[10])
+
+
+# profiles are stored as JSON keyed by the hex UNIQUE_ID of each chip:
+# {"version": 1, "profiles": {"<unique id>": "<22 bytes of profile in hex>"}}
+def load_profiles(path: str | Path) -> dict[str, CalibrationProfile]:
+    with open(path) as f:
+        store = json.load(f)
+    if store.get("version") != STORE_VERSION:
+        raise ValueError(f"unsupported calibration store version: {store.get('version')}")
+    return {uid: CalibrationProfile.from_bytes(bytes.fromhex(p)) for uid, p in store["profiles"].items()}
+
+
+# the profile of `unique_id`, or None when the store has none for it
+def load_profile(path: str | Path, unique_id: bytes) -> CalibrationProfile | None:
+    return load_profiles(path).get(unique_id.hex())
+
+
+# add or replace the profile of `unique_id`, keeping the ones of other chips
+def save_profile(path: str | Path, unique_id: bytes, profile: CalibrationProfile) -> None:
+    profiles = load_profiles(path) if os.path.exists(path) else {}
+    profiles[unique_id.hex()] = profile
+    store = {"version": STORE_VERSION, "profiles": {uid: p.to_bytes().hex() for uid, p in profiles.items()}}
+    # write to a temporary file first so a power cut never leaves a truncated store behind
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(store, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,98 @@
+# change detection on raw data block spans: which channels hold new data, and how often each one
+# actually updates, found by comparing register bytes before anything is decoded
+# a channel whose value genuinely stays the same (e.g. temperature, or quaternion of a sensor at rest)
+# cannot be told apart from one that was not updated; its effective rate reads low accordingly
+
+import enum as _enum
+
+from .snapshot import SENSOR_REGISTERS, Sensor, span_of
+
+
+class DuplicatePolicy(_enum.Enum):
+    # store every read as a new sample
+    KEEP = "keep"
+    # store every read, with Snapshot.changed telling which channels hold new data
+    FLAG = "flag"
+    # drop reads identical to the previous one
+    SUPPRESS = "suppress"
+
+
+class ChangeDetector:
+    """
+    Compares each span with the previous one, first as a whole and then per channel, and keeps an
+    exponentially weighted average of the interval between changes of every channel.
+
+    # Sample Code
+    ```python
+    detector = ChangeDetector(Sensor.FUSION)
+    start, length = span_of(Sensor.FUSION)
+    while True:
+        buf = bno055.read_span_view(RegisterAddress(start), length)
+        if detector.feed(buf, bno055.read_time):
+            ...
+    print(detector.rates())
+    ```
+    """
+
+    # `smoothing`: weight of the newest interval in the average
+    def __init__(self, sensors: Sensor, smoothing: float = 0.1) -> None:
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"smoothing must be in (0, 1]: {smoothing}")
+        start, _ = span_of(sensors)
+        self._sensors = sensors
+        self._smoothing = smoothing
+        # (channel, first byte, end byte) within the span
+        self._slices = [
+            (s, SENSOR_REGISTERS[s][0] - start, SENSOR_REGISTERS[s][0] - start + SENSOR_REGISTERS[s][1])
+            for s in SENSOR_REGISTERS
+            if s in sensors
+        ]
+        self._previous: bytearray | None = None
+        self._changed_at: dict[Sensor, float] = {}
+        self._interval: dict[Sensor, float] = {}
+        # spans fed, and spans identical to the one before
+        self.count = 0
+        self.duplicates = 0
+
+    @property
+    def sensors(self) -> Sensor:
+        return self._sensors
+
+    # channels of `buf` which differ from the previous span; all of them for the first one
+    # `buf` is copied, so it may be a view of a buffer the caller reuses
+    def feed(self, buf: bytes | bytearray | memoryview, timestamp: float) -> Sensor:
+        previous = self._previous
+        self.count += 1
+        if previous is None:
+            self._previous = bytearray(buf)
+        elif previous == buf:
+            self.duplicates += 1
+            return Sensor(0)
+        changed = Sensor(0)
+        for sensor, begin, end in self._slices:
+            if previous is None or previous[begin:end] != buf[begin:end]:
+                changed |= sensor
+                self._record(sensor, timestamp)
+        if previous is not None:
+            previous[:] = buf
+        return changed
+
+    # updates per second of every channel that changed at least twice
+    def rates(self) -> dict[Sensor, float]:
+        return {s: 1 / interval for s, interval in self._interval.items() if interval > 0}
+
+    def reset(self) -> None:
+        self._previous = None
+        self._changed_at.clear()
+        self._interval.clear()
+        self.count = 0
+        self.duplicates = 0
+
+    def _record(self, sensor: Sensor, timestamp: float) -> None:
+        last = self._changed_at.get(sensor)
+        self._changed_at[sensor] = timestamp
+        if last is None:
+            return
+        interval = timestamp - last
+        average = self._interval.get(sensor)
+        self._interval[sensor] = interval if average is None else average + self._smoothing * (interval - average)
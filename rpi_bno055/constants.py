@@ -3,8 +3,12 @@ from enum import IntFlag as _IntFlag
 DEFAULT_ADDRESS = 0x28
 ALT_ADDRESS = 0x29
 DEFAULT_I2C_PORT = "/dev/i2c-1"
+# maximum length of a single SMBus block transfer
+I2C_BLOCK_MAX = 32
 # section 4.3.1
 BNO055_CHIP_ID = 0xA0
+# start-up time from reset to CONFIG mode, in seconds (section 1.2, table 0-2)
+RESET_TIME = 0.65
 
 
 # section 4.3.63
@@ -0,0 +1,305 @@
+# register-level BNO055 simulator behind the smbus2.SMBus interface, for tests and benchmarks
+# without hardware
+
+import ctypes
+import random
+import struct
+from collections.abc import Iterable, Iterator, Sequence
+from time import monotonic, sleep
+from typing import Any
+
+from . import constants, modes, regaddrs0, regaddrs1
+from .bus import I2C_M_RD
+from .snapshot import DATA_LENGTH, DATA_START
+
+# reset values of page 0 (section 4.2.1, table 4-2)
+_PAGE0_DEFAULTS: dict[int, int] = {
+    regaddrs0.CHIP_ID: constants.BNO055_CHIP_ID,
+    regaddrs0.ACC_ID: 0xFB,
+    regaddrs0.MAG_ID: 0x32,
+    regaddrs0.GYR_ID: 0x0F,
+    regaddrs0.SW_REV_ID_LSB: 0x11,
+    regaddrs0.SW_REV_ID_MSB: 0x03,
+    regaddrs0.BL_REV_ID: 0x15,
+    regaddrs0.ST_RESULT: 0x0F,
+    regaddrs0.UNIT_SEL: 0x80,
+    regaddrs0.AXIS_MAP_CONFIG: 0x24,
+    regaddrs0.AXIS_MAP_SIGN: 0x00,
+    regaddrs0.ACC_RADIUS_LSB: 0xE8,
+    regaddrs0.ACC_RADIUS_MSB: 0x03,
+    regaddrs0.MAG_RADIUS_LSB: 0xE0,
+    regaddrs0.MAG_RADIUS_MSB: 0x01,
+}
+
+# reset values of page 1 (section 4.2.2, table 4-3)
+_PAGE1_DEFAULTS: dict[int, int] = {
+    regaddrs1.ACC_CONFIG: 0x0D,
+    regaddrs1.MAG_CONFIG: 0x6D,
+    regaddrs1.GYR_CONFIG_0: 0x38,
+    regaddrs1.ACC_AM_THRES: 0x14,
+    regaddrs1.ACC_INT_SETTINGS: 0x03,
+    regaddrs1.ACC_HG_DURATION: 0x0F,
+    regaddrs1.ACC_HG_THRES: 0xC0,
+    regaddrs1.ACC_NM_THRES: 0x0A,
+    regaddrs1.ACC_NM_SET: 0x0B,
+    regaddrs1.GYR_HR_X_SET: 0x01,
+    regaddrs1.GYR_DUR_X: 0x19,
+    regaddrs1.GYR_HR_Y_SET: 0x01,
+    regaddrs1.GYR_DUR_Y: 0x19,
+    regaddrs1.GYR_HR_Z_SET: 0x01,
+    regaddrs1.GYR_DUR_Z: 0x19,
+    regaddrs1.GYR_AM_THRES: 0x04,
+    regaddrs1.GYR_AM_SET: 0x0A,
+}
+
+# registers which only accept writes in CONFIG mode (section 3.3.1)
+_CONFIG_ONLY_PAGE0 = frozenset(
+    [regaddrs0.PWR_MODE, regaddrs0.UNIT_SEL, regaddrs0.AXIS_MAP_CONFIG, regaddrs0.AXIS_MAP_SIGN]
+    + list(range(regaddrs0.ACC_OFFSET_X_LSB, regaddrs0.MAG_RADIUS_MSB + 1))
+)
+
+# sensor at rest, Z axis up, fully calibrated, 25 ℃
+REST_BLOCK = bytes(
+    struct.pack("<3h", 0, 0, 981)
+    + bytes(12)
+    + bytes(6)
+    + struct.pack("<4h", 1 << 14, 0, 0, 0)
+    + bytes(6)
+    + struct.pack("<3h", 0, 0, 981)
+    + bytes([25, 0xFF])
+)
+assert len(REST_BLOCK) == DATA_LENGTH
+
+
+class FakeSMBus:
+    """
+    Emulates a BNO055 at `address`: CHIP_ID and the other fixed registers, OPR_MODE and SYS_STATUS,
+    PAGE_ID switching, CONFIG-only registers, SYS_TRIGGER resets (the chip does not answer for
+    `reset_delay` seconds) and the data block ACC_DATA_X_LSB to CALIB_STAT.
+
+    The data block comes from `trace`, an iterable of DATA_LENGTH-byte blocks advanced at `rate_hz`
+    while the chip is in an operation mode; the last block is held once the trace runs out.
+
+    Every transaction sleeps `latency` + `byte_latency` per byte and can fail with OSError,
+    either after `fail_next()` or at random with probability `fault_rate`.
+
+    # Sample Code
+    ```python
+    bus = FakeSMBus(reset_delay=0.0)
+    bno055 = BNO055(bus=bus)
+    bno055.begin()
+    bno055.read_euler()
+    print(bus.transactions, bus.bytes_read)
+    ```
+    """
+
+    def __init__(
+        self,
+        address: int = constants.DEFAULT_ADDRESS,
+        trace: Iterable[bytes] | None = None,
+        rate_hz: float = 100.0,
+        reset_delay: float = 0.65,
+        latency: float = 0.0,
+        byte_latency: float = 0.0,
+        fault_rate: float = 0.0,
+        seed: int | None = None,
+        unique_id: bytes = bytes(range(0x50, 0x60)),
+    ) -> None:
+        self.address = address
+        self.rate_hz = rate_hz
+        self.reset_delay = reset_delay
+        self.latency = latency
+        self.byte_latency = byte_latency
+        self.fault_rate = fault_rate
+        self._random = random.Random(seed)
+        self._unique_id = unique_id
+        self._trace: Iterator[bytes] = iter(trace) if trace is not None else iter(())
+        self._trace_index = -1
+        self._trace_start = monotonic()
+        self._fail_next = 0
+        self._ready_at = 0.0
+        self.pages = [bytearray(0x80), bytearray(0x80)]
+        self._reset_registers()
+        self.set_data(REST_BLOCK)
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.transactions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.errors = 0
+        # writes ignored because the register is only writable in CONFIG mode
+        self.rejected_writes = 0
+
+    # make the next `count` transactions fail with OSError
+    def fail_next(self, count: int = 1) -> None:
+        self._fail_next += count
+
+    # overwrite the data block ACC_DATA_X_LSB to CALIB_STAT
+    def set_data(self, block: bytes) -> None:
+        if len(block) != DATA_LENGTH:
+            raise ValueError(f"data block must be {DATA_LENGTH} bytes: got {len(block)}")
+        self.pages[0][DATA_START : DATA_START + DATA_LENGTH] = block
+
+    # raise interrupt status bits, as if the chip detected the events
+    def raise_interrupts(self, flags: int) -> None:
+        self.pages[0][regaddrs0.INT_STA] |= flags & self.pages[1][regaddrs1.INT_EN]
+
+    @property
+    def page(self) -> int:
+        return self.pages[0][regaddrs0.PAGE_ID]
+
+    @property
+    def mode(self) -> int:
+        return self.pages[0][regaddrs0.OPR_MODE] & 0b1111
+
+    def close(self) -> None:
+        pass
+
+    def read_byte_data(self, i2c_addr: int, register: int, force: bool | None = None) -> int:
+        self._transaction(i2c_addr, 1)
+        self.bytes_read += 1
+        self._advance_trace()
+        return self._read(register)
+
+    def write_byte_data(self, i2c_addr: int, register: int, value: int, force: bool | None = None) -> None:
+        self._transaction(i2c_addr, 1)
+        self.bytes_written += 1
+        self._write(register, value)
+
+    def read_i2c_block_data(self, i2c_addr: int, register: int, length: int, force: bool | None = None) -> list[int]:
+        if length > constants.I2C_BLOCK_MAX:
+            raise ValueError(f"Desired block length over {constants.I2C_BLOCK_MAX} bytes")
+        self._transaction(i2c_addr, length)
+        self.bytes_read += length
+        self._advance_trace()
+        return [self._read(register + i) for i in range(length)]
+
+    def write_i2c_block_data(
+        self, i2c_addr: int, register: int, data: Sequence[int], force: bool | None = None
+    ) -> None:
+        if len(data) > constants.I2C_BLOCK_MAX:
+            raise ValueError(f"Data length cannot exceed {constants.I2C_BLOCK_MAX} bytes")
+        self._transaction(i2c_addr, len(data))
+        self.bytes_written += len(data)
+        for i, value in enumerate(data):
+            self._write(register + i, value)
+
+    # combined transfers of smbus2.i2c_msg: a write sets the register pointer (and writes the bytes after it),
+    # a read continues from the pointer with auto-increment; one transaction for all messages
+    def i2c_rdwr(self, *i2c_msgs: Any) -> None:
+        if not i2c_msgs:
+            return
+        self._transaction(i2c_msgs[0].addr, sum(msg.len for msg in i2c_msgs))
+        register = 0
+        for msg in i2c_msgs:
+            if msg.addr != self.address:
+                self.errors += 1
+                raise OSError(121, "Remote I/O error")
+            if msg.flags & I2C_M_RD:
+                self._advance_trace()
+                data = bytes(self._read(register + i) for i in range(msg.len))
+                ctypes.memmove(msg.buf, data, msg.len)
+                self.bytes_read += msg.len
+                register += msg.len
+                continue
+            data = ctypes.string_at(msg.buf, msg.len)
+            if data:
+                register = data[0]
+                for i, value in enumerate(data[1:]):
+                    self._write(register + i, value)
+                self.bytes_written += len(data)
+
+    def _transaction(self, i2c_addr: int, length: int) -> None:
+        self.transactions += 1
+        delay = self.latency + self.byte_latency * length
+        if delay > 0:
+            sleep(delay)
+        if i2c_addr != self.address or monotonic() < self._ready_at:
+            self.errors += 1
+            raise OSError(121, "Remote I/O error")
+        if self._fail_next > 0 or (self.fault_rate > 0 and self._random.random() < self.fault_rate):
+            self._fail_next = max(0, self._fail_next - 1)
+            self.errors += 1
+            raise OSError(121, "Remote I/O error")
+
+    def _read(self, register: int) -> int:
+        page = self.page
+        if page == 1 and regaddrs1.UNIQUE_ID_FIRST <= register <= regaddrs1.UNIQUE_ID_LAST:
+            return self._unique_id[register - regaddrs1.UNIQUE_ID_FIRST]
+        if register >= 0x80:
+            return 0
+        return self.pages[page][register]
+
+    def _write(self, register: int, value: int) -> None:
+        value &= 0xFF
+        if register == regaddrs0.PAGE_ID:
+            self.pages[0][register] = self.pages[1][register] = value & 1
+            return
+        if register >= 0x80:
+            return
+        config = self.mode == modes.CONFIG
+        if self.page == 1:
+            if not config:
+                self.rejected_writes += 1
+                return
+            self.pages[1][register] = value
+            return
+        if register in _CONFIG_ONLY_PAGE0 and not config:
+            self.rejected_writes += 1
+            return
+        if register == regaddrs0.SYS_TRIGGER:
+            self._trigger(value)
+            return
+        if register == regaddrs0.OPR_MODE:
+            self._set_mode(value & 0b1111)
+            return
+        self.pages[0][register] = value
+
+    def _set_mode(self, mode: int) -> None:
+        self.pages[0][regaddrs0.OPR_MODE] = mode
+        if mode == modes.CONFIG:
+            status = 0x00
+        elif mode >= modes.IMU:
+            status = 0x05
+        else:
+            status = 0x06
+        self.pages[0][regaddrs0.SYS_STATUS] = status
+        self._trace_start = monotonic()
+        self._trace_index = -1
+
+    def _trigger(self, value: int) -> None:
+        self.pages[0][regaddrs0.SYS_TRIGGER] = value & constants.SysTriggerFlag.CLK_SEL
+        if value & constants.SysTriggerFlag.RST_SYS:
+            data = bytes(self.pages[0][DATA_START : DATA_START + DATA_LENGTH])
+            self._reset_registers()
+            self.pages[0][DATA_START : DATA_START + DATA_LENGTH] = data
+            self._ready_at = monotonic() + self.reset_delay
+        if value & constants.SysTriggerFlag.RST_INT:
+            self.pages[0][regaddrs0.INT_STA] = 0
+        if value & constants.SysTriggerFlag.SELFTEST:
+            self.pages[0][regaddrs0.ST_RESULT] = 0x0F
+
+    def _reset_registers(self) -> None:
+        for page, defaults in zip(self.pages, (_PAGE0_DEFAULTS, _PAGE1_DEFAULTS)):
+            page[:] = bytes(len(page))
+            for register, value in defaults.items():
+                page[register] = value
+        self._set_mode(modes.CONFIG)
+
+    # move to the trace block due now, once per read transaction so a block read sees one sample
+    # data only updates in operation modes
+    def _advance_trace(self) -> None:
+        if self.mode == modes.CONFIG:
+            return
+        due = int((monotonic() - self._trace_start) * self.rate_hz)
+        latest = None
+        while self._trace_index < due:
+            block = next(self._trace, None)
+            if block is None:
+                self._trace_index = due
+                break
+            latest = block
+            self._trace_index += 1
+        if latest is not None:
+            self.set_data(latest)
@@ -0,0 +1,296 @@
+# host-side orientation estimation from raw accelerometer, gyroscope and magnetometer samples,
+# for the non-fusion modes (ACCGYRO, AMG, ...) whose data rates exceed the 100 Hz of the chip's fusion output
+#
+# quaternions are (w, x, y, z) of the sensor frame relative to the earth frame, like read_quaternion
+# gyroscope rates are in rad/s; accelerometer and magnetometer are normalized, so any unit (or raw LSB) works
+# NumPy is optional: update_batch falls back to lists of tuples, the *_sweep functions need it
+#
+# Madgwick, "An efficient orientation filter for inertial and inertial/magnetic sensor arrays", 2010
+# Mahony et al., "Nonlinear Complementary Filters on the Special Orthogonal Group", 2008
+
+import math
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any
+
+from .unit_sel import GyroUnits, UnitScale, UnitSelection
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+Quaternion = tuple[float, float, float, float]
+Vector = tuple[float, float, float]
+# (N, 3) array or a sequence of 3-tuples
+Vectors = Any
+# one dt for every sample, or one per sample
+Intervals = Any
+
+# keeps the gradient normalization finite when the gradient vanishes
+_TINY = 1e-30
+
+
+# factor from GYR_DATA register values to rad/s under `unit_sel` (section 3.6.4, table 3-22)
+def gyro_rad_scale(unit_sel: UnitSelection) -> float:
+    scale = UnitScale.from_unit_selection(unit_sel).gyroscope
+    return scale if unit_sel.gyroscope == GyroUnits.RAD_PER_SEC else math.radians(scale)
+
+
+def _unit(x: float, y: float, z: float) -> Vector | None:
+    norm = math.sqrt(x * x + y * y + z * z)
+    if norm == 0:
+        return None
+    return (x / norm, y / norm, z / norm)
+
+
+# gradient descent step of Madgwick's objective function, not normalized
+# the arithmetic works on floats and on NumPy arrays alike, the latter for the *_sweep functions
+def _madgwick_gradient(q0: Any, q1: Any, q2: Any, q3: Any, a: Vector, m: Vector | None) -> tuple[Any, Any, Any, Any]:
+    ax, ay, az = a
+    # gravity: f_g = estimated gravity direction in the sensor frame - measured
+    f1 = 2 * (q1 * q3 - q0 * q2) - ax
+    f2 = 2 * (q0 * q1 + q2 * q3) - ay
+    f3 = 2 * (0.5 - q1 * q1 - q2 * q2) - az
+    s0 = -2 * q2 * f1 + 2 * q1 * f2
+    s1 = 2 * q3 * f1 + 2 * q0 * f2 - 4 * q1 * f3
+    s2 = -2 * q0 * f1 + 2 * q3 * f2 - 4 * q2 * f3
+    s3 = 2 * q1 * f1 + 2 * q2 * f2
+    if m is None:
+        return (s0, s1, s2, s3)
+    mx, my, mz = m
+    # earth magnetic field direction, rotated into the x-z plane
+    hx = 2 * (mx * (0.5 - q2 * q2 - q3 * q3) + my * (q1 * q2 - q0 * q3) + mz * (q1 * q3 + q0 * q2))
+    hy = 2 * (mx * (q1 * q2 + q0 * q3) + my * (0.5 - q1 * q1 - q3 * q3) + mz * (q2 * q3 - q0 * q1))
+    bx = (hx * hx + hy * hy) ** 0.5
+    bz = 2 * (mx * (q1 * q3 - q0 * q2) + my * (q2 * q3 + q0 * q1) + mz * (0.5 - q1 * q1 - q2 * q2))
+    g1 = 2 * bx * (0.5 - q2 * q2 - q3 * q3) + 2 * bz * (q1 * q3 - q0 * q2) - mx
+    g2 = 2 * bx * (q1 * q2 - q0 * q3) + 2 * bz * (q0 * q1 + q2 * q3) - my
+    g3 = 2 * bx * (q0 * q2 + q1 * q3) + 2 * bz * (0.5 - q1 * q1 - q2 * q2) - mz
+    s0 = s0 - 2 * bz * q2 * g1 + (-2 * bx * q3 + 2 * bz * q1) * g2 + 2 * bx * q2 * g3
+    s1 = s1 + 2 * bz * q3 * g1 + (2 * bx * q2 + 2 * bz * q0) * g2 + (2 * bx * q3 - 4 * bz * q1) * g3
+    s2 = s2 + (-4 * bx * q2 - 2 * bz * q0) * g1 + (2 * bx * q1 + 2 * bz * q3) * g2 + (2 * bx * q0 - 4 * bz * q2) * g3
+    s3 = s3 + (-4 * bx * q3 + 2 * bz * q1) * g1 + (-2 * bx * q0 + 2 * bz * q2) * g2 + 2 * bx * q1 * g3
+    return (s0, s1, s2, s3)
+
+
+def _madgwick_step(
+    q: tuple[Any, Any, Any, Any], g: Vector, a: Vector | None, m: Vector | None, beta: Any, dt: float
+) -> tuple[Any, Any, Any, Any]:
+    q0, q1, q2, q3 = q
+    gx, gy, gz = g
+    # rate of change from the gyroscope: 0.5 * q * (0, g)
+    d0 = 0.5 * (-q1 * gx - q2 * gy - q3 * gz)
+    d1 = 0.5 * (q0 * gx + q2 * gz - q3 * gy)
+    d2 = 0.5 * (q0 * gy - q1 * gz + q3 * gx)
+    d3 = 0.5 * (q0 * gz + q1 * gy - q2 * gx)
+    if a is not None:
+        s0, s1, s2, s3 = _madgwick_gradient(q0, q1, q2, q3, a, m)
+        k = beta / ((s0 * s0 + s1 * s1 + s2 * s2 + s3 * s3) ** 0.5 + _TINY)
+        d0, d1, d2, d3 = d0 - k * s0, d1 - k * s1, d2 - k * s2, d3 - k * s3
+    q0, q1, q2, q3 = q0 + d0 * dt, q1 + d1 * dt, q2 + d2 * dt, q3 + d3 * dt
+    n = (q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3) ** 0.5
+    return (q0 / n, q1 / n, q2 / n, q3 / n)
+
+
+def _mahony_step(
+    q: tuple[Any, Any, Any, Any],
+    integral: tuple[Any, Any, Any],
+    g: Vector,
+    a: Vector | None,
+    m: Vector | None,
+    kp: Any,
+    ki: Any,
+    dt: float,
+) -> tuple[tuple[Any, Any, Any, Any], tuple[Any, Any, Any]]:
+    q0, q1, q2, q3 = q
+    gx, gy, gz = g
+    ix, iy, iz = integral
+    if a is not None:
+        ax, ay, az = a
+        # half of the estimated gravity direction
+        vx = q1 * q3 - q0 * q2
+        vy = q0 * q1 + q2 * q3
+        vz = q0 * q0 - 0.5 + q3 * q3
+        # half of the error: measured x estimated
+        ex = ay * vz - az * vy
+        ey = az * vx - ax * vz
+        ez = ax * vy - ay * vx
+        if m is not None:
+            mx, my, mz = m
+            hx = 2 * (mx * (0.5 - q2 * q2 - q3 * q3) + my * (q1 * q2 - q0 * q3) + mz * (q1 * q3 + q0 * q2))
+            hy = 2 * (mx * (q1 * q2 + q0 * q3) + my * (0.5 - q1 * q1 - q3 * q3) + mz * (q2 * q3 - q0 * q1))
+            bx = (hx * hx + hy * hy) ** 0.5
+            bz = 2 * (mx * (q1 * q3 - q0 * q2) + my * (q2 * q3 + q0 * q1) + mz * (0.5 - q1 * q1 - q2 * q2))
+            wx = bx * (0.5 - q2 * q2 - q3 * q3) + bz * (q1 * q3 - q0 * q2)
+            wy = bx * (q1 * q2 - q0 * q3) + bz * (q0 * q1 + q2 * q3)
+            wz = bx * (q0 * q2 + q1 * q3) + bz * (0.5 - q1 * q1 - q2 * q2)
+            ex = ex + my * wz - mz * wy
+            ey = ey + mz * wx - mx * wz
+            ez = ez + mx * wy - my * wx
+        ix, iy, iz = ix + 2 * ki * ex * dt, iy + 2 * ki * ey * dt, iz + 2 * ki * ez * dt
+        gx, gy, gz = gx + ix + 2 * kp * ex, gy + iy + 2 * kp * ey, gz + iz + 2 * kp * ez
+    else:
+        gx, gy, gz = gx + ix, gy + iy, gz + iz
+    gx, gy, gz = 0.5 * dt * gx, 0.5 * dt * gy, 0.5 * dt * gz
+    q0, q1, q2, q3 = (
+        q0 - q1 * gx - q2 * gy - q3 * gz,
+        q1 + q0 * gx + q2 * gz - q3 * gy,
+        q2 + q0 * gy - q1 * gz + q3 * gx,
+        q3 + q0 * gz + q1 * gy - q2 * gx,
+    )
+    n = (q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3) ** 0.5
+    return ((q0 / n, q1 / n, q2 / n, q3 / n), (ix, iy, iz))
+
+
+# per-sample (gyroscope, unit accelerometer or None, unit magnetometer or None, dt) out of batch inputs
+def _samples(
+    gyr: Vectors, acc: Vectors, dt: Intervals, mag: Vectors | None
+) -> list[tuple[Vector, Vector | None, Vector | None, float]]:
+    n = len(gyr)
+    if len(acc) != n or (mag is not None and len(mag) != n):
+        raise ValueError("gyr, acc and mag must have the same number of samples")
+    if HAS_NUMPY:
+        gyr, acc = np.asarray(gyr, dtype=float).tolist(), np.asarray(acc, dtype=float).tolist()
+        mag = None if mag is None else np.asarray(mag, dtype=float).tolist()
+        dts = [float(dt)] * n if np.ndim(dt) == 0 else np.asarray(dt, dtype=float).tolist()
+    else:
+        dts = [float(dt)] * n if isinstance(dt, int | float) else [float(v) for v in dt]
+    if len(dts) != n:
+        raise ValueError(f"dt must be a number or have one value per sample: got {len(dts)} for {n}")
+    return [
+        (
+            (float(g[0]), float(g[1]), float(g[2])),
+            _unit(*a),
+            None if mag is None else _unit(*mag[i]),
+            dts[i],
+        )
+        for i, (g, a) in enumerate(zip(gyr, acc))
+    ]
+
+
+def _stack(quaternions: list[Quaternion]) -> Any:
+    if HAS_NUMPY:
+        return np.array(quaternions, dtype=float).reshape(-1, 4)
+    return quaternions
+
+
+class MadgwickFilter:
+    """
+    Gradient descent orientation filter. `beta` weighs the accelerometer and magnetometer correction
+    against gyroscope integration: about sqrt(3/4) times the gyroscope noise in rad/s; 0.033 - 0.1 are
+    common choices.
+
+    # Sample Code
+    ```python
+    bno055.write_mode(BNO055.modes.AMG)
+    scale = gyro_rad_scale(bno055.read_unit_selection())
+    f = MadgwickFilter(beta=0.05)
+    while True:
+        gyr = [v * scale for v in bno055.read_raw_gyro_data()]
+        q = f.update(gyr, bno055.read_raw_acc_data(), dt, bno055.read_raw_mag_data())
+    ```
+    """
+
+    def __init__(self, beta: float = 0.1, quaternion: Quaternion = (1.0, 0.0, 0.0, 0.0)) -> None:
+        self.beta = beta
+        self.quaternion = quaternion
+
+    # one sample; `mag` None for the 6-axis (IMU) variant
+    def update(
+        self, gyr: Sequence[float], acc: Sequence[float], dt: float, mag: Sequence[float] | None = None
+    ) -> Quaternion:
+        a = _unit(acc[0], acc[1], acc[2])
+        m = None if mag is None or a is None else _unit(mag[0], mag[1], mag[2])
+        g = (float(gyr[0]), float(gyr[1]), float(gyr[2]))
+        self.quaternion = _madgwick_step(self.quaternion, g, a, m, self.beta, dt)
+        return self.quaternion
+
+    # N samples in order; returns the (N, 4) quaternion after each one
+    def update_batch(self, gyr: Vectors, acc: Vectors, dt: Intervals, mag: Vectors | None = None) -> Any:
+        q = self.quaternion
+        beta = self.beta
+        out: list[Quaternion] = []
+        for g, a, m, step in _samples(gyr, acc, dt, mag):
+            q = _madgwick_step(q, g, a, m if a is not None else None, beta, step)
+            out.append(q)
+        self.quaternion = q
+        return _stack(out)
+
+
+class MahonyFilter:
+    """
+    Complementary filter with a PI controller on the accelerometer / magnetometer error. `kp` sets how
+    fast the estimate follows the accelerometer and magnetometer, `ki` how fast gyroscope bias is learned.
+
+    # Sample Code
+    ```python
+    f = MahonyFilter(kp=1.0, ki=0.01)
+    quaternions = f.update_batch(gyr, acc, dt=0.005)
+    ```
+    """
+
+    def __init__(self, kp: float = 1.0, ki: float = 0.0, quaternion: Quaternion = (1.0, 0.0, 0.0, 0.0)) -> None:
+        self.kp = kp
+        self.ki = ki
+        self.quaternion = quaternion
+        # integral of the error, i.e. the gyroscope bias estimate in rad/s
+        self.integral: Vector = (0.0, 0.0, 0.0)
+
+    def update(
+        self, gyr: Sequence[float], acc: Sequence[float], dt: float, mag: Sequence[float] | None = None
+    ) -> Quaternion:
+        a = _unit(acc[0], acc[1], acc[2])
+        m = None if mag is None or a is None else _unit(mag[0], mag[1], mag[2])
+        g = (float(gyr[0]), float(gyr[1]), float(gyr[2]))
+        self.quaternion, self.integral = _mahony_step(self.quaternion, self.integral, g, a, m, self.kp, self.ki, dt)
+        return self.quaternion
+
+    def update_batch(self, gyr: Vectors, acc: Vectors, dt: Intervals, mag: Vectors | None = None) -> Any:
+        q, integral = self.quaternion, self.integral
+        kp, ki = self.kp, self.ki
+        out: list[Quaternion] = []
+        for g, a, m, step in _samples(gyr, acc, dt, mag):
+            q, integral = _mahony_step(q, integral, g, a, m if a is not None else None, kp, ki, step)
+            out.append(q)
+        self.quaternion, self.integral = q, integral
+        return _stack(out)
+
+
+# run one Madgwick filter per value of `betas` over the same samples, vectorized across the filters
+# returns (N, K, 4) for K betas; for tuning the gain on a recording
+def madgwick_sweep(
+    gyr: Vectors, acc: Vectors, dt: Intervals, betas: Sequence[float], mag: Vectors | None = None
+) -> "npt.NDArray[np.float64]":
+    _require_numpy()
+    beta = np.asarray(betas, dtype=float)
+    q: tuple[Any, Any, Any, Any] = (np.ones_like(beta), np.zeros_like(beta), np.zeros_like(beta), np.zeros_like(beta))
+    out = np.empty((len(gyr), len(beta), 4))
+    for i, (g, a, m, step) in enumerate(_samples(gyr, acc, dt, mag)):
+        q = _madgwick_step(q, g, a, m if a is not None else None, beta, step)
+        out[i] = np.stack(q, axis=-1)
+    return out
+
+
+# like madgwick_sweep for K (kp, ki) pairs of a Mahony filter
+def mahony_sweep(
+    gyr: Vectors, acc: Vectors, dt: Intervals, gains: Sequence[tuple[float, float]], mag: Vectors | None = None
+) -> "npt.NDArray[np.float64]":
+    _require_numpy()
+    kp, ki = np.asarray(gains, dtype=float).reshape(-1, 2).T
+    q: tuple[Any, Any, Any, Any] = (np.ones_like(kp), np.zeros_like(kp), np.zeros_like(kp), np.zeros_like(kp))
+    integral: tuple[Any, Any, Any] = (np.zeros_like(kp), np.zeros_like(kp), np.zeros_like(kp))
+    out = np.empty((len(gyr), len(kp), 4))
+    for i, (g, a, m, step) in enumerate(_samples(gyr, acc, dt, mag)):
+        q, integral = _mahony_step(q, integral, g, a, m if a is not None else None, kp, ki, step)
+        out[i] = np.stack(q, axis=-1)
+    return out
+
+
+def _require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for filter sweeps: pip install rpi_bno055[numpy]")
@@ -0,0 +1,222 @@
+# quaternion and vector math on the values read from the chip
+#
+# quaternions are (w, x, y, z) of the sensor frame relative to the earth frame, as returned by
+# read_quaternion and fusion.py; rotating a vector by q takes it from the sensor to the earth frame
+# angles are in radians
+# every scalar function has a NumPy form with the `_batch` suffix, working on (N, 4) quaternions and
+# (N, 3) vectors, e.g. Recording.channel() or batch.decode_blocks() output; those need NumPy
+
+import math
+from typing import TYPE_CHECKING, Any
+
+from .unit_sel import OrientationUnits
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+    Array = npt.NDArray[np.float64]
+else:
+    Array = Any
+
+Quaternion = tuple[float, float, float, float]
+Vector = tuple[float, float, float]
+Matrix = tuple[Vector, Vector, Vector]
+
+# standard gravity in m/s^2
+STANDARD_GRAVITY = 9.80665
+
+
+def quat_normalize(q: Quaternion) -> Quaternion:
+    w, x, y, z = q
+    n = math.sqrt(w * w + x * x + y * y + z * z)
+    if n == 0:
+        raise ValueError("zero quaternion")
+    return (w / n, x / n, y / n, z / n)
+
+
+def quat_conjugate(q: Quaternion) -> Quaternion:
+    w, x, y, z = q
+    return (w, -x, -y, -z)
+
+
+# Hamilton product a * b: rotate by b, then by a
+def quat_multiply(a: Quaternion, b: Quaternion) -> Quaternion:
+    aw, ax, ay, az = a
+    bw, bx, by, bz = b
+    return (
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    )
+
+
+# rotation matrix R of q, with R @ v taking v from the sensor to the earth frame
+def quat_to_matrix(q: Quaternion) -> Matrix:
+    w, x, y, z = q
+    return (
+        (1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)),
+        (2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)),
+        (2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)),
+    )
+
+
+# v from the sensor to the earth frame
+def rotate(q: Quaternion, v: Vector) -> Vector:
+    r = quat_to_matrix(q)
+    return (
+        r[0][0] * v[0] + r[0][1] * v[1] + r[0][2] * v[2],
+        r[1][0] * v[0] + r[1][1] * v[1] + r[1][2] * v[2],
+        r[2][0] * v[0] + r[2][1] * v[1] + r[2][2] * v[2],
+    )
+
+
+# v from the earth to the sensor frame
+def rotate_inverse(q: Quaternion, v: Vector) -> Vector:
+    return rotate(quat_conjugate(q), v)
+
+
+# direction of gravity in the sensor frame, scaled to `g`: what the accelerometer reads at rest
+def gravity(q: Quaternion, g: float = STANDARD_GRAVITY) -> Vector:
+    w, x, y, z = q
+    return (2 * (x * z - w * y) * g, 2 * (y * z + w * x) * g, (1 - 2 * (x * x + y * y)) * g)
+
+
+# accelerometer reading minus gravity, in the sensor frame; `g` in the units of `acc`
+def remove_gravity(q: Quaternion, acc: Vector, g: float = STANDARD_GRAVITY) -> Vector:
+    gx, gy, gz = gravity(q, g)
+    return (acc[0] - gx, acc[1] - gy, acc[2] - gz)
+
+
+# (heading, roll, pitch) in the register order of EUL_DATA (section 3.6.5.4)
+# heading in [0, 2π) increases turning clockwise seen from above, roll in [-π/2, π/2] is the inclination
+# about the y axis, pitch in (-π, π] the rotation about the x axis; the Android convention flips the sign
+# of pitch (section 3.6.2, table 3-12)
+def quat_to_euler(q: Quaternion, orientation: OrientationUnits = OrientationUnits.WINDOWS) -> Vector:
+    w, x, y, z = q
+    yaw = math.atan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    roll = math.asin(max(-1.0, min(1.0, 2 * (w * y - z * x))))
+    pitch = math.atan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    if orientation == OrientationUnits.ANDROID:
+        pitch = -pitch
+    return ((-yaw) % (2 * math.pi), roll, pitch)
+
+
+# inverse of quat_to_euler
+def euler_to_quat(euler: Vector, orientation: OrientationUnits = OrientationUnits.WINDOWS) -> Quaternion:
+    heading, roll, pitch = euler
+    if orientation == OrientationUnits.ANDROID:
+        pitch = -pitch
+    cy, sy = math.cos(-heading / 2), math.sin(-heading / 2)
+    cp, sp = math.cos(roll / 2), math.sin(roll / 2)
+    cr, sr = math.cos(pitch / 2), math.sin(pitch / 2)
+    return (
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy,
+    )
+
+
+def _require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for batch geometry: pip install rpi_bno055[numpy]")
+
+
+def _columns(a: Any, k: int) -> Any:
+    _require_numpy()
+    a = np.asarray(a, dtype=float)
+    if a.shape[-1] != k:
+        raise ValueError(f"expected (N, {k}) values: got shape {a.shape}")
+    return a
+
+
+def quat_normalize_batch(q: Any) -> Array:
+    q = _columns(q, 4)
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)  # type: ignore[no-any-return]
+
+
+def quat_conjugate_batch(q: Any) -> Array:
+    return _columns(q, 4) * np.array([1.0, -1.0, -1.0, -1.0])  # type: ignore[no-any-return]
+
+
+def quat_multiply_batch(a: Any, b: Any) -> Array:
+    aw, ax, ay, az = np.moveaxis(_columns(a, 4), -1, 0)
+    bw, bx, by, bz = np.moveaxis(_columns(b, 4), -1, 0)
+    return np.stack(
+        [
+            aw * bw - ax * bx - ay * by - az * bz,
+            aw * bx + ax * bw + ay * bz - az * by,
+            aw * by - ax * bz + ay * bw + az * bx,
+            aw * bz + ax * by - ay * bx + az * bw,
+        ],
+        axis=-1,
+    )
+
+
+# (N, 3, 3)
+def quat_to_matrix_batch(q: Any) -> Array:
+    w, x, y, z = np.moveaxis(_columns(q, 4), -1, 0)
+    r = np.empty(w.shape + (3, 3))
+    r[..., 0, 0] = 1 - 2 * (y * y + z * z)
+    r[..., 0, 1] = 2 * (x * y - w * z)
+    r[..., 0, 2] = 2 * (x * z + w * y)
+    r[..., 1, 0] = 2 * (x * y + w * z)
+    r[..., 1, 1] = 1 - 2 * (x * x + z * z)
+    r[..., 1, 2] = 2 * (y * z - w * x)
+    r[..., 2, 0] = 2 * (x * z - w * y)
+    r[..., 2, 1] = 2 * (y * z + w * x)
+    r[..., 2, 2] = 1 - 2 * (x * x + y * y)
+    return r
+
+
+def rotate_batch(q: Any, v: Any) -> Array:
+    return np.einsum("...ij,...j->...i", quat_to_matrix_batch(q), _columns(v, 3))  # type: ignore[no-any-return]
+
+
+def rotate_inverse_batch(q: Any, v: Any) -> Array:
+    return np.einsum("...ji,...j->...i", quat_to_matrix_batch(q), _columns(v, 3))  # type: ignore[no-any-return]
+
+
+def gravity_batch(q: Any, g: float = STANDARD_GRAVITY) -> Array:
+    w, x, y, z = np.moveaxis(_columns(q, 4), -1, 0)
+    return np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=-1) * g
+
+
+def remove_gravity_batch(q: Any, acc: Any, g: float = STANDARD_GRAVITY) -> Array:
+    return _columns(acc, 3) - gravity_batch(q, g)  # type: ignore[no-any-return]
+
+
+def quat_to_euler_batch(q: Any, orientation: OrientationUnits = OrientationUnits.WINDOWS) -> Array:
+    w, x, y, z = np.moveaxis(_columns(q, 4), -1, 0)
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    roll = np.arcsin(np.clip(2 * (w * y - z * x), -1.0, 1.0))
+    pitch = np.arctan2(2 * (w * x + y * z), 1 - 2 * (x * x + y * y))
+    if orientation == OrientationUnits.ANDROID:
+        pitch = -pitch
+    return np.stack([np.mod(-yaw, 2 * np.pi), roll, pitch], axis=-1)
+
+
+def euler_to_quat_batch(euler: Any, orientation: OrientationUnits = OrientationUnits.WINDOWS) -> Array:
+    heading, roll, pitch = np.moveaxis(_columns(euler, 3), -1, 0)
+    if orientation == OrientationUnits.ANDROID:
+        pitch = -pitch
+    cy, sy = np.cos(-heading / 2), np.sin(-heading / 2)
+    cp, sp = np.cos(roll / 2), np.sin(roll / 2)
+    cr, sr = np.cos(pitch / 2), np.sin(pitch / 2)
+    return np.stack(
+        [
+            cr * cp * cy + sr * sp * sy,
+            sr * cp * cy - cr * sp * sy,
+            cr * sp * cy + sr * cp * sy,
+            cr * cp * sy - sr * sp * cy,
+        ],
+        axis=-1,
+    )
@@ -0,0 +1,56 @@
+# interrupt bits and INT pin edge sources
+# section 3.7, 4.3.56, 4.4.10, 4.4.11
+
+from enum import IntFlag as _IntFlag
+from typing import Protocol
+
+
+# bit layout shared by INT_STA (page 0), INT_MSK and INT_EN (page 1)
+class InterruptFlag(_IntFlag):
+    # accelerometer slow/no motion
+    ACC_NM = 0b1000_0000
+    # accelerometer any motion
+    ACC_AM = 0b0100_0000
+    ACC_HIGH_G = 0b0010_0000
+    # data ready bits depend on the firmware revision
+    GYR_DRDY = 0b0001_0000
+    GYR_HIGH_RATE = 0b0000_1000
+    # gyroscope any motion
+    GYRO_AM = 0b0000_0100
+    MAG_DRDY = 0b0000_0010
+    ACC_BSX_DRDY = 0b0000_0001
+    NONE = 0b0000_0000
+
+
+# axis enable bits of ACC_INT_Settings (bits 2 to 4) and GYR_INT_SETTING (bits 0 to 2)
+class Axis(_IntFlag):
+    X = 0b001
+    Y = 0b010
+    Z = 0b100
+    ALL = 0b111
+
+
+# something that can block until the BNO055 INT pin fires
+class EdgeSource(Protocol):
+    # True when an edge was seen, False on timeout
+    def wait(self, timeout: float | None) -> bool: ...
+
+
+# INT pin wired to a Raspberry Pi GPIO, watched with RPi.GPIO (BCM numbering)
+# RPi.GPIO is only imported when this class is used
+class GPIOEdgeSource:
+    def __init__(self, pin: int, rising: bool = True) -> None:
+        import RPi.GPIO as GPIO
+
+        self._gpio = GPIO
+        self._pin = pin
+        self._edge = GPIO.RISING if rising else GPIO.FALLING
+        GPIO.setmode(GPIO.BCM)
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_DOWN if rising else GPIO.PUD_UP)
+
+    def wait(self, timeout: float | None) -> bool:
+        timeout_ms = -1 if timeout is None else max(1, int(timeout * 1000))
+        return self._gpio.wait_for_edge(self._pin, self._edge, timeout=timeout_ms) is not None
+
+    def close(self) -> None:
+        self._gpio.cleanup(self._pin)
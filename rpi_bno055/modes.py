@@ -20,3 +20,9 @@ COMPASS = OperatingMode(0b0000_1001)
 M4G = OperatingMode(0b0000_1010)
 NDOF_FMC_OFF = OperatingMode(0b0000_1011)
 NDOF = OperatingMode(0b0000_1100)
+
+# time needed to switch modes, in seconds (section 3.3, table 3-6)
+# any operation mode -> CONFIG
+CONFIG_SWITCH_TIME = 0.019
+# CONFIG -> any operation mode
+OPERATION_SWITCH_TIME = 0.007
@@ -0,0 +1,168 @@
+# several BNO055s on one or more I2C buses, sampled together
+
+import threading
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import monotonic, sleep
+from types import TracebackType
+
+from typing_extensions import Self
+
+from . import constants
+from .bno055 import BNO055
+from .bus import SMBusLike, open_bus
+from .modes import OperatingMode
+from .policy import IOPolicy
+from .snapshot import Sensor, Snapshot
+
+
+@dataclass(frozen=True)
+class Device:
+    port: str | int = constants.DEFAULT_I2C_PORT
+    address: int = constants.DEFAULT_ADDRESS
+    # key of this device in MultiSnapshot; "<port>:<address>" when empty
+    name: str = ""
+
+    @property
+    def key(self) -> str:
+        return self.name or f"{self.port}:{self.address:#04x}"
+
+
+# one snapshot of every device
+@dataclass(frozen=True, slots=True)
+class MultiSnapshot:
+    # mean of the device timestamps
+    timestamp: float
+    snapshots: dict[str, Snapshot]
+    # latest minus earliest device timestamp
+    skew: float
+    # device timestamp minus `timestamp`, per device
+    offsets: dict[str, float]
+
+
+class BNO055Array:
+    """
+    One shared bus handle per port and one worker thread per bus, so devices on different buses are
+    read in parallel and devices sharing a bus are read back to back without contending for it.
+    Devices on the same bus are read round-robin, rotating the first device each cycle so that no
+    device is always last.
+
+    # Sample Code
+    ```python
+    with BNO055Array([Device(1, 0x28), Device(1, 0x29), Device(3, 0x28), Device(3, 0x29)]) as imus:
+        imus.begin()
+        imus.write_mode(BNO055.modes.NDOF)
+        for sample in imus.stream(rate_hz=100, sensors=Sensor.FUSION):
+            print(sample.skew)
+    ```
+    """
+
+    def __init__(
+        self,
+        devices: Sequence[Device],
+        parallel: bool = True,
+        bus_factory: Callable[[str | int], SMBusLike] = open_bus,
+        policy: IOPolicy | None = None,
+    ) -> None:
+        keys = [d.key for d in devices]
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"duplicate devices: {keys}")
+        self._buses: dict[str | int, SMBusLike] = {}
+        self._locks: dict[str | int, threading.Lock] = {}
+        self._groups: dict[str | int, list[tuple[str, BNO055]]] = {}
+        self._devices: dict[str, BNO055] = {}
+        for device in devices:
+            if device.port not in self._buses:
+                self._buses[device.port] = bus_factory(device.port)
+                self._locks[device.port] = threading.Lock()
+                self._groups[device.port] = []
+            bno055 = BNO055(device.address, self._buses[device.port], policy=policy)
+            self._groups[device.port].append((device.key, bno055))
+            self._devices[device.key] = bno055
+        self._cycle = 0
+        self._executor = ThreadPoolExecutor(max_workers=len(self._buses)) if parallel and len(self._buses) > 1 else None
+
+    @property
+    def devices(self) -> dict[str, BNO055]:
+        return dict(self._devices)
+
+    def __getitem__(self, key: str) -> BNO055:
+        return self._devices[key]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        for bus in self._buses.values():
+            bus.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    # call `func` on every device, one bus at a time per worker
+    def for_each(self, func: Callable[[BNO055], object]) -> None:
+        def run(port: str | int) -> None:
+            with self._locks[port]:
+                for _, bno055 in self._groups[port]:
+                    func(bno055)
+
+        self._map(run)
+
+    def begin(self) -> None:
+        self.for_each(BNO055.begin)
+
+    def write_mode(self, mode: OperatingMode) -> None:
+        self.for_each(lambda b: b.write_mode(mode))
+
+    def read_snapshots(self, sensors: Sensor = Sensor.ALL) -> MultiSnapshot:
+        cycle = self._cycle
+        self._cycle += 1
+        snapshots: dict[str, Snapshot] = {}
+
+        def run(port: str | int) -> None:
+            group = self._groups[port]
+            first = cycle % len(group)
+            with self._locks[port]:
+                for key, bno055 in group[first:] + group[:first]:
+                    snapshots[key] = bno055.read_snapshot(sensors)
+
+        self._map(run)
+        stamps = {key: s.timestamp for key, s in snapshots.items()}
+        mean = sum(stamps.values()) / len(stamps)
+        return MultiSnapshot(
+            timestamp=mean,
+            snapshots={key: snapshots[key] for key in self._devices},
+            skew=max(stamps.values()) - min(stamps.values()),
+            offsets={key: stamps[key] - mean for key in self._devices},
+        )
+
+    # read_snapshots() every 1 / rate_hz seconds on absolute deadlines; missed ticks are skipped
+    def stream(self, rate_hz: float = 100.0, sensors: Sensor = Sensor.ALL) -> Iterator[MultiSnapshot]:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive: {rate_hz}")
+        period = 1 / rate_hz
+        deadline = monotonic()
+        while True:
+            yield self.read_snapshots(sensors)
+            deadline += period
+            delay = deadline - monotonic()
+            if delay < 0:
+                deadline += (-delay // period + 1) * period
+                delay = deadline - monotonic()
+            sleep(delay)
+
+    def _map(self, run: Callable[[str | int], None]) -> None:
+        if self._executor is None:
+            for port in self._groups:
+                run(port)
+            return
+        # list() propagates the first exception raised by a worker
+        list(self._executor.map(run, self._groups))
@@ -0,0 +1,73 @@
+# retry policy and error statistics of the bus transactions made by BNO055
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .bno055 import BNO055
+
+
+@dataclass(frozen=True)
+class IOPolicy:
+    """
+    How BNO055 handles an OSError from a single bus transaction: it is retried up to `retries` times,
+    waiting `backoff` seconds before the first retry and `backoff_factor` times longer before each
+    following one, capped at `max_backoff`. With `deadline`, a transaction gives up once that many
+    seconds have passed since its first attempt, whatever `retries` allows.
+
+    `recover(bno055, error)` runs before every retry, e.g. to reopen the bus after the I2C adapter
+    went away. The default policy never retries, so every OSError reaches the caller as before.
+
+    # Sample Code
+    ```python
+    def reopen(bno055: BNO055, error: OSError) -> None:
+        if error.errno == errno.ENODEV:
+            bno055.bus = open_bus(1)
+
+    bno055 = BNO055(policy=IOPolicy(retries=3, backoff=0.002, deadline=0.05, recover=reopen))
+    ...
+    print(bno055.stats())
+    ```
+    """
+
+    retries: int = 0
+    backoff: float = 0.001
+    backoff_factor: float = 2.0
+    max_backoff: float = 0.1
+    deadline: float | None = None
+    recover: "Callable[[BNO055, OSError], None] | None" = None
+
+    def __post_init__(self) -> None:
+        if self.retries < 0:
+            raise ValueError(f"retries must not be negative: {self.retries}")
+        if self.backoff < 0 or self.backoff_factor < 1 or self.max_backoff < 0:
+            raise ValueError("backoff must not be negative and backoff_factor must be at least 1")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError(f"deadline must be positive: {self.deadline}")
+
+    # seconds to wait before retry number `attempt` (0 for the first retry)
+    def delay(self, attempt: int) -> float:
+        return min(self.max_backoff, self.backoff * self.backoff_factor**attempt)
+
+
+# policy for long-running loops on a connector which drops the odd transaction
+RESILIENT = IOPolicy(retries=3, backoff=0.002, max_backoff=0.05, deadline=0.25)
+
+
+@dataclass
+class IOStats:
+    # transactions attempted, including retries
+    transactions: int = 0
+    # attempts which raised OSError
+    errors: int = 0
+    retries: int = 0
+    # transactions which gave up and raised to the caller
+    failures: int = 0
+    # calls of IOPolicy.recover
+    recoveries: int = 0
+    # seconds spent in transactions, including retries and backoff
+    io_time: float = 0.0
+    # seconds of that spent backing off
+    backoff_time: float = 0.0
+    last_error: OSError | None = None
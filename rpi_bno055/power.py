@@ -0,0 +1,266 @@
+# duty cycling: keep the chip suspended between short active windows in which a batch of samples is read,
+# so a unit needing a few samples per second (or per minute) draws a fraction of the normal-mode current
+# section 3.2, 3.3
+
+import math
+from collections.abc import Iterator
+from dataclasses import dataclass
+from time import monotonic, sleep
+from types import TracebackType
+
+from typing_extensions import Self
+
+from . import modes, power_modes
+from .bno055 import BNO055
+from .modes import OperatingMode
+from .power_modes import PowerMode
+from .regaddrs0 import RegisterAddress
+from .schedule import channel_rates
+from .snapshot import Sensor, Snapshot, decode_snapshot, span_of
+
+# PWR_MODE is only writable in CONFIG mode (section 3.2), so every transition crosses it:
+# suspend: operation mode -> CONFIG, PWR_MODE = SUSPEND; wake: PWR_MODE = NORMAL, CONFIG -> operation mode
+TRANSITION_TIME = modes.CONFIG_SWITCH_TIME + modes.OPERATION_SWITCH_TIME
+
+
+# typical supply current in amperes at 3.3 V (section 1.2)
+@dataclass(frozen=True)
+class CurrentModel:
+    # all sensors and the fusion running
+    normal: float = 12.3e-3
+    # only the accelerometer running, waiting for motion
+    low_power: float = 0.33e-3
+    suspend: float = 0.04e-3
+
+    def of(self, mode: PowerMode) -> float:
+        if mode == power_modes.LOW_POWER:
+            return self.low_power
+        if mode == power_modes.SUSPEND:
+            return self.suspend
+        return self.normal
+
+
+# how one sampling requirement is met: every `period` seconds the chip wakes, settles, reads
+# `batch` samples `interval` seconds apart and goes back to `idle_mode`
+@dataclass(frozen=True)
+class DutyCycle:
+    mode: OperatingMode
+    sensors: Sensor
+    period: float
+    batch: int
+    interval: float
+    # seconds waited after the switch into the operation mode before the first read
+    settle: float
+    idle_mode: PowerMode
+    # the chip never sleeps: the idle time would not cover the transitions
+    continuous: bool
+    currents: CurrentModel = CurrentModel()
+
+    # seconds per period spent in NORMAL power mode
+    @property
+    def active_time(self) -> float:
+        if self.continuous:
+            return self.period
+        return TRANSITION_TIME + self.settle + (self.batch - 1) * self.interval
+
+    @property
+    def duty_cycle(self) -> float:
+        return min(1.0, self.active_time / self.period)
+
+    @property
+    def rate_hz(self) -> float:
+        return self.batch / self.period
+
+    # estimated average supply current in amperes
+    @property
+    def average_current(self) -> float:
+        duty = self.duty_cycle
+        return duty * self.currents.normal + (1 - duty) * self.currents.of(self.idle_mode)
+
+    # estimated hours a battery of `capacity_mah` lasts on the sensor alone
+    def battery_life(self, capacity_mah: float) -> float:
+        return capacity_mah * 1e-3 / self.average_current
+
+
+# the duty cycle delivering `rate_hz` samples per second of `sensors` in `mode` in batches at most `latency`
+# seconds apart (one sample every 1 / rate_hz seconds when that is longer); the samples of a batch are
+# taken back to back at the output rate of the slowest of `sensors` (see schedule.channel_rates)
+# settle: by default one output period of the slowest of `sensors`, after which every channel holds a sample
+#   taken since the wake-up; entering CONFIG mode zeroes the data registers (section 3.3.1)
+def plan_duty_cycle(
+    rate_hz: float,
+    latency: float,
+    mode: OperatingMode = modes.NDOF,
+    sensors: Sensor = Sensor.FUSION,
+    settle: float | None = None,
+    idle_mode: PowerMode = power_modes.SUSPEND,
+    currents: CurrentModel = CurrentModel(),
+) -> DutyCycle:
+    if rate_hz <= 0:
+        raise ValueError(f"rate_hz must be positive: {rate_hz}")
+    if latency <= 0:
+        raise ValueError(f"latency must be positive: {latency}")
+    if idle_mode == power_modes.NORMAL:
+        raise ValueError("idle_mode must be LOW_POWER or SUSPEND")
+    rates = [r for s, r in channel_rates(mode).items() if s in sensors]
+    if not rates:
+        raise ValueError(f"mode {mode} produces none of {sensors!r}")
+    output_rate = min(rates)
+    if rate_hz > output_rate:
+        raise ValueError(f"{rate_hz} Hz is faster than the {output_rate} Hz mode {mode} produces")
+    batch = max(1, math.floor(rate_hz * latency))
+    period = batch / rate_hz
+    interval = 1 / output_rate
+    if settle is None:
+        settle = interval
+    idle = period - (TRANSITION_TIME + settle + (batch - 1) * interval)
+    continuous = idle < TRANSITION_TIME
+    if continuous:
+        interval = 1 / rate_hz
+    return DutyCycle(mode, sensors, period, batch, interval, settle, idle_mode, continuous, currents)
+
+
+class PowerManager:
+    """
+    Runs `bno055` on a DutyCycle: each window wakes the chip into the operation mode, waits the settle time
+    for the data registers to hold a sample taken after the wake-up, reads the batch and puts the chip back into
+    the idle power mode.
+    Calibration and configuration survive suspend, so nothing but PWR_MODE and OPR_MODE is written.
+
+    A continuous duty cycle keeps the chip in NORMAL mode and simply reads at the requested rate.
+
+    # Sample Code
+    ```python
+    plan = plan_duty_cycle(rate_hz=0.5, latency=60, mode=BNO055.modes.NDOF, sensors=Sensor.FUSION)
+    print(f"{plan.duty_cycle:.2%}, {plan.average_current * 1e3:.2f} mA, {plan.battery_life(2000) / 24:.0f} days")
+    with PowerManager(bno055, plan) as manager:
+        for batch in manager.run():
+            upload(batch)
+    ```
+    """
+
+    def __init__(self, bno055: BNO055, plan: DutyCycle) -> None:
+        self._bno055 = bno055
+        self._plan = plan
+        self._start, self._length = span_of(plan.sensors)
+        self._awake = False
+        # time.monotonic() of the last switch into the operation mode
+        self._woken_at = 0.0
+        self._active_time = 0.0
+        self._started_at: float | None = None
+        self.windows = 0
+
+    @property
+    def plan(self) -> DutyCycle:
+        return self._plan
+
+    @property
+    def awake(self) -> bool:
+        return self._awake
+
+    # fraction of the time since the first window spent awake, measured
+    @property
+    def duty_cycle(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        elapsed = monotonic() - self._started_at
+        return min(1.0, self._active_time / elapsed) if elapsed > 0 else 1.0
+
+    # average supply current in amperes estimated from the measured duty cycle
+    @property
+    def average_current(self) -> float:
+        duty = self.duty_cycle
+        currents = self._plan.currents
+        return duty * currents.normal + (1 - duty) * currents.of(self._plan.idle_mode)
+
+    # NORMAL power mode and the operation mode of the plan; the first sample is not read here
+    def wake(self) -> None:
+        bno055 = self._bno055
+        if bno055.read_mode() & 0b1111 != modes.CONFIG:
+            bno055.write_mode(modes.CONFIG)
+            sleep(modes.CONFIG_SWITCH_TIME)
+        bno055.write_power_mode(power_modes.NORMAL)
+        bno055.write_mode(self._plan.mode)
+        sleep(modes.OPERATION_SWITCH_TIME)
+        self._woken_at = monotonic()
+        self._awake = True
+
+    # the idle power mode of the plan: SUSPEND is left in CONFIG mode, LOW_POWER goes back to the
+    # operation mode so the accelerometer keeps watching for motion
+    def idle(self) -> None:
+        bno055 = self._bno055
+        bno055.write_mode(modes.CONFIG)
+        sleep(modes.CONFIG_SWITCH_TIME)
+        bno055.write_power_mode(self._plan.idle_mode)
+        if self._plan.idle_mode == power_modes.LOW_POWER:
+            bno055.write_mode(self._plan.mode)
+            sleep(modes.OPERATION_SWITCH_TIME)
+        self._awake = False
+
+    # wake, read one batch and go idle again
+    def window(self) -> list[Snapshot]:
+        plan = self._plan
+        begin = monotonic()
+        if self._started_at is None:
+            self._started_at = begin
+        try:
+            if not self._awake:
+                self.wake()
+            self._settle()
+            raw = self._read()
+            batch = [self._decode(raw, self._bno055.read_time)]
+            deadline = monotonic()
+            for _ in range(plan.batch - 1):
+                deadline += plan.interval
+                delay = deadline - monotonic()
+                if delay > 0:
+                    sleep(delay)
+                raw = self._read()
+                batch.append(self._decode(raw, self._bno055.read_time))
+        finally:
+            if not plan.continuous:
+                self.idle()
+            self._active_time += plan.period if plan.continuous else monotonic() - begin
+        self.windows += 1
+        return batch
+
+    # one batch per period, on absolute deadlines; windows missed because one took too long are skipped
+    def run(self) -> Iterator[list[Snapshot]]:
+        period = self._plan.period
+        deadline = monotonic()
+        while True:
+            yield self.window()
+            deadline += period
+            delay = deadline - monotonic()
+            if delay < 0:
+                deadline += (-delay // period + 1) * period
+                delay = deadline - monotonic()
+            sleep(delay)
+
+    def close(self) -> None:
+        if self._awake:
+            self.idle()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _read(self) -> bytes:
+        return bytes(self._bno055.read_span(RegisterAddress(self._start), self._length))
+
+    # until `settle` seconds after the wake-up; a no-op for a continuous plan once it is running
+    def _settle(self) -> None:
+        delay = self._woken_at + self._plan.settle - monotonic()
+        if delay > 0:
+            sleep(delay)
+
+    # `timestamp` is taken before unit_scale(), which may read UNIT_SEL and so move read_time
+    def _decode(self, raw: bytes, timestamp: float) -> Snapshot:
+        return decode_snapshot(raw, self._plan.sensors, self._bno055.unit_scale(), timestamp, self._start)
@@ -0,0 +1,385 @@
+# append-only binary recording of raw data block spans, and a memory-mapped reader for replay
+#
+# layout, all little-endian:
+#   header, HEADER_SIZE bytes (see _HEADER)
+#   records, record_size bytes each: f64 time.monotonic() of the read, then the raw span of `sensors`
+# a record cut short by a crash or power loss is ignored by the reader
+
+import contextlib
+import mmap
+import os
+import struct
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic, time
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+from typing_extensions import Self
+
+from .bno055 import BNO055
+from .calibration import PROFILE_LENGTH, CalibrationProfile
+from .snapshot import SENSOR_REGISTERS, Sensor, Snapshot, decode_snapshot, span_of
+from .unit_sel import UnitScale, UnitSelection
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+MAGIC = b"BNO055R\x00"
+FORMAT_VERSION = 1
+# the header is padded to this size, leaving room for new fields
+HEADER_SIZE = 128
+
+# magic, version, header size, record size, sensors, span start, span length, UNIT_SEL, OPR_MODE, flags,
+# reserved, calibration profile, UNIQUE_ID, nominal rate in Hz, time.time() and time.monotonic() at start
+_HEADER = struct.Struct(f"<8sHHHHBBBBBx{PROFILE_LENGTH}s16sddd")
+_TIMESTAMP = struct.Struct("<d")
+_FLAG_PROFILE = 0b1
+
+# numpy field name, element type and count of every sensor within a record
+_FIELDS: dict[Sensor, tuple[str, str, int]] = {
+    Sensor.ACCELEROMETER: ("accelerometer", "<i2", 3),
+    Sensor.MAGNETOMETER: ("magnetometer", "<i2", 3),
+    Sensor.GYROSCOPE: ("gyroscope", "<i2", 3),
+    Sensor.EULER: ("euler", "<i2", 3),
+    Sensor.QUATERNION: ("quaternion", "<i2", 4),
+    Sensor.LINEAR_ACCEL: ("linear_accel", "<i2", 3),
+    Sensor.GRAVITY: ("gravity", "<i2", 3),
+    Sensor.TEMPERATURE: ("temperature", "i1", 1),
+    Sensor.CALIBRATION: ("calibration_status", "u1", 1),
+}
+
+
+@dataclass(frozen=True)
+class RecordingHeader:
+    sensors: Sensor
+    # UNIT_SEL register value the spans were recorded under
+    unit_selection: int
+    # OPR_MODE register value
+    operating_mode: int
+    calibration_profile: CalibrationProfile | None = None
+    unique_id: bytes = bytes(16)
+    # requested sample rate; the actual rate follows from the timestamps
+    rate_hz: float = 0.0
+    # time.time() and time.monotonic() when recording started, to map record timestamps to wall-clock time
+    wall_time: float = 0.0
+    monotonic_time: float = 0.0
+    version: int = FORMAT_VERSION
+
+    @property
+    def span(self) -> tuple[int, int]:
+        return span_of(self.sensors)
+
+    @property
+    def record_size(self) -> int:
+        return _TIMESTAMP.size + self.span[1]
+
+    def to_bytes(self) -> bytes:
+        start, length = self.span
+        profile = self.calibration_profile
+        flags = _FLAG_PROFILE if profile is not None else 0
+        header = _HEADER.pack(
+            MAGIC,
+            self.version,
+            HEADER_SIZE,
+            self.record_size,
+            int(self.sensors),
+            start,
+            length,
+            self.unit_selection,
+            self.operating_mode,
+            flags,
+            profile.to_bytes() if profile is not None else bytes(PROFILE_LENGTH),
+            self.unique_id,
+            self.rate_hz,
+            self.wall_time,
+            self.monotonic_time,
+        )
+        return header.ljust(HEADER_SIZE, b"\x00")
+
+    @classmethod
+    def from_bytes(cls, buf: bytes) -> Self:
+        if len(buf) < _HEADER.size or buf[: len(MAGIC)] != MAGIC:
+            raise ValueError("not a BNO055 recording")
+        (
+            _,
+            version,
+            header_size,
+            record_size,
+            sensors,
+            start,
+            length,
+            unit_sel,
+            mode,
+            flags,
+            profile,
+            uid,
+            rate_hz,
+            wall_time,
+            mono,
+        ) = _HEADER.unpack_from(buf)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording version: {version}")
+        header = cls(
+            Sensor(sensors),
+            unit_sel,
+            mode,
+            CalibrationProfile.from_bytes(profile) if flags & _FLAG_PROFILE else None,
+            uid,
+            rate_hz,
+            wall_time,
+            mono,
+            version,
+        )
+        if header_size != HEADER_SIZE or header.span != (start, length) or header.record_size != record_size:
+            raise ValueError("corrupt recording header")
+        return header
+
+
+class Recorder:
+    """
+    Appends raw spans with their timestamps to `path`, which is created or truncated.
+    Records go through a write buffer and reach the disk every `flush_interval` seconds, so an
+    SD card sees a few large writes instead of one per sample; at most `flush_interval` seconds
+    of data are lost on a power cut.
+
+    # Sample Code
+    ```python
+    with Recorder.from_bno055("imu.bno", bno055, Sensor.FUSION, rate_hz=100) as recorder:
+        with BNO055Sampler(bno055, rate_hz=100, sensors=Sensor.FUSION) as sampler:
+            while True:
+                sleep(1.0)
+                recorder.extend(*sampler.drain_raw())
+    ```
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        header: RecordingHeader,
+        flush_interval: float = 1.0,
+        fsync: bool = True,
+    ) -> None:
+        self._header = header
+        self._length = header.span[1]
+        self._record_size = header.record_size
+        self._flush_interval = flush_interval
+        self._fsync = fsync
+        self._file: BinaryIO = open(path, "wb", buffering=64 * 1024)  # noqa: SIM115
+        self._file.write(header.to_bytes())
+        self._flushed_at = monotonic()
+        self.count = 0
+
+    @classmethod
+    def from_bno055(
+        cls,
+        path: str | Path,
+        bno055: BNO055,
+        sensors: Sensor = Sensor.ALL,
+        rate_hz: float = 0.0,
+        with_profile: bool = True,
+        flush_interval: float = 1.0,
+        fsync: bool = True,
+    ) -> Self:
+        # reading the profile needs CONFIG mode, so do it before sampling starts
+        profile = bno055.read_calibration_profile() if with_profile else None
+        header = RecordingHeader(
+            sensors=sensors,
+            unit_selection=bno055.refresh_units().value,
+            operating_mode=int(bno055.read_mode()),
+            calibration_profile=profile,
+            unique_id=bno055.read_unique_id(),
+            rate_hz=rate_hz,
+            wall_time=time(),
+            monotonic_time=monotonic(),
+        )
+        return cls(path, header, flush_interval, fsync)
+
+    @property
+    def header(self) -> RecordingHeader:
+        return self._header
+
+    def append(self, timestamp: float, span: bytes | Sequence[int]) -> None:
+        if len(span) != self._length:
+            raise ValueError(f"span must be {self._length} bytes: got {len(span)}")
+        self._file.write(_TIMESTAMP.pack(timestamp))
+        self._file.write(span if isinstance(span, bytes) else bytes(span))
+        self.count += 1
+        self._maybe_flush()
+
+    # back-to-back spans and their timestamps, as returned by BNO055Sampler.drain_raw()
+    def extend(self, raw: bytes, timestamps: Sequence[float]) -> None:
+        length = self._length
+        if len(raw) != length * len(timestamps):
+            raise ValueError(f"expected {len(timestamps)} spans of {length} bytes: got {len(raw)} bytes")
+        size = self._record_size
+        out = bytearray(size * len(timestamps))
+        for i, timestamp in enumerate(timestamps):
+            _TIMESTAMP.pack_into(out, i * size, timestamp)
+            out[i * size + _TIMESTAMP.size : (i + 1) * size] = raw[i * length : (i + 1) * length]
+        self._file.write(out)
+        self.count += len(timestamps)
+        self._maybe_flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._flushed_at = monotonic()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _maybe_flush(self) -> None:
+        if monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+
+
+class Recording:
+    """
+    Memory-maps a file written by Recorder. Opening is O(1) whatever the length of the recording,
+    and the NumPy accessors (`records`, `timestamps`, `raw()`) are views into the mapping, so only
+    the pages actually touched are read from disk.
+
+    # Sample Code
+    ```python
+    with Recording("imu.bno") as rec:
+        t = rec.timestamps - rec.timestamps[0]
+        euler = rec.channel(Sensor.EULER)  # (N, 3), in the recorded units
+    ```
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as f:
+            self._header = RecordingHeader.from_bytes(f.read(HEADER_SIZE))
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._record_size = self._header.record_size
+        self._count = (size - HEADER_SIZE) // self._record_size
+
+    @property
+    def header(self) -> RecordingHeader:
+        return self._header
+
+    @property
+    def sensors(self) -> Sensor:
+        return self._header.sensors
+
+    @property
+    def unit_selection(self) -> UnitSelection:
+        return UnitSelection.from_value(self._header.unit_selection)
+
+    @property
+    def unit_scale(self) -> UnitScale:
+        return UnitScale.from_value(self._header.unit_selection)
+
+    def __len__(self) -> int:
+        return self._count
+
+    # raw span of record `index`, without the timestamp
+    def span(self, index: int) -> memoryview:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = HEADER_SIZE + index * self._record_size + _TIMESTAMP.size
+        return memoryview(self._mmap)[offset : offset + self._record_size - _TIMESTAMP.size]
+
+    def timestamp(self, index: int) -> float:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        (timestamp,) = _TIMESTAMP.unpack_from(self._mmap, HEADER_SIZE + index * self._record_size)
+        return float(timestamp)
+
+    # decode every record into a Snapshot; works without NumPy
+    def __iter__(self) -> Iterator[Snapshot]:
+        sensors = self.sensors
+        start = self._header.span[0]
+        scale = self.unit_scale
+        for i in range(self._count):
+            yield decode_snapshot(self.span(i), sensors, scale, self.timestamp(i), start)
+
+    # structured array over the mapping with a "timestamp" field and one field per recorded sensor
+    # holding the raw register values
+    @property
+    def records(self) -> "npt.NDArray[Any]":
+        _require_numpy()
+        return np.frombuffer(self._mmap, dtype=self._dtype(), count=self._count, offset=HEADER_SIZE)
+
+    @property
+    def timestamps(self) -> "npt.NDArray[np.float64]":
+        return self.records["timestamp"]
+
+    # record timestamps as time.time() values
+    @property
+    def wall_times(self) -> "npt.NDArray[np.float64]":
+        header = self._header
+        return self.timestamps + (header.wall_time - header.monotonic_time)
+
+    # raw register values of `sensor`: (N, k) int16 for vectors, (N,) int8 temperature and
+    # (N,) uint8 CALIB_STAT; a view, not a copy
+    def raw(self, sensor: Sensor) -> "npt.NDArray[Any]":
+        if sensor not in _FIELDS or sensor not in self.sensors:
+            raise KeyError(f"{sensor!r} was not recorded")
+        return self.records[_FIELDS[sensor][0]]
+
+    # values of `sensor` scaled to the recorded units, same shapes as batch.decode_blocks()
+    def channel(self, sensor: Sensor, dtype: str = "float64") -> "npt.NDArray[Any]":
+        values = self.raw(sensor)
+        if sensor == Sensor.CALIBRATION:
+            return np.stack([(values >> 0) & 0b11, (values >> 2) & 0b11, (values >> 4) & 0b11, (values >> 6) & 0b11], 1)
+        from .batch import scales_of
+
+        scale = scales_of(sensor, self.unit_scale)[sensor]
+        return values.astype(dtype) * np.asarray(scale, dtype=dtype)  # type: ignore[no-any-return]
+
+    def close(self) -> None:
+        # arrays returned by the accessors may still point into the mapping; it is unmapped once they are gone
+        with contextlib.suppress(BufferError):
+            self._mmap.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _dtype(self) -> "np.dtype[Any]":
+        start = self._header.span[0]
+        names, formats, offsets = ["timestamp"], ["<f8"], [0]
+        for sensor, (name, kind, count) in _FIELDS.items():
+            if sensor in self.sensors:
+                names.append(name)
+                formats.append(kind if count == 1 else f"({count},){kind}")
+                offsets.append(_TIMESTAMP.size + SENSOR_REGISTERS[sensor][0] - start)
+        return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": self._record_size})
+
+
+def _require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for array access to recordings: pip install rpi_bno055[numpy]")
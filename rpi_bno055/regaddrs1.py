@@ -0,0 +1,51 @@
+# register addresses of Page 1
+# section 4.2.2, Table 4-3
+
+from .regaddrs0 import RegisterAddress
+
+# 16 bytes of chip unique ID, 0x50 to 0x5F, read-only
+UNIQUE_ID_LAST = RegisterAddress(0x5F)
+UNIQUE_ID_FIRST = RegisterAddress(0x50)
+# Gyroscope any motion interrupt settings
+GYR_AM_SET = RegisterAddress(0x1F)
+# Gyroscope any motion interrupt threshold
+GYR_AM_THRES = RegisterAddress(0x1E)
+# Gyroscope high rate interrupt settings
+GYR_DUR_Z = RegisterAddress(0x1D)
+GYR_HR_Z_SET = RegisterAddress(0x1C)
+GYR_DUR_Y = RegisterAddress(0x1B)
+GYR_HR_Y_SET = RegisterAddress(0x1A)
+GYR_DUR_X = RegisterAddress(0x19)
+GYR_HR_X_SET = RegisterAddress(0x18)
+# Gyroscope interrupt axis and filter settings
+GYR_INT_SETTING = RegisterAddress(0x17)
+# Accelerometer slow/no motion interrupt settings
+ACC_NM_SET = RegisterAddress(0x16)
+# Accelerometer slow/no motion interrupt threshold
+ACC_NM_THRES = RegisterAddress(0x15)
+# Accelerometer high-g interrupt threshold and duration
+ACC_HG_THRES = RegisterAddress(0x14)
+ACC_HG_DURATION = RegisterAddress(0x13)
+# Accelerometer any motion and high-g interrupt axis settings
+ACC_INT_SETTINGS = RegisterAddress(0x12)
+# Accelerometer any motion interrupt threshold
+ACC_AM_THRES = RegisterAddress(0x11)
+# Interrupt enable, same bit layout as `INT_STA` on page 0
+INT_EN = RegisterAddress(0x10)
+# Interrupt routing to the INT pin, same bit layout as `INT_STA` on page 0
+INT_MSK = RegisterAddress(0x0F)
+# Gyroscope sleep settings
+GYR_SLEEP_CONFIG = RegisterAddress(0x0D)
+# Accelerometer sleep settings
+ACC_SLEEP_CONFIG = RegisterAddress(0x0C)
+# Gyroscope operation mode
+GYR_CONFIG_1 = RegisterAddress(0x0B)
+# Gyroscope range and bandwidth
+GYR_CONFIG_0 = RegisterAddress(0x0A)
+# Magnetometer data output rate, operation mode and power mode
+MAG_CONFIG = RegisterAddress(0x09)
+# Accelerometer range, bandwidth and operation mode
+ACC_CONFIG = RegisterAddress(0x08)
+# Read: Number of currently selected page
+# Write: Change page, 0x00, 0x01
+PAGE_ID = RegisterAddress(0x07)
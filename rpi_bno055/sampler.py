@@ -0,0 +1,290 @@
+# background sampling of the data block at a fixed rate into a preallocated ring buffer
+
+import dataclasses
+import threading
+from array import array
+from collections.abc import Callable
+from time import monotonic, sleep
+from types import TracebackType
+
+from typing_extensions import Self
+
+from .bno055 import BNO055
+from .change import ChangeDetector, DuplicatePolicy
+from .regaddrs0 import RegisterAddress
+from .snapshot import Sensor, Snapshot, decode_snapshot, span_of
+from .timing import SampleClock
+
+
+class BNO055Sampler:
+    """
+    Owns the bus of `bno055` from a dedicated thread and stores raw register blocks with their
+    timestamps into a fixed-size ring buffer. Only the writer thread moves the head index, so readers
+    never take a lock; they detect slots overwritten under them by re-checking the head after copying.
+
+    When polling faster than the chip updates, consecutive reads come back identical. `duplicates`
+    decides what happens to them (see DuplicatePolicy): with FLAG, Snapshot.changed tells which channels
+    are new; with SUPPRESS, identical reads are not stored at all. Either way effective_rates() reports
+    how often each channel actually changed, and on_change() callbacks run on the sampler thread for
+    every sample in which one of their channels changed.
+
+    Samples are stamped with BNO055.read_time. With a `clock`, they are stamped with its estimate of
+    when the chip produced the newest sample of the clock's channel instead, so reads in which that
+    channel did not change get the time of the sample before; poll faster than the chip updates for
+    the clock to see each sample early (see SampleClock).
+
+    # Sample Code
+    ```python
+    with BNO055Sampler(bno055, rate_hz=100, sensors=Sensor.FUSION) as sampler:
+        while True:
+            sample = sampler.wait_next(timeout=1.0)
+            ...
+
+    with BNO055Sampler(bno055, rate_hz=200, duplicates=DuplicatePolicy.SUPPRESS) as sampler:
+        sampler.on_change(lambda sample: print(sample.euler), Sensor.EULER)
+        ...
+        print(sampler.effective_rates())
+    ```
+    """
+
+    def __init__(
+        self,
+        bno055: BNO055,
+        rate_hz: float = 100.0,
+        capacity: int = 1024,
+        sensors: Sensor = Sensor.ALL,
+        duplicates: DuplicatePolicy = DuplicatePolicy.KEEP,
+        clock: SampleClock | None = None,
+    ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive: {rate_hz}")
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2: {capacity}")
+        self._bno055 = bno055
+        self._period = 1 / rate_hz
+        self._capacity = capacity
+        self._sensors = sensors
+        self._start, self._length = span_of(sensors)
+        self._buffer = bytearray(capacity * self._length)
+        # a view of every slot, made once so storing a sample allocates nothing
+        view = memoryview(self._buffer)
+        self._slots = [view[i * self._length : (i + 1) * self._length] for i in range(capacity)]
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._duplicates = duplicates
+        self._detector = ChangeDetector(sensors)
+        self._clock = clock
+        # Sensor mask of the channels changed in each slot, with DuplicatePolicy.FLAG
+        self._changed = array("H", bytes(2 * capacity))
+        self._callbacks: list[tuple[Callable[[Snapshot], None], Sensor]] = []
+        self._scale = bno055.unit_scale()
+        # number of samples ever written; slot of sample `n` is `n % capacity`
+        self._head = 0
+        # next sample returned by drain()
+        self._tail = 0
+        # next sample returned by wait_next()
+        self._next = 0
+        self._waiters = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # ticks missed because a read took longer than the period
+        self.overruns = 0
+        # samples overwritten before drain() picked them up
+        self.dropped = 0
+        # reads which failed with OSError
+        self.errors = 0
+
+    @property
+    def sensors(self) -> Sensor:
+        return self._sensors
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    # number of samples taken since start()
+    @property
+    def count(self) -> int:
+        return self._head
+
+    # reads identical to the one before, stored or not depending on the DuplicatePolicy
+    @property
+    def duplicates(self) -> int:
+        return self._detector.duplicates
+
+    @property
+    def clock(self) -> SampleClock | None:
+        return self._clock
+
+    # updates per second each channel actually delivered, as opposed to the sampling rate
+    def effective_rates(self) -> dict[Sensor, float]:
+        return self._detector.rates()
+
+    # call `callback(sample)` from the sampler thread whenever one of `sensors` changed
+    # the callback delays the next read, so it should only hand the sample over
+    def on_change(self, callback: Callable[[Snapshot], None], sensors: Sensor = Sensor.ALL) -> None:
+        self._callbacks = [*self._callbacks, (callback, sensors)]
+
+    def remove_on_change(self, callback: Callable[[Snapshot], None]) -> None:
+        self._callbacks = [(c, s) for c, s in self._callbacks if c != callback]
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="BNO055Sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        with self._cond:
+            self._cond.notify_all()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.stop()
+
+    def latest(self) -> Snapshot | None:
+        head = self._head
+        if head == 0:
+            return None
+        return self._read_slot(head - 1)
+
+    # every sample taken since the previous drain(), oldest first
+    def drain(self) -> list[Snapshot]:
+        head = self._head
+        # the slot of `head - capacity` may be being overwritten right now
+        tail = max(self._tail, head - self._capacity + 1)
+        self.dropped += tail - self._tail
+        samples: list[Snapshot] = []
+        for seq in range(tail, head):
+            sample = self._read_slot(seq)
+            if sample is None:
+                self.dropped += 1
+                continue
+            samples.append(sample)
+        self._tail = head
+        return samples
+
+    # like drain(), but without decoding: the raw spans back-to-back and their timestamps
+    # feed the result to batch.decode_blocks() to decode many samples at once
+    def drain_raw(self) -> tuple[bytes, array]:
+        head = self._head
+        tail = max(self._tail, head - self._capacity + 1)
+        self.dropped += tail - self._tail
+        self._tail = head
+        if tail == head:
+            return (b"", array("d"))
+        length = self._length
+        first, last = tail % self._capacity, head % self._capacity
+        if first < last:
+            raw = bytes(self._buffer[first * length : last * length])
+            timestamps = self._timestamps[first:last]
+        else:
+            raw = bytes(self._buffer[first * length :]) + bytes(self._buffer[: last * length])
+            timestamps = self._timestamps[first:] + self._timestamps[:last]
+        # samples whose slots were overwritten while copying are dropped from the front
+        overwritten = max(0, self._head - self._capacity + 1 - tail)
+        if overwritten:
+            self.dropped += overwritten
+            raw = raw[overwritten * length :]
+            timestamps = timestamps[overwritten:]
+        return (raw, timestamps)
+
+    # block until a sample newer than the one last returned by wait_next() is available
+    # returns None on timeout or when the sampler is stopped
+    def wait_next(self, timeout: float | None = None) -> Snapshot | None:
+        if self._head <= self._next:
+            with self._cond:
+                self._waiters += 1
+                try:
+                    self._cond.wait_for(lambda: self._head > self._next or self._stop.is_set(), timeout)
+                finally:
+                    self._waiters -= 1
+        head = self._head
+        if head <= self._next:
+            return None
+        self._next = head
+        return self._read_slot(head - 1)
+
+    # decode sample `seq`, or None if the writer has already overwritten its slot
+    def _read_slot(self, seq: int) -> Snapshot | None:
+        slot = seq % self._capacity
+        offset = slot * self._length
+        raw = bytes(self._buffer[offset : offset + self._length])
+        timestamp = self._timestamps[slot]
+        changed = self._changed[slot]
+        if self._head - seq >= self._capacity:
+            return None
+        sample = decode_snapshot(raw, self._sensors, self._scale, timestamp, self._start)
+        if self._duplicates == DuplicatePolicy.FLAG:
+            sample = dataclasses.replace(sample, changed=Sensor(changed))
+        return sample
+
+    # publish the span _run read into the slot of the next sample
+    def _store(self, raw: memoryview, timestamp: float, changed: Sensor) -> None:
+        seq = self._head
+        slot = seq % self._capacity
+        self._timestamps[slot] = timestamp
+        self._changed[slot] = changed
+        self._scale = self._bno055.unit_scale()
+        self._head = seq + 1
+        if self._waiters:
+            with self._cond:
+                self._cond.notify_all()
+        callbacks = self._callbacks
+        if changed and callbacks:
+            sample = decode_snapshot(raw, self._sensors, self._scale, timestamp, self._start)
+            sample = dataclasses.replace(sample, changed=changed)
+            for callback, sensors in callbacks:
+                if changed & sensors:
+                    callback(sample)
+
+    def _run(self) -> None:
+        period = self._period
+        register = RegisterAddress(self._start)
+        length = self._length
+        buffer = self._buffer
+        clock = self._clock
+        deadline = monotonic()
+        while not self._stop.is_set():
+            # the slot of the next sample is the one readers no longer touch (see drain), so the read goes
+            # straight into it and only becomes visible when _store moves the head
+            slot = self._head % self._capacity
+            try:
+                self._bno055.read_span_into(register, length, buffer, slot * length)
+            except OSError:
+                self.errors += 1
+            else:
+                timestamp = self._bno055.read_time
+                raw = self._slots[slot]
+                changed = self._detector.feed(raw, timestamp)
+                if clock is not None:
+                    estimate = clock.time
+                    timestamp = clock.update(timestamp) if changed & clock.sensor or estimate is None else estimate
+                if changed or self._duplicates != DuplicatePolicy.SUPPRESS:
+                    self._store(raw, timestamp, changed)
+            deadline += period
+            delay = deadline - monotonic()
+            if delay > 0:
+                sleep(delay)
+            else:
+                # skip the ticks we already missed instead of bursting to catch up
+                missed = int(-delay / period)
+                self.overruns += missed + 1
+                deadline += missed * period
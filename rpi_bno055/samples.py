@@ -0,0 +1,117 @@
+# compact sample records, and the helpers filling caller-owned float buffers without building tuples
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import NamedTuple, Protocol
+
+
+# CALIB_STAT, 0 to 3 per field; 3 indicates fully calibrated
+# a tuple, so `mag, acc, gyr, sys = status` keeps working; instances are shared, see from_value
+# section 3.10, 4.3.54
+class CalibrationStatus(NamedTuple):
+    mag: int
+    acc: int
+    gyr: int
+    sys: int
+
+    @property
+    def value(self) -> int:
+        return self.mag | (self.acc << 2) | (self.gyr << 4) | (self.sys << 6)
+
+    @property
+    def fully_calibrated(self) -> bool:
+        return self.mag == self.acc == self.gyr == self.sys == 3
+
+    # the shared instance for a CALIB_STAT register value
+    @classmethod
+    def from_value(cls, value: int) -> "CalibrationStatus":
+        return _CALIBRATION_STATUS[value & 0xFF]
+
+
+_CALIBRATION_STATUS = tuple(
+    CalibrationStatus((v >> 0) & 0b11, (v >> 2) & 0b11, (v >> 4) & 0b11, (v >> 6) & 0b11) for v in range(256)
+)
+
+
+# accelerometer, magnetometer and gyroscope from one read of ACC_DATA_X_LSB to GYR_DATA_Z_MSB
+@dataclass(frozen=True, slots=True)
+class ImuSample:
+    # time.monotonic() halfway through the read, see BNO055.read_time
+    timestamp: float
+    acc_x: float
+    acc_y: float
+    acc_z: float
+    mag_x: float
+    mag_y: float
+    mag_z: float
+    gyr_x: float
+    gyr_y: float
+    gyr_z: float
+
+    @property
+    def accelerometer(self) -> tuple[float, float, float]:
+        return (self.acc_x, self.acc_y, self.acc_z)
+
+    @property
+    def magnetometer(self) -> tuple[float, float, float]:
+        return (self.mag_x, self.mag_y, self.mag_z)
+
+    @property
+    def gyroscope(self) -> tuple[float, float, float]:
+        return (self.gyr_x, self.gyr_y, self.gyr_z)
+
+
+# fusion outputs from one read of EUL_HEADING_LSB to GRV_DATA_Z_MSB
+@dataclass(frozen=True, slots=True)
+class FusionSample:
+    # time.monotonic() halfway through the read, see BNO055.read_time
+    timestamp: float
+    heading: float
+    roll: float
+    pitch: float
+    qua_w: float
+    qua_x: float
+    qua_y: float
+    qua_z: float
+    lia_x: float
+    lia_y: float
+    lia_z: float
+    grv_x: float
+    grv_y: float
+    grv_z: float
+
+    # (heading, roll, pitch)
+    @property
+    def euler(self) -> tuple[float, float, float]:
+        return (self.heading, self.roll, self.pitch)
+
+    # (w, x, y, z)
+    @property
+    def quaternion(self) -> tuple[float, float, float, float]:
+        return (self.qua_w, self.qua_x, self.qua_y, self.qua_z)
+
+    @property
+    def linear_accel(self) -> tuple[float, float, float]:
+        return (self.lia_x, self.lia_y, self.lia_z)
+
+    @property
+    def gravity(self) -> tuple[float, float, float]:
+        return (self.grv_x, self.grv_y, self.grv_z)
+
+
+# anything indexable by int that stores floats: array("d"), a NumPy float array, a list, memoryview.cast("d")
+class FloatBuffer(Protocol):
+    def __setitem__(self, index: int, value: float, /) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+# out[offset + i] = i-th little-endian int16 of `buf` (from byte `start`) * scale, for `count` values
+def scale_i16_into(
+    buf: Sequence[int], count: int, scale: float, out: FloatBuffer, offset: int = 0, start: int = 0
+) -> None:
+    if offset < 0 or offset + count > len(out):
+        raise IndexError(f"{count} values do not fit at offset {offset} of a buffer of {len(out)}")
+    for i in range(count):
+        value = buf[start + 2 * i] | (buf[start + 2 * i + 1] << 8)
+        out[offset + i] = (value - 0x1_0000 if value & 0x8000 else value) * scale
@@ -0,0 +1,230 @@
+# read each data channel at the rate the chip actually updates it in the current operating mode,
+# merging the registers due on a tick into as few block reads as possible
+
+import dataclasses
+from collections.abc import Iterator
+from dataclasses import dataclass
+from time import monotonic, sleep
+
+from . import modes
+from .bno055 import BNO055
+from .modes import OperatingMode
+from .regaddrs0 import RegisterAddress
+from .sensor_config import AccConfig, GyrConfig, MagConfig
+from .snapshot import SENSOR_REGISTERS, Sensor, Snapshot, decode_snapshot, span_of
+
+# the temperature sensor is slow, and nobody needs CALIB_STAT faster than a UI refreshes
+TEMPERATURE_RATE = 1.0
+CALIBRATION_RATE = 1.0
+
+# bytes of padding read in exchange for one transaction less: a block read costs the address and
+# register bytes and a repeated start on top of its data, about 3 bytes on the wire
+DEFAULT_MERGE_GAP = 3
+
+_FUSION_OUTPUTS = (Sensor.EULER, Sensor.QUATERNION, Sensor.LINEAR_ACCEL, Sensor.GRAVITY)
+
+# physical sensors enabled in each operating mode (section 3.3, table 3-5)
+_MODE_SENSORS: dict[int, Sensor] = {
+    modes.CONFIG: Sensor(0),
+    modes.ACCONLY: Sensor.ACCELEROMETER,
+    modes.MAGONLY: Sensor.MAGNETOMETER,
+    modes.GYROONLY: Sensor.GYROSCOPE,
+    modes.ACCMAG: Sensor.ACCELEROMETER | Sensor.MAGNETOMETER,
+    modes.ACCGYRO: Sensor.ACCELEROMETER | Sensor.GYROSCOPE,
+    modes.MAGGYRO: Sensor.MAGNETOMETER | Sensor.GYROSCOPE,
+    modes.AMG: Sensor.RAW,
+    modes.IMU: Sensor.ACCELEROMETER | Sensor.GYROSCOPE,
+    modes.COMPASS: Sensor.ACCELEROMETER | Sensor.MAGNETOMETER,
+    modes.M4G: Sensor.ACCELEROMETER | Sensor.MAGNETOMETER,
+    modes.NDOF_FMC_OFF: Sensor.RAW,
+    modes.NDOF: Sensor.RAW,
+}
+
+# (accelerometer, magnetometer, gyroscope, fusion output) data rates of the fusion modes (section 3.3.3)
+_FUSION_RATES: dict[int, tuple[float, float, float, float]] = {
+    modes.IMU: (100.0, 0.0, 100.0, 100.0),
+    modes.COMPASS: (20.0, 20.0, 0.0, 20.0),
+    modes.M4G: (50.0, 50.0, 0.0, 50.0),
+    modes.NDOF_FMC_OFF: (100.0, 20.0, 100.0, 100.0),
+    modes.NDOF: (100.0, 20.0, 100.0, 100.0),
+}
+
+
+# output data rate in Hz of every channel `mode` produces
+# non-fusion modes run the sensors at their page 1 configuration, the reset values when not given
+def channel_rates(
+    mode: OperatingMode,
+    acc: AccConfig | None = None,
+    gyr: GyrConfig | None = None,
+    mag: MagConfig | None = None,
+) -> dict[Sensor, float]:
+    mode = OperatingMode(mode & 0b1111)
+    if mode == modes.CONFIG:
+        return {}
+    rates: dict[Sensor, float] = {}
+    if mode in _FUSION_RATES:
+        acc_rate, mag_rate, gyr_rate, fusion_rate = _FUSION_RATES[mode]
+        rates.update(dict.fromkeys(_FUSION_OUTPUTS, fusion_rate))
+    else:
+        acc_rate = (acc or AccConfig()).output_rate
+        mag_rate = (mag or MagConfig()).output_rate
+        gyr_rate = (gyr or GyrConfig()).output_rate
+    enabled = _MODE_SENSORS[mode]
+    for sensor, rate in (
+        (Sensor.ACCELEROMETER, acc_rate),
+        (Sensor.MAGNETOMETER, mag_rate),
+        (Sensor.GYROSCOPE, gyr_rate),
+    ):
+        if sensor in enabled and rate > 0:
+            rates[sensor] = rate
+    rates[Sensor.TEMPERATURE] = TEMPERATURE_RATE
+    rates[Sensor.CALIBRATION] = CALIBRATION_RATE
+    return rates
+
+
+# block reads of one tick: (first register, length) ranges and the channels they cover
+@dataclass(frozen=True)
+class ReadPlan:
+    sensors: Sensor
+    ranges: tuple[tuple[int, int], ...]
+
+    @property
+    def bytes(self) -> int:
+        return sum(length for _, length in self.ranges)
+
+
+# the ranges covering `sensors`, merging neighbours at most `merge_gap` bytes apart
+def plan_reads(sensors: Sensor, merge_gap: int = DEFAULT_MERGE_GAP) -> ReadPlan:
+    ranges = sorted(SENSOR_REGISTERS[s] for s in SENSOR_REGISTERS if s in sensors)
+    merged: list[tuple[int, int]] = []
+    for start, length in ranges:
+        if merged:
+            last_start, last_length = merged[-1]
+            if start - (last_start + last_length) <= merge_gap:
+                merged[-1] = (last_start, max(last_start + last_length, start + length) - last_start)
+                continue
+        merged.append((start, length))
+    return ReadPlan(sensors, tuple(merged))
+
+
+class Scheduler:
+    """
+    Reads every channel of `sensors` once per output period of the chip in its current mode
+    (see channel_rates), on ticks of the fastest channel. poll() reads only the channels due and
+    returns them as a Snapshot in which the others are None; `latest` keeps the newest value of every channel.
+
+    # Sample Code
+    ```python
+    bno055.write_mode(BNO055.modes.NDOF)
+    scheduler = Scheduler(bno055)
+    for snapshot in scheduler.run():
+        if snapshot.euler is not None:
+            ...
+    ```
+    """
+
+    def __init__(
+        self,
+        bno055: BNO055,
+        sensors: Sensor = Sensor.ALL,
+        rates: dict[Sensor, float] | None = None,
+        merge_gap: int = DEFAULT_MERGE_GAP,
+    ) -> None:
+        self._bno055 = bno055
+        self._merge_gap = merge_gap
+        if rates is None:
+            mode = bno055.read_mode()
+            acc = gyr = mag = None
+            if OperatingMode(mode & 0b1111) not in _FUSION_RATES:
+                acc, gyr, mag = bno055.read_sensor_config()
+            rates = channel_rates(mode, acc, gyr, mag)
+        self._rates = {s: r for s, r in rates.items() if s in sensors and r > 0}
+        if not self._rates:
+            raise ValueError(f"none of {sensors!r} is produced at these rates: {rates}")
+        self._periods = {s: 1 / r for s, r in self._rates.items()}
+        self._tick = min(self._periods.values())
+        # every channel is due on the first tick
+        self._due = dict.fromkeys(self._rates, 0.0)
+        self._plans: dict[Sensor, ReadPlan] = {}
+        self._latest: Snapshot | None = None
+
+    @property
+    def rates(self) -> dict[Sensor, float]:
+        return dict(self._rates)
+
+    # seconds between ticks: the period of the fastest channel
+    @property
+    def tick(self) -> float:
+        return self._tick
+
+    # newest value of every channel read so far
+    @property
+    def latest(self) -> Snapshot | None:
+        return self._latest
+
+    # channels due at `now`; a channel counts as due half a tick early so tick jitter does not delay it a full tick
+    def due(self, now: float) -> Sensor:
+        horizon = now + self._tick / 2
+        sensors = Sensor(0)
+        for sensor, due in self._due.items():
+            if due <= horizon:
+                sensors |= sensor
+        return sensors
+
+    def plan(self, sensors: Sensor) -> ReadPlan:
+        plan = self._plans.get(sensors)
+        if plan is None:
+            plan = self._plans[sensors] = plan_reads(sensors, self._merge_gap)
+        return plan
+
+    # read the channels due now; None when none is
+    def poll(self) -> Snapshot | None:
+        now = monotonic()
+        sensors = self.due(now)
+        if not sensors:
+            return None
+        plan = self.plan(sensors)
+        base, length = span_of(sensors)
+        buf = bytearray(length)
+        first: float | None = None
+        for start, size in plan.ranges:
+            buf[start - base : start - base + size] = bytes(self._bno055.read_span(RegisterAddress(start), size))
+            if first is None:
+                first = self._bno055.read_time
+        assert first is not None
+        # between the middle of the first and of the last read
+        timestamp = (first + self._bno055.read_time) / 2
+        for sensor in self._rates:
+            if sensor in sensors:
+                due = self._due[sensor] + self._periods[sensor]
+                # after a stall, restart from now instead of reading a burst of stale ticks
+                self._due[sensor] = due if due > now else now + self._periods[sensor]
+        snapshot = decode_snapshot(buf, sensors, self._bno055.unit_scale(), timestamp, base)
+        self._latest = self._merge(snapshot)
+        return snapshot
+
+    # poll() once per tick on absolute deadlines, yielding only ticks on which something was read
+    def run(self) -> Iterator[Snapshot]:
+        deadline = monotonic()
+        while True:
+            snapshot = self.poll()
+            if snapshot is not None:
+                yield snapshot
+            deadline += self._tick
+            delay = deadline - monotonic()
+            if delay < 0:
+                deadline += (-delay // self._tick + 1) * self._tick
+                delay = deadline - monotonic()
+            sleep(delay)
+
+    def _merge(self, snapshot: Snapshot) -> Snapshot:
+        if self._latest is None:
+            return snapshot
+        fresh = {
+            f.name: getattr(snapshot, f.name)
+            for f in dataclasses.fields(Snapshot)
+            if f.name not in ("timestamp", "sensors") and getattr(snapshot, f.name) is not None
+        }
+        return dataclasses.replace(
+            self._latest, timestamp=snapshot.timestamp, sensors=self._latest.sensors | snapshot.sensors, **fresh
+        )
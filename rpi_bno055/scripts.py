@@ -1,15 +1,21 @@
-from time import sleep
+import argparse
+import sys
+from collections.abc import Sequence
+from functools import reduce
+from time import monotonic, sleep
 
-import smbus2
-
-from . import constants, sys_err_codes as sys_err, sys_status_codes as sys_status
+from . import calibration, constants, modes, sys_err_codes as sys_err, sys_status_codes as sys_status
 from .bno055 import BNO055
+from .bus import open_bus, parse_port
 from .constants import SysTriggerFlag
+from .policy import RESILIENT
+from .snapshot import Sensor
 from .sys_err_codes import SysErrCode
+from .unit_sel import UnitSelection
 
 
 def begin(bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT) -> None:
-    bno055 = BNO055(bno055_addr, smbus2.SMBus(bus_port))
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
     bno055.begin()
     print("begin success! triggering system reset...")
     bno055.system_trigger(SysTriggerFlag.RST_SYS)
@@ -19,7 +25,7 @@ def begin(bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = co
 def system_status(
     bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT
 ) -> None:
-    bno055 = BNO055(bno055_addr, smbus2.SMBus(bus_port))
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
     bno055.begin()
     status = bno055.read_system_status_code()
     status_str = "unknown"
@@ -74,10 +80,51 @@ def system_status(
 def calibration_check(
     bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT
 ) -> None:
-    bno055 = BNO055(bno055_addr, smbus2.SMBus(bus_port))
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    _watch_calibration(bno055)
+
+
+def calibration_save(
+    path: str, bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT
+) -> None:
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    _watch_calibration(bno055)
+    unique_id = bno055.read_unique_id()
+    profile = bno055.read_calibration_profile()
+    calibration.save_profile(path, unique_id, profile)
+    print(f"saved calibration profile of {unique_id.hex()} to {path}")
+
+
+def calibration_load(
+    path: str, bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT
+) -> None:
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    # begin() leaves the chip in CONFIG mode; put it back into whatever it was running afterwards
+    previous = modes.OperatingMode(bno055.read_mode() & 0b1111)
+    bno055.begin()
+    try:
+        unique_id = bno055.read_unique_id()
+        profile = calibration.load_profile(path, unique_id)
+        if profile is None:
+            print(f"no calibration profile of {unique_id.hex()} in {path}")
+            return
+        bno055.write_calibration_profile(profile)
+        print(f"restored calibration profile of {unique_id.hex()} from {path}")
+    finally:
+        if previous != modes.CONFIG:
+            bno055.write_mode(previous)
+            sleep(modes.OPERATION_SWITCH_TIME)
+
+
+# reset the chip, run the fusion and print the calibration status until it is fully calibrated
+# CALIB_STAT only advances while the fusion runs, which CONFIG mode (the reset default) halts
+# section 3.10, 4.3.54
+def _watch_calibration(bno055: BNO055) -> None:
     bno055.begin()
     print("connected to bno055. resetting system...")
     bno055.system_trigger(BNO055.SysTriggerFlag.RST_SYS)
+    bno055.write_mode(modes.NDOF)
+    sleep(modes.OPERATION_SWITCH_TIME)
     print("done. watching calibration status...")
     while True:
         mag, acc, gyr, sys = bno055.read_calibration_status()
@@ -88,55 +135,208 @@ def calibration_check(
         sleep(0.1)
 
 
+# bno055-calib: watch calibration status, or save / restore the calibration profile
+def calibration_cli(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="bno055-calib")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--save", metavar="PATH", help="wait for full calibration and save the profile to PATH")
+    group.add_argument("--load", metavar="PATH", help="restore the profile of this chip from PATH")
+    parser.add_argument("--address", type=lambda v: int(v, 0), default=constants.DEFAULT_ADDRESS)
+    parser.add_argument("--port", type=parse_port, default=constants.DEFAULT_I2C_PORT)
+    args = parser.parse_args(argv)
+    if args.save is not None:
+        calibration_save(args.save, args.address, args.port)
+    elif args.load is not None:
+        calibration_load(args.load, args.address, args.port)
+    else:
+        calibration_check(args.address, args.port)
+
+
+# a read which still failed after the retries of RESILIENT
+def _print_io_error(bno055: BNO055, error: OSError) -> None:
+    stats = bno055.stats()
+    print(
+        f"bus error: {error} ({stats.failures} failed reads, {stats.retries} retries, {stats.errors} errors so far)",
+        file=sys.stderr,
+    )
+
+
+# fast_boot into `mode`, reporting how the chip was brought up; False when it is in system error
+def _boot(bno055: BNO055, mode: modes.OperatingMode, units: UnitSelection | None, sensors: Sensor) -> bool:
+    report = bno055.fast_boot(mode, units, sensors=sensors)
+    print(
+        f"bno055 {report.path.value}: first sample after {report.time_to_first_sample * 1000:.1f} ms, "
+        f"{report.transactions} transactions",
+        file=sys.stderr,
+    )
+    if bno055.read_system_status_code() == sys_status.SYSTEM_ERROR:
+        print(f"bno055 is in system error with code: {bno055.read_system_error_code()}")
+        return False
+    return True
+
+
 def acconly(bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT) -> None:
-    bno055 = BNO055(bno055_addr, smbus2.SMBus(bus_port))
-    bno055.begin()
-    bno055.system_trigger(BNO055.SysTriggerFlag.RST_SYS)
-    status = bno055.read_system_status_code()
-    if status == bno055.sys_status_codes.SYSTEM_ERROR:
-        err = bno055.read_system_error_code()
-        print(f"bno055 is in system error with code: {err}")
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    units = BNO055.UnitSelection().orientation_android().acceleration_mps2()
+    if not _boot(bno055, BNO055.modes.ACCONLY, units, BNO055.Sensor.ACCELEROMETER):
         return
-    bno055.update_unit_selection(BNO055.UnitSelection.ACC_MPS2)
-    bno055.write_mode(BNO055.modes.ACCONLY)
     while True:
         try:
             acc = bno055.read_accelerometer()
             print(f"accelerometer value: {acc}")
-        except OSError:
-            print("waiting bno055 getting ready...")
+        except OSError as e:
+            _print_io_error(bno055, e)
         sleep(1)
 
 
 def imu(bno055_addr: int = constants.DEFAULT_ADDRESS, bus_port: str | int = constants.DEFAULT_I2C_PORT) -> None:
     # In the IMU mode the relative orientation of the BNO055 in space is calculated
     # from the accelerometer and gyroscope data. The calculation is fast (i.e. high output data rate).
-    bno055 = BNO055(bno055_addr, smbus2.SMBus(bus_port))
-    bno055.begin()
-    bno055.system_trigger(BNO055.SysTriggerFlag.RST_SYS)
-    status = bno055.read_system_status_code()
-    if status == bno055.sys_status_codes.SYSTEM_ERROR:
-        err = bno055.read_system_error_code()
-        print(f"bno055 is in system error with code: {err}")
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    units = (
+        BNO055.UnitSelection()
+        .orientation_android()
+        # accelerometer: m/s^2
+        .acceleration_mps2()
+        # gyroscope: rad/s
+        .gyroscope_rps()
+        # euler: radians
+        .euler_radians()
+    )
+    sensors = BNO055.Sensor.ACCELEROMETER | BNO055.Sensor.LINEAR_ACCEL | BNO055.Sensor.GRAVITY | BNO055.Sensor.EULER
+    if not _boot(bno055, BNO055.modes.IMU, units, sensors):
         return
-    # accelerometer: m/s^2
-    bno055.update_unit_selection(BNO055.UnitSelection.ACC_MPS2)
-    # gyroscope: rad/s
-    bno055.update_unit_selection(BNO055.UnitSelection.GYR_RPS)
-    # euler: radians
-    bno055.update_unit_selection(BNO055.UnitSelection.EUL_RADIANS)
-    bno055.write_mode(BNO055.modes.IMU)
     while True:
         try:
-            accel = bno055.read_accelerometer()
-            linear_accel = bno055.read_linear_accel()
-            gravity = bno055.read_gravity()
-            euler = bno055.read_euler()
+            snapshot = bno055.read_snapshot(sensors)
+            accel = snapshot.accelerometer
+            linear_accel = snapshot.linear_accel
+            gravity = snapshot.gravity
+            euler = snapshot.euler
             print(f"IMU data:\n{accel=} [m/s^2]\n{linear_accel=} [m/s^2]\n{gravity=} [m/s^2]\n{euler=} [rad]\n", end="")
-        except OSError:
-            print("waiting bno055 getting ready...")
+        except OSError as e:
+            _print_io_error(bno055, e)
         sleep(1)
 
 
+def record(
+    path: str,
+    bno055_addr: int = constants.DEFAULT_ADDRESS,
+    bus_port: str | int = constants.DEFAULT_I2C_PORT,
+    rate_hz: float = 100.0,
+    sensors: Sensor = Sensor.ALL,
+    mode: modes.OperatingMode = modes.NDOF,
+    duration: float | None = None,
+    flush_interval: float = 1.0,
+) -> None:
+    from .recording import Recorder
+    from .sampler import BNO055Sampler
+
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    if not _boot(bno055, mode, None, sensors):
+        return
+    # the ring buffer holds several flush intervals so a slow SD card write never drops samples
+    capacity = max(2, int(rate_hz * flush_interval * 4))
+    with (
+        Recorder.from_bno055(path, bno055, sensors, rate_hz, flush_interval=flush_interval) as recorder,
+        BNO055Sampler(bno055, rate_hz, capacity, sensors) as sampler,
+    ):
+        print(f"recording {sensors!r} at {rate_hz} Hz to {path}, Ctrl-C to stop", file=sys.stderr)
+        end = None if duration is None else monotonic() + duration
+        try:
+            while end is None or monotonic() < end:
+                sleep(flush_interval if end is None else max(0.0, min(flush_interval, end - monotonic())))
+                recorder.extend(*sampler.drain_raw())
+        except KeyboardInterrupt:
+            pass
+        sampler.stop()
+        recorder.extend(*sampler.drain_raw())
+        print(
+            f"{recorder.count} records, {sampler.dropped} dropped, {sampler.errors} errors, "
+            f"{sampler.overruns} overruns",
+            file=sys.stderr,
+        )
+
+
+def _parse_sensors(value: str) -> Sensor:
+    try:
+        return reduce(lambda a, b: a | b, (Sensor[name.strip().upper()] for name in value.split(",")))
+    except KeyError as e:
+        raise argparse.ArgumentTypeError(f"unknown sensor: {e}") from None
+
+
+# bno055-record: log raw data block spans to a binary file, see recording.Recording to read it back
+def record_cli(argv: Sequence[str] | None = None) -> None:
+    mode_names = [name for name, value in vars(modes).items() if name.isupper() and isinstance(value, int)]
+    parser = argparse.ArgumentParser(prog="bno055-record")
+    parser.add_argument("path")
+    parser.add_argument("--address", type=lambda v: int(v, 0), default=constants.DEFAULT_ADDRESS)
+    parser.add_argument("--port", type=parse_port, default=constants.DEFAULT_I2C_PORT)
+    parser.add_argument("--rate", type=float, default=100.0, help="samples per second")
+    parser.add_argument(
+        "--sensors", type=_parse_sensors, default=Sensor.ALL, help="comma-separated, e.g. fusion,calibration"
+    )
+    parser.add_argument("--mode", type=str.upper, default="NDOF", choices=mode_names)
+    parser.add_argument("--duration", type=float, help="seconds to record; until Ctrl-C when omitted")
+    parser.add_argument("--flush-interval", type=float, default=1.0, help="seconds between writes to disk")
+    args = parser.parse_args(argv)
+    record(
+        args.path,
+        args.address,
+        args.port,
+        args.rate,
+        args.sensors,
+        getattr(modes, args.mode),
+        args.duration,
+        args.flush_interval,
+    )
+
+
+def daemon(
+    name: str = "bno055",
+    bno055_addr: int = constants.DEFAULT_ADDRESS,
+    bus_port: str | int = constants.DEFAULT_I2C_PORT,
+    rate_hz: float = 100.0,
+    sensors: Sensor = Sensor.ALL,
+    mode: modes.OperatingMode = modes.NDOF,
+    capacity: int = 256,
+) -> None:
+    from .shm import SharedPublisher, serve
+
+    bno055 = BNO055(bno055_addr, open_bus(bus_port), policy=RESILIENT)
+    # claim the block before touching the chip, so a second daemon leaves a running one alone
+    try:
+        publisher = SharedPublisher(bno055, sensors, capacity, name)
+    except FileExistsError as e:
+        print(e, file=sys.stderr)
+        return
+    with publisher:
+        if not _boot(bno055, mode, None, sensors):
+            return
+        print(f"publishing {sensors!r} at {rate_hz} Hz to shared memory {name!r}", file=sys.stderr)
+        serve(publisher, rate_hz)
+        print(
+            f"{publisher.count} samples, {publisher.errors} errors, {publisher.overruns} overruns",
+            file=sys.stderr,
+        )
+
+
+# bno055-daemon: own the sensor and publish it to other processes, see shm.SharedBNO055 to read it
+def daemon_cli(argv: Sequence[str] | None = None) -> None:
+    mode_names = [name for name, value in vars(modes).items() if name.isupper() and isinstance(value, int)]
+    parser = argparse.ArgumentParser(prog="bno055-daemon")
+    parser.add_argument("--name", default="bno055", help="name of the shared memory block")
+    parser.add_argument("--address", type=lambda v: int(v, 0), default=constants.DEFAULT_ADDRESS)
+    parser.add_argument("--port", type=parse_port, default=constants.DEFAULT_I2C_PORT)
+    parser.add_argument("--rate", type=float, default=100.0, help="samples per second")
+    parser.add_argument(
+        "--sensors", type=_parse_sensors, default=Sensor.ALL, help="comma-separated, e.g. fusion,calibration"
+    )
+    parser.add_argument("--mode", type=str.upper, default="NDOF", choices=mode_names)
+    parser.add_argument("--capacity", type=int, default=256, help="samples kept in the ring")
+    args = parser.parse_args(argv)
+    daemon(args.name, args.address, args.port, args.rate, args.sensors, getattr(modes, args.mode), args.capacity)
+
+
 if __name__ == "__main__":
     begin()
@@ -0,0 +1,199 @@
+# ACC_Config, GYR_Config_0, GYR_Config_1 and MAG_Config on page 1
+# these only take effect in non-fusion modes; fusion modes configure the sensors themselves
+# section 3.5, 4.4.2 - 4.4.5, table 3-8 - 3-13
+
+import enum as _enum
+from dataclasses import dataclass
+
+from typing_extensions import Self
+
+
+# section 3.5.2, table 3-8
+class AccRange(_enum.Enum):
+    G2 = 0b00
+    G4 = 0b01
+    G8 = 0b10
+    G16 = 0b11
+
+
+# section 3.5.2, table 3-8
+class AccBandwidth(_enum.Enum):
+    HZ_7_81 = 0b000
+    HZ_15_63 = 0b001
+    HZ_31_25 = 0b010
+    HZ_62_5 = 0b011
+    HZ_125 = 0b100
+    HZ_250 = 0b101
+    HZ_500 = 0b110
+    HZ_1000 = 0b111
+
+
+# section 3.5.2, table 3-8
+class AccOperationMode(_enum.Enum):
+    NORMAL = 0b000
+    SUSPEND = 0b001
+    LOW_POWER_1 = 0b010
+    STANDBY = 0b011
+    LOW_POWER_2 = 0b100
+    DEEP_SUSPEND = 0b101
+
+
+# section 3.5.3, table 3-10
+class GyrRange(_enum.Enum):
+    DPS_2000 = 0b000
+    DPS_1000 = 0b001
+    DPS_500 = 0b010
+    DPS_250 = 0b011
+    DPS_125 = 0b100
+
+
+# section 3.5.3, table 3-10
+class GyrBandwidth(_enum.Enum):
+    HZ_523 = 0b000
+    HZ_230 = 0b001
+    HZ_116 = 0b010
+    HZ_47 = 0b011
+    HZ_23 = 0b100
+    HZ_12 = 0b101
+    HZ_64 = 0b110
+    HZ_32 = 0b111
+
+
+# section 3.5.3, table 3-10
+class GyrOperationMode(_enum.Enum):
+    NORMAL = 0b000
+    FAST_POWER_UP = 0b001
+    DEEP_SUSPEND = 0b010
+    SUSPEND = 0b011
+    ADVANCED_POWERSAVE = 0b100
+
+
+# section 3.5.4, table 3-12
+class MagDataRate(_enum.Enum):
+    HZ_2 = 0b000
+    HZ_6 = 0b001
+    HZ_8 = 0b010
+    HZ_10 = 0b011
+    HZ_15 = 0b100
+    HZ_20 = 0b101
+    HZ_25 = 0b110
+    HZ_30 = 0b111
+
+
+# section 3.5.4, table 3-12
+class MagOperationMode(_enum.Enum):
+    LOW_POWER = 0b00
+    REGULAR = 0b01
+    ENHANCED_REGULAR = 0b10
+    HIGH_ACCURACY = 0b11
+
+
+# section 3.5.4, table 3-12
+class MagPowerMode(_enum.Enum):
+    NORMAL = 0b00
+    SLEEP = 0b01
+    SUSPEND = 0b10
+    FORCE_MODE = 0b11
+
+
+_ACC_BANDWIDTH_HZ: dict[AccBandwidth, float] = {
+    AccBandwidth.HZ_7_81: 7.81,
+    AccBandwidth.HZ_15_63: 15.63,
+    AccBandwidth.HZ_31_25: 31.25,
+    AccBandwidth.HZ_62_5: 62.5,
+    AccBandwidth.HZ_125: 125.0,
+    AccBandwidth.HZ_250: 250.0,
+    AccBandwidth.HZ_500: 500.0,
+    AccBandwidth.HZ_1000: 1000.0,
+}
+
+# output data rate of each gyroscope bandwidth setting
+_GYR_OUTPUT_RATE_HZ: dict[GyrBandwidth, float] = {
+    GyrBandwidth.HZ_523: 2000.0,
+    GyrBandwidth.HZ_230: 2000.0,
+    GyrBandwidth.HZ_116: 1000.0,
+    GyrBandwidth.HZ_47: 400.0,
+    GyrBandwidth.HZ_23: 200.0,
+    GyrBandwidth.HZ_12: 100.0,
+    GyrBandwidth.HZ_64: 200.0,
+    GyrBandwidth.HZ_32: 100.0,
+}
+
+_MAG_OUTPUT_RATE_HZ: dict[MagDataRate, float] = {
+    MagDataRate.HZ_2: 2.0,
+    MagDataRate.HZ_6: 6.0,
+    MagDataRate.HZ_8: 8.0,
+    MagDataRate.HZ_10: 10.0,
+    MagDataRate.HZ_15: 15.0,
+    MagDataRate.HZ_20: 20.0,
+    MagDataRate.HZ_25: 25.0,
+    MagDataRate.HZ_30: 30.0,
+}
+
+
+# ACC_Config, reset value 0x0D
+@dataclass(frozen=True)
+class AccConfig:
+    range: AccRange = AccRange.G4
+    bandwidth: AccBandwidth = AccBandwidth.HZ_62_5
+    mode: AccOperationMode = AccOperationMode.NORMAL
+
+    @property
+    def value(self) -> int:
+        return (self.mode.value << 5) | (self.bandwidth.value << 2) | self.range.value
+
+    # data rate in Hz in normal mode: the filter bandwidth is half of it
+    @property
+    def output_rate(self) -> float:
+        return 2 * _ACC_BANDWIDTH_HZ[self.bandwidth]
+
+    @classmethod
+    def from_value(cls, value: int) -> Self:
+        return cls(AccRange(value & 0b11), AccBandwidth((value >> 2) & 0b111), AccOperationMode((value >> 5) & 0b111))
+
+
+# GYR_Config_0 (range, bandwidth), reset value 0x38, and GYR_Config_1 (mode), reset value 0x00
+@dataclass(frozen=True)
+class GyrConfig:
+    range: GyrRange = GyrRange.DPS_2000
+    bandwidth: GyrBandwidth = GyrBandwidth.HZ_32
+    mode: GyrOperationMode = GyrOperationMode.NORMAL
+
+    # GYR_Config_0
+    @property
+    def value0(self) -> int:
+        return (self.bandwidth.value << 3) | self.range.value
+
+    # GYR_Config_1
+    @property
+    def value1(self) -> int:
+        return self.mode.value
+
+    # data rate in Hz in normal mode, fixed by the bandwidth
+    @property
+    def output_rate(self) -> float:
+        return _GYR_OUTPUT_RATE_HZ[self.bandwidth]
+
+    @classmethod
+    def from_values(cls, value0: int, value1: int) -> Self:
+        return cls(GyrRange(value0 & 0b111), GyrBandwidth((value0 >> 3) & 0b111), GyrOperationMode(value1 & 0b111))
+
+
+# MAG_Config, reset value 0x6D
+@dataclass(frozen=True)
+class MagConfig:
+    rate: MagDataRate = MagDataRate.HZ_20
+    mode: MagOperationMode = MagOperationMode.REGULAR
+    power: MagPowerMode = MagPowerMode.FORCE_MODE
+
+    @property
+    def value(self) -> int:
+        return (self.power.value << 5) | (self.mode.value << 3) | self.rate.value
+
+    @property
+    def output_rate(self) -> float:
+        return _MAG_OUTPUT_RATE_HZ[self.rate]
+
+    @classmethod
+    def from_value(cls, value: int) -> Self:
+        return cls(MagDataRate(value & 0b111), MagOperationMode((value >> 3) & 0b11), MagPowerMode((value >> 5) & 0b11))
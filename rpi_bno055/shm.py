@@ -0,0 +1,426 @@
+# one process owns the BNO055 and publishes raw data block spans into a shared memory ring,
+# any number of local processes read them back with the read API of BNO055 and no system call
+#
+# layout of the block, all little-endian:
+#   header, HEADER_SIZE bytes (see _HEADER)
+#   head: u64 number of samples ever published; sample `n` lives in slot `n % capacity`
+#   slots, slot_size bytes each (see _SLOT): u64 sequence, f64 time.monotonic() of the read, u8 UNIT_SEL,
+#   then the raw span of `sensors`
+# every slot is a seqlock: the sequence is odd while the publisher writes it and 2 * (n + 1) once sample
+# `n` is complete, so a reader which sees the same even sequence before and after copying has a whole sample
+# time.monotonic() is CLOCK_MONOTONIC, shared by every process, so timestamps compare across processes
+
+import contextlib
+import fcntl
+import os
+import signal
+import struct
+import tempfile
+import threading
+from collections.abc import Iterator
+from multiprocessing import resource_tracker, shared_memory
+from time import monotonic, sleep
+from types import TracebackType
+
+from typing_extensions import Self
+
+from .bno055 import BNO055
+from .regaddrs0 import RegisterAddress
+from .samples import CalibrationStatus
+from .snapshot import Sensor, Snapshot, decode_snapshot, span_of
+from .unit_sel import UnitScale, UnitSelection
+
+DEFAULT_NAME = "bno055"
+MAGIC = b"BNO055S\x00"
+FORMAT_VERSION = 1
+HEADER_SIZE = 64
+
+# magic, version, capacity, sensors, span start, span length, slot size
+_HEADER = struct.Struct("<8sHIHBBI")
+_HEAD = struct.Struct("<Q")
+_SEQUENCE = struct.Struct("<Q")
+# sequence, timestamp, UNIT_SEL
+_SLOT = struct.Struct("<QdB")
+_HEAD_OFFSET = HEADER_SIZE
+_SLOTS_OFFSET = HEADER_SIZE + _HEAD.size
+# copies of one slot attempted before a reader gives up on it because the publisher keeps lapping it
+_RETRIES = 8
+
+# blocks created by publishers of this process, which its resource tracker has to keep track of
+_published: set[str] = set()
+
+
+def _size(capacity: int, length: int) -> int:
+    return _SLOTS_OFFSET + capacity * (_SLOT.size + length)
+
+
+# file descriptor holding an exclusive flock on block `name` until closed; raises FileExistsError when
+# another publisher holds it. the kernel drops the lock with the process, so a crashed publisher never keeps it
+def _lock(name: str) -> int:
+    path = os.path.join(tempfile.gettempdir(), f"{name.lstrip('/')}.shm.lock")
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        raise FileExistsError(f"shared memory {name!r} is published by another process") from None
+    return fd
+
+
+class SharedPublisher:
+    """
+    Creates the shared memory block `name` and writes every span read from `bno055` into it.
+    Only one publisher per name can exist at a time, across processes: a second one raises
+    FileExistsError, while a block left behind by a publisher which crashed is replaced. The block is
+    removed by close().
+
+    # Sample Code
+    ```python
+    with SharedPublisher(bno055, sensors=Sensor.ALL) as publisher:
+        publisher.run(rate_hz=100)
+    ```
+    """
+
+    def __init__(
+        self,
+        bno055: BNO055,
+        sensors: Sensor = Sensor.ALL,
+        capacity: int = 256,
+        name: str = DEFAULT_NAME,
+    ) -> None:
+        if capacity < 2:
+            raise ValueError(f"capacity must be at least 2: {capacity}")
+        self._bno055 = bno055
+        self._sensors = sensors
+        self._capacity = capacity
+        self._start, self._length = span_of(sensors)
+        self._slot_size = _SLOT.size + self._length
+        size = _size(capacity, self._length)
+        self._lock = _lock(name)
+        try:
+            try:
+                self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+            except FileExistsError:
+                # holding the lock, so its publisher is gone
+                stale = shared_memory.SharedMemory(name)
+                stale.close()
+                stale.unlink()
+                self._shm = shared_memory.SharedMemory(name, create=True, size=size)
+        except BaseException:
+            os.close(self._lock)
+            raise
+        _published.add(self._shm.name)
+        buf = self._shm.buf
+        assert buf is not None
+        self._buf = buf
+        self._closed = False
+        _HEADER.pack_into(
+            self._buf, 0, MAGIC, FORMAT_VERSION, capacity, int(sensors), self._start, self._length, self._slot_size
+        )
+        _HEAD.pack_into(self._buf, _HEAD_OFFSET, 0)
+        self._head = 0
+        self._stop = threading.Event()
+        # ticks missed because a read took longer than the period
+        self.overruns = 0
+        # reads which failed with OSError
+        self.errors = 0
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def sensors(self) -> Sensor:
+        return self._sensors
+
+    # number of samples published
+    @property
+    def count(self) -> int:
+        return self._head
+
+    def publish(self, raw: bytes, timestamp: float, unit_sel: int) -> None:
+        if len(raw) != self._length:
+            raise ValueError(f"span must be {self._length} bytes: got {len(raw)}")
+        seq = self._head
+        offset = _SLOTS_OFFSET + (seq % self._capacity) * self._slot_size
+        buf = self._buf
+        _SLOT.pack_into(buf, offset, 2 * seq + 1, timestamp, unit_sel)
+        buf[offset + _SLOT.size : offset + self._slot_size] = raw
+        _SEQUENCE.pack_into(buf, offset, 2 * seq + 2)
+        self._head = seq + 1
+        _HEAD.pack_into(buf, _HEAD_OFFSET, self._head)
+
+    # read the span once and publish it
+    def poll(self) -> None:
+        raw = bytes(self._bno055.read_span(RegisterAddress(self._start), self._length))
+        timestamp = self._bno055.read_time
+        self.publish(raw, timestamp, self._bno055.read_unit_selection().value)
+
+    # poll at `rate_hz` on absolute deadlines until stop() is called; failed reads are counted and skipped
+    def run(self, rate_hz: float = 100.0) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive: {rate_hz}")
+        period = 1 / rate_hz
+        deadline = monotonic()
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except OSError:
+                self.errors += 1
+            deadline += period
+            delay = deadline - monotonic()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                missed = int(-delay / period)
+                self.overruns += missed + 1
+                deadline += missed * period
+
+    # make run() return; safe to call from a signal handler or another thread
+    def stop(self) -> None:
+        self._stop.set()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._closed:
+            return
+        self._closed = True
+        self._buf.release()
+        self._shm.close()
+        with contextlib.suppress(FileNotFoundError):
+            self._shm.unlink()
+        _published.discard(self._shm.name)
+        os.close(self._lock)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class SharedBNO055:
+    """
+    Read-only view of the block published by SharedPublisher, with the read methods of BNO055.
+    Reads copy the newest slot out of the mapping and decode it; nothing goes through the kernel,
+    so any number of clients can read as often as they like without touching the bus.
+    Reading a sensor which is not published raises KeyError.
+
+    # Sample Code
+    ```python
+    with SharedBNO055() as bno055:
+        while True:
+            print(bno055.read_euler())
+            sleep(0.1)
+    ```
+    """
+
+    def __init__(self, name: str = DEFAULT_NAME) -> None:
+        self._shm = shared_memory.SharedMemory(name)
+        # attaching registers the block with this process' resource tracker, which would remove it on exit
+        if self._shm.name not in _published:
+            resource_tracker.unregister(self._shm._name, "shared_memory")  # type: ignore[attr-defined]
+        buf = self._shm.buf
+        assert buf is not None
+        self._buf = buf
+        self._closed = False
+        magic, version, capacity, sensors, start, length, slot_size = _HEADER.unpack_from(self._buf)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"not a BNO055 shared memory block: {name}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"unsupported shared memory version: {version}")
+        self._capacity = capacity
+        self._sensors = Sensor(sensors)
+        self._start = start
+        self._length = length
+        self._slot_size = slot_size
+        # next sample returned by wait_next()
+        self._next = 0
+
+    @property
+    def sensors(self) -> Sensor:
+        return self._sensors
+
+    # number of samples the publisher has written
+    @property
+    def count(self) -> int:
+        (head,) = _HEAD.unpack_from(self._buf, _HEAD_OFFSET)
+        return int(head)
+
+    # (timestamp, UNIT_SEL, raw span) of sample `seq`, or None when it was overwritten or is still being written
+    def read_raw(self, seq: int) -> tuple[float, int, bytes] | None:
+        offset = _SLOTS_OFFSET + (seq % self._capacity) * self._slot_size
+        buf = self._buf
+        want = 2 * seq + 2
+        for _ in range(_RETRIES):
+            sequence, timestamp, unit_sel = _SLOT.unpack_from(buf, offset)
+            if sequence > want or (sequence < want and sequence & 1 == 0):
+                return None
+            raw = bytes(buf[offset + _SLOT.size : offset + self._slot_size])
+            (after,) = _SEQUENCE.unpack_from(buf, offset)
+            if sequence == after == want:
+                return (timestamp, unit_sel, raw)
+        return None
+
+    # newest complete sample, or None before the first one
+    def latest(self, sensors: Sensor | None = None) -> Snapshot | None:
+        for _ in range(_RETRIES):
+            head = self.count
+            if head == 0:
+                return None
+            sample = self._decode(head - 1, sensors)
+            if sample is not None:
+                return sample
+        return None
+
+    # block until a sample newer than the one last returned by wait_next() is published
+    # polls every `poll_interval` seconds; returns None on timeout
+    def wait_next(self, timeout: float | None = None, poll_interval: float = 0.001) -> Snapshot | None:
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            head = self.count
+            if head > self._next:
+                self._next = head
+                sample = self._decode(head - 1, None)
+                if sample is not None:
+                    return sample
+                continue
+            if deadline is not None and monotonic() >= deadline:
+                return None
+            sleep(poll_interval)
+
+    # every sample from now on, at the rate they are published
+    def stream(self, poll_interval: float = 0.001) -> Iterator[Snapshot]:
+        while True:
+            sample = self.wait_next(poll_interval=poll_interval)
+            if sample is not None:
+                yield sample
+
+    # seconds since the newest sample was read from the chip; grows when the publisher has stopped
+    def age(self) -> float | None:
+        sample = self.latest(Sensor(0))
+        return None if sample is None else monotonic() - sample.timestamp
+
+    def read_unit_selection(self) -> UnitSelection:
+        return UnitSelection.from_value(self._newest()[1])
+
+    def read_snapshot(self, sensors: Sensor = Sensor.ALL) -> Snapshot:
+        return self._read(sensors & self._sensors)
+
+    # (acc_x, acc_y, acc_z)
+    def read_accelerometer(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.ACCELEROMETER).accelerometer
+        assert value is not None
+        return value
+
+    # (mag_x, mag_y, mag_z)
+    def read_magnetometer(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.MAGNETOMETER).magnetometer
+        assert value is not None
+        return value
+
+    # (gyro_x, gyro_y, gyro_z)
+    def read_gyroscope(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.GYROSCOPE).gyroscope
+        assert value is not None
+        return value
+
+    # (euler_heading, euler_roll, euler_pitch)
+    def read_euler(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.EULER).euler
+        assert value is not None
+        return value
+
+    # (quat_w, quat_x, quat_y, quat_z)
+    def read_quaternion(self) -> tuple[float, float, float, float]:
+        value = self._read(Sensor.QUATERNION).quaternion
+        assert value is not None
+        return value
+
+    # (lia_x, lia_y, lia_z)
+    def read_linear_accel(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.LINEAR_ACCEL).linear_accel
+        assert value is not None
+        return value
+
+    # (grav_x, grav_y, grav_z)
+    def read_gravity(self) -> tuple[float, float, float]:
+        value = self._read(Sensor.GRAVITY).gravity
+        assert value is not None
+        return value
+
+    def read_temperature(self) -> float:
+        value = self._read(Sensor.TEMPERATURE).temperature
+        assert value is not None
+        return value
+
+    # (mag, acc, gyr, sys)
+    def read_calibration_status(self) -> CalibrationStatus:
+        value = self._read(Sensor.CALIBRATION).calibration_status
+        assert value is not None
+        return value
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._buf.release()
+        self._shm.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    # (timestamp, UNIT_SEL, raw span) of the newest sample; raises LookupError before the first one
+    def _newest(self) -> tuple[float, int, bytes]:
+        for _ in range(_RETRIES):
+            head = self.count
+            if head == 0:
+                raise LookupError("nothing published yet")
+            record = self.read_raw(head - 1)
+            if record is not None:
+                return record
+        raise LookupError("the publisher keeps overwriting the newest sample")
+
+    def _read(self, sensors: Sensor) -> Snapshot:
+        missing = sensors & ~self._sensors
+        if missing:
+            raise KeyError(f"{missing!r} is not published")
+        timestamp, unit_sel, raw = self._newest()
+        return decode_snapshot(raw, sensors, UnitScale.from_value(unit_sel), timestamp, self._start)
+
+    def _decode(self, seq: int, sensors: Sensor | None) -> Snapshot | None:
+        record = self.read_raw(seq)
+        if record is None:
+            return None
+        timestamp, unit_sel, raw = record
+        return decode_snapshot(
+            raw, self._sensors if sensors is None else sensors, UnitScale.from_value(unit_sel), timestamp, self._start
+        )
+
+
+# run `publisher` until SIGINT or SIGTERM
+def serve(publisher: SharedPublisher, rate_hz: float = 100.0) -> None:
+    previous = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+    for sig in previous:
+        signal.signal(sig, lambda *_: publisher.stop())
+    try:
+        publisher.run(rate_hz)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
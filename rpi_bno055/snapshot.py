@@ -0,0 +1,128 @@
+# bulk read of the page 0 data block (ACC_DATA_X_LSB to CALIB_STAT)
+# section 3.6.5, 4.2.1, table 4-2
+
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import IntFlag as _IntFlag
+
+from . import regaddrs0
+from .samples import CalibrationStatus
+from .unit_sel import UnitScale
+
+# first and last register of the contiguous data block
+DATA_START = regaddrs0.ACC_DATA_X_LSB
+DATA_END = regaddrs0.CALIB_STAT
+DATA_LENGTH = DATA_END - DATA_START + 1
+
+
+class Sensor(_IntFlag):
+    ACCELEROMETER = 0b0_0000_0001
+    MAGNETOMETER = 0b0_0000_0010
+    GYROSCOPE = 0b0_0000_0100
+    EULER = 0b0_0000_1000
+    QUATERNION = 0b0_0001_0000
+    LINEAR_ACCEL = 0b0_0010_0000
+    GRAVITY = 0b0_0100_0000
+    TEMPERATURE = 0b0_1000_0000
+    CALIBRATION = 0b1_0000_0000
+    # all data needed in fusion modes
+    FUSION = EULER | QUATERNION | LINEAR_ACCEL | GRAVITY
+    # all raw sensor data
+    RAW = ACCELEROMETER | MAGNETOMETER | GYROSCOPE
+    ALL = 0b1_1111_1111
+
+
+# (first register, length in bytes) of each sensor
+SENSOR_REGISTERS: dict[Sensor, tuple[int, int]] = {
+    Sensor.ACCELEROMETER: (regaddrs0.ACC_DATA_X_LSB, 6),
+    Sensor.MAGNETOMETER: (regaddrs0.MAG_DATA_X_LSB, 6),
+    Sensor.GYROSCOPE: (regaddrs0.GYR_DATA_X_LSB, 6),
+    Sensor.EULER: (regaddrs0.EUL_HEADING_LSB, 6),
+    Sensor.QUATERNION: (regaddrs0.QUA_DATA_W_LSB, 8),
+    Sensor.LINEAR_ACCEL: (regaddrs0.LIA_DATA_X_LSB, 6),
+    Sensor.GRAVITY: (regaddrs0.GRV_DATA_X_LSB, 6),
+    Sensor.TEMPERATURE: (regaddrs0.TEMP, 1),
+    Sensor.CALIBRATION: (regaddrs0.CALIB_STAT, 1),
+}
+
+_VEC3 = struct.Struct("<3h")
+_VEC4 = struct.Struct("<4h")
+_I8 = struct.Struct("<b")
+
+
+# one sample of every selected sensor, all taken from the same register block read
+# sensors which were not selected are None
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    # time.monotonic() halfway through the read (BNO055.read_time), or a SampleClock estimate
+    timestamp: float
+    sensors: Sensor
+    accelerometer: tuple[float, float, float] | None = None
+    magnetometer: tuple[float, float, float] | None = None
+    gyroscope: tuple[float, float, float] | None = None
+    euler: tuple[float, float, float] | None = None
+    quaternion: tuple[float, float, float, float] | None = None
+    linear_accel: tuple[float, float, float] | None = None
+    gravity: tuple[float, float, float] | None = None
+    temperature: float | None = None
+    # same as BNO055.read_calibration_status
+    calibration_status: CalibrationStatus | None = None
+    # channels whose registers changed since the previous sample, when the reader tracks it (see change.py)
+    changed: Sensor | None = None
+
+
+# (first register, length in bytes) of the smallest span covering all of `sensors`
+def span_of(sensors: Sensor) -> tuple[int, int]:
+    ranges = [SENSOR_REGISTERS[s] for s in SENSOR_REGISTERS if s in sensors]
+    if not ranges:
+        raise ValueError(f"no sensor selected: {sensors!r}")
+    start = min(reg for reg, _ in ranges)
+    end = max(reg + length for reg, length in ranges)
+    return (start, end - start)
+
+
+def _vec3(buf: bytes | bytearray | memoryview, offset: int, scale: float) -> tuple[float, float, float]:
+    x, y, z = _VEC3.unpack_from(buf, offset)
+    return (x * scale, y * scale, z * scale)
+
+
+# `buf` holds the registers from `start` onwards, as read by BNO055.read_snapshot
+def decode_snapshot(
+    buf: bytes | memoryview | Sequence[int],
+    sensors: Sensor,
+    scale: UnitScale,
+    timestamp: float,
+    start: int = DATA_START,
+) -> Snapshot:
+    data = buf if isinstance(buf, bytes | bytearray | memoryview) else bytes(buf)
+
+    def offset(sensor: Sensor) -> int:
+        return SENSOR_REGISTERS[sensor][0] - start
+
+    acc = mag = gyr = eul = lia = grv = None
+    qua: tuple[float, float, float, float] | None = None
+    temp: float | None = None
+    calib: CalibrationStatus | None = None
+    if Sensor.ACCELEROMETER in sensors:
+        acc = _vec3(data, offset(Sensor.ACCELEROMETER), scale.acceleration)
+    if Sensor.MAGNETOMETER in sensors:
+        mag = _vec3(data, offset(Sensor.MAGNETOMETER), scale.magnetometer)
+    if Sensor.GYROSCOPE in sensors:
+        gyr = _vec3(data, offset(Sensor.GYROSCOPE), scale.gyroscope)
+    if Sensor.EULER in sensors:
+        eul = _vec3(data, offset(Sensor.EULER), scale.euler)
+    if Sensor.QUATERNION in sensors:
+        w, x, y, z = _VEC4.unpack_from(data, offset(Sensor.QUATERNION))
+        s = scale.quaternion
+        qua = (w * s, x * s, y * s, z * s)
+    if Sensor.LINEAR_ACCEL in sensors:
+        lia = _vec3(data, offset(Sensor.LINEAR_ACCEL), scale.acceleration)
+    if Sensor.GRAVITY in sensors:
+        grv = _vec3(data, offset(Sensor.GRAVITY), scale.acceleration)
+    if Sensor.TEMPERATURE in sensors:
+        (t,) = _I8.unpack_from(data, offset(Sensor.TEMPERATURE))
+        temp = t * scale.temperature
+    if Sensor.CALIBRATION in sensors:
+        calib = CalibrationStatus.from_value(data[offset(Sensor.CALIBRATION)])
+    return Snapshot(timestamp, sensors, acc, mag, gyr, eul, qua, lia, grv, temp, calib)
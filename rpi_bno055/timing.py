@@ -0,0 +1,283 @@
+# sample timing: when the chip actually produced each sample, and resampling onto a uniform time grid
+#
+# a read returns whatever the chip produced last, so the host time at which a new sample is first seen
+# is its production time plus a delay of up to one polling interval, the bus transaction and any
+# scheduling hiccup; that delay is never negative. the chip itself produces samples on a steady cadence
+# of its own oscillator (100 Hz for the fusion outputs, see schedule.channel_rates), close to but not
+# exactly nominal. SampleClock fits that cadence to the observed times; resample() then puts samples
+# of one or more streams onto a common grid. resampling needs NumPy
+
+import math
+from collections import deque
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Literal
+
+from typing_extensions import Self
+
+from .modes import OperatingMode
+from .schedule import channel_rates
+from .snapshot import Sensor
+
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:  # pragma: no cover
+    HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+ResampleKind = Literal["linear", "nearest", "quaternion"]
+
+
+class SampleClock:
+    """
+    Turns the host times at which new samples were first seen (BNO055.read_time of the first read
+    returning them) into estimates of when the chip produced them.
+
+    The estimates lie on the chip's own grid, fitted to the last `window` samples as the line below all
+    observed times (over sample index) that is closest to them on average. Observations are only ever
+    late, so the line runs through the samples seen soonest after they were produced: the jitter of the
+    polling loop cancels out and only the smallest delay in the window remains, which for a loop
+    polling well above `rate_hz` is little more than the time from the start of a read to its midpoint.
+
+    `rate_hz` is the nominal rate of `sensor`, the channel whose new samples are fed in; the estimated
+    period stays within `tolerance` of it. Feed it once per new sample of that channel, as
+    BNO055Sampler does; channels of one cycle do not all update at the same instant. Since observations
+    are only ever late, a sample seen up to 0.9 periods after its slot still counts as one step, and a
+    sample seen before its slot means the one before was seen so late that it was counted too far on:
+    that one is dropped and the slots are counted again from the sample before it. After a gap of more
+    than `window` samples, or when a full window fits a period outside the tolerance, the clock starts
+    over.
+
+    # Sample Code
+    ```python
+    clock = SampleClock.for_mode(BNO055.modes.NDOF, Sensor.FUSION)
+    with BNO055Sampler(bno055, rate_hz=400, sensors=Sensor.FUSION, clock=clock) as sampler:
+        ...
+        samples = sampler.drain()
+        grid = uniform_grid(samples[0].timestamp, samples[-1].timestamp, 100)
+        quaternions = resample([s.timestamp for s in samples], [s.quaternion for s in samples], grid, "quaternion")
+    ```
+    """
+
+    def __init__(
+        self, rate_hz: float = 100.0, window: int = 100, tolerance: float = 0.05, sensor: Sensor = Sensor.ALL
+    ) -> None:
+        if rate_hz <= 0:
+            raise ValueError(f"rate_hz must be positive: {rate_hz}")
+        if window < 2:
+            raise ValueError(f"window must be at least 2: {window}")
+        if not 0 <= tolerance < 1:
+            raise ValueError(f"tolerance must be in [0, 1): {tolerance}")
+        self._nominal = 1 / rate_hz
+        self._sensor = sensor
+        self._window = window
+        self._min_period = self._nominal * (1 - tolerance)
+        self._max_period = self._nominal * (1 + tolerance)
+        self._period = self._nominal
+        # (sample index, observed time) of the last `window` samples
+        self._history: deque[tuple[int, float]] = deque(maxlen=window)
+        self._index = 0
+        self._time: float | None = None
+        # the last step count was rounded up, i.e. the sample may have been a slot earlier
+        self._rounded_up = False
+        self._delay = 0.0
+        # samples fed, and times the clock started over after a gap
+        self.count = 0
+        self.resyncs = 0
+
+    # the fastest of `sensors` in `mode` (fusion outputs first), at its nominal rate
+    @classmethod
+    def for_mode(
+        cls, mode: OperatingMode, sensors: Sensor = Sensor.ALL, window: int = 100, tolerance: float = 0.05
+    ) -> Self:
+        rates = {s: r for s, r in channel_rates(mode).items() if s in sensors}
+        if not rates:
+            raise ValueError(f"mode {mode} produces none of {sensors!r}")
+        sensor = max(rates, key=lambda s: rates[s])
+        return cls(rates[sensor], window, tolerance, sensor)
+
+    @property
+    def sensor(self) -> Sensor:
+        return self._sensor
+
+    # estimated seconds between samples of the chip
+    @property
+    def period(self) -> float:
+        return self._period
+
+    @property
+    def rate_hz(self) -> float:
+        return 1 / self._period
+
+    # estimate of the newest sample, None before the first
+    @property
+    def time(self) -> float | None:
+        return self._time
+
+    # mean of observed minus estimated time over the window: how late samples are seen on average
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+    # the estimated production time of the sample first seen at `timestamp`
+    def update(self, timestamp: float) -> float:
+        last = self._time
+        if last is None:
+            return self._start(timestamp)
+        history = self._history
+        period = self._period
+        slots = (timestamp - last) / period
+        while slots < 0.5 or (self._rounded_up and slots < 0.9):
+            # before the next slot: the sample before was seen so late that it was counted one or more
+            # slots too far, so drop it and count again from the one before that
+            dropped, _ = history.pop()
+            self._rounded_up = False
+            if not history:
+                # it was the first sample: this one takes its place
+                return self._start(timestamp)
+            self._index = history[-1][0]
+            last -= (dropped - self._index) * period
+            slots = (timestamp - last) / period
+        steps = max(1, math.floor(slots + 0.1))
+        if steps > self._window:
+            self.resyncs += 1
+            return self._start(timestamp)
+        self._index += steps
+        self._rounded_up = slots < steps
+        history.append((self._index, timestamp))
+        # relative to the oldest sample of the window, so the arithmetic keeps its precision
+        first_index, first_time = history[0]
+        points = [(i - first_index, t - first_time) for i, t in history]
+        if len(points) >= min(_MIN_FIT, self._window):
+            slope = self._fit(points)
+            if not self._min_period <= slope <= self._max_period and len(points) == self._window:
+                # miscounted slots have split the window; start over rather than drift
+                self.resyncs += 1
+                return self._start(timestamp)
+            self._period = period = min(self._max_period, max(self._min_period, slope))
+        residuals = [t - i * period for i, t in points]
+        offset = min(residuals)
+        self._delay = sum(residuals) / len(residuals) - offset
+        estimate = first_time + (self._index - first_index) * period + offset
+        self._time = estimate
+        self.count += 1
+        return estimate
+
+    def reset(self) -> None:
+        self._period = self._nominal
+        self._history.clear()
+        self._index = 0
+        self._time = None
+        self._rounded_up = False
+        self._delay = 0.0
+        self.count = 0
+        self.resyncs = 0
+
+    def _start(self, timestamp: float) -> float:
+        self._history.clear()
+        self._history.append((0, timestamp))
+        self._index = 0
+        self._time = timestamp
+        self._rounded_up = False
+        self._delay = 0.0
+        self.count += 1
+        return timestamp
+
+    # slope of the lower convex hull of (index, time) at the mean index: the line below all points
+    # closest to them on average
+    def _fit(self, points: list[tuple[int, float]]) -> float:
+        hull: list[tuple[int, float]] = []
+        for i, t in points:
+            while len(hull) >= 2:
+                (i0, t0), (i1, t1) = hull[-2], hull[-1]
+                if (i1 - i0) * (t - t0) - (t1 - t0) * (i - i0) > 0:
+                    break
+                hull.pop()
+            hull.append((i, t))
+        mean = sum(i for i, _ in points) / len(points)
+        for (i0, t0), (i1, t1) in zip(hull, hull[1:]):
+            if i1 >= mean:
+                break
+        return (t1 - t0) / (i1 - i0)
+
+
+# samples needed before the period is fitted rather than nominal
+_MIN_FIT = 10
+
+
+# times from `start` to `end` which are whole multiples of 1 / rate_hz, so grids built for different
+# streams (or devices) at the same rate line up
+def uniform_grid(start: float, end: float, rate_hz: float) -> "npt.NDArray[np.float64]":
+    _require_numpy()
+    if rate_hz <= 0:
+        raise ValueError(f"rate_hz must be positive: {rate_hz}")
+    first = math.ceil(start * rate_hz)
+    last = math.floor(end * rate_hz)
+    return np.arange(first, last + 1, dtype=float) / rate_hz
+
+
+# `values`, (N,) or (N, k) sampled at `timestamps`, interpolated at the times of `grid`
+# kind "linear": per column; "nearest": the closer of the two neighbours; "quaternion": (N, 4) (w, x, y, z)
+#   interpolated along the shorter arc and normalized
+# period: for angles with "linear", e.g. 360 for degrees; the short way round is taken and results are
+#   wrapped into [0, period), or [-period / 2, period / 2) for columns with negative values
+# grid times outside the samples, or inside a gap longer than `max_gap` seconds, come out as NaN
+# samples not later than the one before, e.g. repeated reads of one sample, are dropped first
+def resample(
+    timestamps: "Sequence[float] | npt.NDArray[np.float64]",
+    values: Any,
+    grid: "Sequence[float] | npt.NDArray[np.float64]",
+    kind: ResampleKind = "linear",
+    period: float | None = None,
+    max_gap: float | None = None,
+) -> "npt.NDArray[np.float64]":
+    _require_numpy()
+    t = np.asarray(timestamps, dtype=float)
+    v = np.asarray(values, dtype=float)
+    g = np.asarray(grid, dtype=float)
+    if t.ndim != 1 or len(t) != len(v):
+        raise ValueError(f"expected one timestamp per value: {t.shape} and {v.shape}")
+    flat = v.ndim == 1
+    if flat:
+        v = v[:, None]
+    if kind == "quaternion" and v.shape[1] != 4:
+        raise ValueError(f"quaternions must be (N, 4): {v.shape}")
+    if len(t) > 1:
+        keep = np.ones(len(t), dtype=bool)
+        keep[1:] = t[1:] > np.maximum.accumulate(t)[:-1]
+        t, v = t[keep], v[keep]
+    if len(t) < 2:
+        raise ValueError("at least two samples at distinct times are needed")
+    i = np.clip(np.searchsorted(t, g, side="right") - 1, 0, len(t) - 2)
+    t0, t1 = t[i], t[i + 1]
+    v0, v1 = v[i], v[i + 1]
+    frac = ((g - t0) / (t1 - t0))[:, None]
+    if kind == "nearest":
+        out = np.where(frac < 0.5, v0, v1)
+    elif kind == "quaternion":
+        sign = np.where(np.einsum("ij,ij->i", v0, v1) < 0, -1.0, 1.0)[:, None]
+        out = v0 + frac * (sign * v1 - v0)
+        out /= np.linalg.norm(out, axis=1, keepdims=True)
+    elif kind == "linear":
+        d = v1 - v0
+        if period is None:
+            out = v0 + frac * d
+        else:
+            d = (d + period / 2) % period - period / 2
+            low = np.where((v < 0).any(axis=0), -period / 2, 0.0)
+            out = (v0 + frac * d - low) % period + low
+    else:
+        raise ValueError(f"unknown kind: {kind}")
+    outside = (g < t[0]) | (g > t[-1])
+    if max_gap is not None:
+        outside |= t1 - t0 > max_gap
+    out[outside] = np.nan
+    return out[:, 0] if flat else out
+
+
+def _require_numpy() -> None:
+    if not HAS_NUMPY:
+        raise ImportError("NumPy is required for resampling: pip install rpi_bno055[numpy]")
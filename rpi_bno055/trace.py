@@ -0,0 +1,236 @@
+# timeline of bus transactions and application spans, exported as Chrome trace JSON
+# (chrome://tracing, https://ui.perfetto.dev)
+#
+# events go into a preallocated ring of flat arrays, so recording one costs two clock reads and a few
+# array stores; BNO055 only touches the tracer when one is set, see BNO055.tracer
+
+import enum as _enum
+import itertools
+import json
+import threading
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic_ns
+from typing import Any
+
+
+class TraceOp(_enum.IntEnum):
+    READ_BYTE = 0
+    WRITE_BYTE = 1
+    READ_BLOCK = 2
+    WRITE_BLOCK = 3
+    # combined write-read through i2c_rdwr
+    RDWR = 4
+    # sleeps and polls which hold the bus without a transaction of their own
+    BACKOFF = 5
+    WAIT_READY = 6
+    MODE_SWITCH = 7
+    SYSTEM_TRIGGER = 8
+
+
+class Outcome(_enum.IntEnum):
+    OK = 0
+    # OSError; retried or raised depending on the IOPolicy
+    ERROR = 1
+
+
+# names of application spans get ids from here on
+_FIRST_NAME = 256
+
+
+@dataclass(frozen=True, slots=True)
+class TraceEvent:
+    name: str
+    # "bus" for transactions, "wait" for sleeps and polls, "app" for Tracer.span()
+    category: str
+    start_ns: int
+    end_ns: int
+    thread: int
+    # None for anything but transactions
+    register: int | None = None
+    page: int | None = None
+    length: int | None = None
+    outcome: Outcome = Outcome.OK
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class Tracer:
+    """
+    Keeps the newest `capacity` events. Timestamps are time.monotonic_ns(), so they line up with
+    time.monotonic() taken anywhere else in the program.
+
+    # Sample Code
+    ```python
+    tracer = Tracer()
+    bno055 = BNO055(tracer=tracer)
+    for _ in range(1000):
+        with tracer.span("loop"):
+            snapshot = bno055.read_snapshot()
+            with tracer.span("control"):
+                ...
+    tracer.write_chrome_trace("bno055.json")
+    ```
+    """
+
+    def __init__(self, capacity: int = 65536) -> None:
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive: {capacity}")
+        self._capacity = capacity
+        # one entry per event; `-1` marks a missing register, page or length
+        self._names = array("H", bytes(2 * capacity))
+        self._registers = array("h", bytes(2 * capacity))
+        self._pages = array("b", bytes(capacity))
+        self._lengths = array("i", bytes(4 * capacity))
+        self._starts = array("q", bytes(8 * capacity))
+        self._ends = array("q", bytes(8 * capacity))
+        self._threads = array("Q", bytes(8 * capacity))
+        self._outcomes = array("B", bytes(capacity))
+        # next() on itertools.count is atomic, so threads sharing a tracer never get the same slot
+        self._seq = itertools.count()
+        self._count = 0
+        self._name_ids: dict[str, int] = {}
+        self._name_list: list[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    # events recorded since construction or clear(), including those overwritten
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def dropped(self) -> int:
+        return max(0, self._count - self._capacity)
+
+    def record(
+        self,
+        op: int,
+        start_ns: int,
+        end_ns: int,
+        register: int = -1,
+        page: int | None = None,
+        length: int = -1,
+        outcome: Outcome = Outcome.OK,
+    ) -> None:
+        seq = next(self._seq)
+        i = seq % self._capacity
+        self._names[i] = op
+        self._registers[i] = register
+        self._pages[i] = -1 if page is None else page
+        self._lengths[i] = length
+        self._starts[i] = start_ns
+        self._ends[i] = end_ns
+        self._threads[i] = threading.get_ident()
+        self._outcomes[i] = outcome
+        if seq >= self._count:
+            self._count = seq + 1
+
+    # time the block as an application span `name`
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        name_id = self._name_id(name)
+        start = monotonic_ns()
+        try:
+            yield
+        finally:
+            self.record(name_id, start, monotonic_ns())
+
+    # a zero-length application event, e.g. a missed deadline
+    def instant(self, name: str) -> None:
+        now = monotonic_ns()
+        self.record(self._name_id(name), now, now)
+
+    def clear(self) -> None:
+        self._seq = itertools.count()
+        self._count = 0
+
+    # recorded events, oldest first
+    def events(self) -> list[TraceEvent]:
+        count = self._count
+        first = max(0, count - self._capacity)
+        events: list[TraceEvent] = []
+        for seq in range(first, count):
+            i = seq % self._capacity
+            name_id = self._names[i]
+            if name_id >= _FIRST_NAME:
+                name, category = self._name_list[name_id - _FIRST_NAME], "app"
+            else:
+                op = TraceOp(name_id)
+                name = op.name.lower()
+                category = "bus" if op <= TraceOp.RDWR else "wait"
+            register = self._registers[i]
+            page = self._pages[i]
+            length = self._lengths[i]
+            events.append(
+                TraceEvent(
+                    name,
+                    category,
+                    self._starts[i],
+                    self._ends[i],
+                    self._threads[i],
+                    None if register < 0 else register,
+                    None if page < 0 else page,
+                    None if length < 0 else length,
+                    Outcome(self._outcomes[i]),
+                )
+            )
+        return events
+
+    # Chrome trace event format: one complete ("X") event per recorded event, one row per thread
+    def to_chrome_trace(self, pid: int = 0) -> dict[str, Any]:
+        trace_events: list[dict[str, Any]] = []
+        threads: dict[int, int] = {}
+        for event in self.events():
+            tid = threads.setdefault(event.thread, len(threads))
+            entry: dict[str, Any] = {
+                "name": event.name,
+                "cat": event.category,
+                "ph": "X",
+                "ts": event.start_ns / 1000,
+                "dur": event.duration_ns / 1000,
+                "pid": pid,
+                "tid": tid,
+            }
+            args: dict[str, Any] = {}
+            if event.register is not None:
+                args["register"] = f"{event.register:#04x}"
+            if event.page is not None:
+                args["page"] = event.page
+            if event.length is not None:
+                args["length"] = event.length
+            if event.outcome != Outcome.OK:
+                args["outcome"] = event.outcome.name.lower()
+            if args:
+                entry["args"] = args
+            trace_events.append(entry)
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread, tid in threads.items():
+            name = names.get(thread, f"thread {thread:#x}")
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path, pid: int = 0) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(pid), f)
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+        if name_id is None:
+            with self._lock:
+                name_id = self._name_ids.get(name)
+                if name_id is None:
+                    if len(self._name_list) >= 0xFFFF - _FIRST_NAME:
+                        raise ValueError("too many distinct span names")
+                    name_id = _FIRST_NAME + len(self._name_list)
+                    self._name_list.append(name)
+                    self._name_ids[name] = name_id
+        return name_id
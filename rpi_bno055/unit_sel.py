@@ -1,4 +1,5 @@
 import enum as _enum
+from typing import NamedTuple
 
 from typing_extensions import Self
 
@@ -90,6 +91,8 @@ class UnitSelection:
     ACC_MPS2 = AccUnits.METER_PER_S2
     ACC_MILLIGRAM = AccUnits.MILLIGRAM
 
+    __slots__ = ("_orientation", "_temperature", "_euler", "_gyroscope", "_acceleration")
+
     def __init__(self) -> None:
         self._orientation: OrientationUnits = OrientationUnits.default()
         self._temperature: TemperatureUnits = TemperatureUnits.default()
@@ -170,11 +173,68 @@ class UnitSelection:
     def acceleration_milligram(self) -> Self:
         return self.set(UnitSelection.ACC_MILLIGRAM)
 
+    # a new, independent instance; the fields come from a table of all 256 register values
     @classmethod
     def from_value(cls, value: int) -> Self:
-        ori = OrientationUnits((value >> 7) & 1)
-        temp = TemperatureUnits((value >> 4) & 1)
-        eul = EulerUnits((value >> 2) & 1)
-        gyr = GyroUnits((value >> 1) & 1)
-        acc = AccUnits((value >> 0) & 1)
-        return UnitSelection().set(ori).set(temp).set(eul).set(gyr).set(acc)  # type: ignore
+        unit_sel = cls.__new__(cls)
+        (
+            unit_sel._orientation,
+            unit_sel._temperature,
+            unit_sel._euler,
+            unit_sel._gyroscope,
+            unit_sel._acceleration,
+        ) = _UNIT_FIELDS[value & 0xFF]
+        return unit_sel
+
+
+# fields of UnitSelection for every UNIT_SEL value
+_UNIT_FIELDS: tuple[tuple[OrientationUnits, TemperatureUnits, EulerUnits, GyroUnits, AccUnits], ...] = tuple(
+    (
+        OrientationUnits((v >> 7) & 1),
+        TemperatureUnits((v >> 4) & 1),
+        EulerUnits((v >> 2) & 1),
+        GyroUnits((v >> 1) & 1),
+        AccUnits((v >> 0) & 1),
+    )
+    for v in range(256)
+)
+
+
+# fixed scales which do not depend on UNIT_SEL
+# 1 μT = 16 LSB
+MAGNETOMETER_SCALE = 1 / 16.0
+# 1 [unit less] = 2^14 LSB
+QUATERNION_SCALE = 1 / 0b0100_0000_0000_0000
+
+
+# LSB-to-unit scale factors for the data registers under a given unit selection
+# section 3.6.4, 3.6.5
+class UnitScale(NamedTuple):
+    acceleration: float
+    magnetometer: float
+    gyroscope: float
+    euler: float
+    quaternion: float
+    temperature: float
+
+    @classmethod
+    def from_unit_selection(cls, unit_sel: UnitSelection) -> "UnitScale":
+        # 1 m/s^2 = 100 LSB, 1 mg = 1 LSB
+        acc = 1 / 100.0 if unit_sel.acceleration == UnitSelection.ACC_MPS2 else 1 / 1.0
+        mag = MAGNETOMETER_SCALE
+        # 1 dps = 16 LSB, 1 rps = 900 LSB
+        gyr = 1 / 16.0 if unit_sel.gyroscope == UnitSelection.GYR_DPS else 1 / 900.0
+        # 1 degrees = 16 LSB, 1 radian = 900 LSB
+        eul = 1 / 16.0 if unit_sel.euler == UnitSelection.EUL_DEGREES else 1 / 900.0
+        qua = QUATERNION_SCALE
+        # 1 ℃ = 1 LSB, 2 F = 1 LSB
+        temp = 1 / 1.0 if unit_sel.temperature == UnitSelection.TEMP_CELSIUS else 2 / 1.0
+        return cls(acc, mag, gyr, eul, qua, temp)
+
+    # the shared scale table of a UNIT_SEL register value, without building a UnitSelection
+    @classmethod
+    def from_value(cls, value: int) -> "UnitScale":
+        return _UNIT_SCALES[value & 0xFF]
+
+
+_UNIT_SCALES = tuple(UnitScale.from_unit_selection(UnitSelection.from_value(v)) for v in range(256))